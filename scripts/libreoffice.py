@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""
+Shared LibreOffice conversion service.
+
+Starting `soffice --headless` costs several seconds of startup and profile
+initialization per call, and concurrent calls fight over the same user
+profile. This module keeps a small pool of warm headless LibreOffice
+instances, each with its own profile directory, and runs convert and
+recalculate jobs on them over UNO. Instances outlive the scripts that use
+them, so previews, recalculations and validations in a session all skip the
+startup.
+
+Usage:
+    python scripts/libreoffice.py start [--size N]   # Start the pool
+    python scripts/libreoffice.py status
+    python scripts/libreoffice.py stop
+
+    from libreoffice import convert_document, recalculate_document
+    pdf_path = convert_document("deck.pptx", output_dir, "pdf")
+
+Jobs wait for a free instance through one lock file per instance, so calls
+from any number of threads and processes are queued, for at most the
+call's timeout. A job that crashes its instance gets the instance restarted;
+one that exceeds its timeout gets it killed, and the next job starts a fresh
+one. Without a running pool, without LibreOffice's Python bindings (uno),
+when no instance becomes free in time, or when an instance can neither be
+reached nor restarted, calls fall back to a one-shot `soffice --headless`
+process.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the pool is not supported, calls are one-shot
+    fcntl = None
+
+POOL_DIR = Path(
+    os.environ.get(
+        "LIBREOFFICE_POOL_DIR", Path.home() / ".cache" / "libreoffice-pool"
+    )
+)
+DEFAULT_POOL_SIZE = 2
+STARTUP_TIMEOUT = 60  # Seconds to wait for an instance to accept connections
+STOP_TIMEOUT = 10  # Seconds to wait for an instance to exit before killing it
+LOCK_POLL_INTERVAL = 0.05  # Seconds between attempts to lock a busy instance
+
+# PDF export filters by document type, for "pdf" without an explicit filter
+PDF_FILTERS = {
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+    "com.sun.star.text.TextDocument": "writer_pdf_Export",
+}
+
+
+class ConversionError(RuntimeError):
+    """LibreOffice could not convert or recalculate a document."""
+
+
+class PoolUnavailable(ConversionError):
+    """No pool instance could be reached or restarted to run a job.
+
+    convert_document and recalculate_document catch this and fall back to
+    one-shot soffice processes.
+    """
+
+
+def _uno():
+    """Import LibreOffice's Python bindings, or return None if unavailable."""
+    try:
+        import uno
+    except ImportError:
+        return None
+    return uno
+
+
+def _property(name: str, value: Any) -> Any:
+    from com.sun.star.beans import PropertyValue
+
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class OfficeInstance:
+    """One warm headless LibreOffice process of the pool.
+
+    Its process ID and port are kept in a state file in the pool
+    directory, so other processes can find it; holding its lock file gives
+    exclusive use of it.
+    """
+
+    def __init__(self, index: int, pool_dir: Optional[Path] = None):
+        """Initialize from the instance's slot in the pool directory."""
+        self.index = index
+        self.pool_dir = Path(pool_dir or POOL_DIR)
+        self.state_path = self.pool_dir / f"instance-{index}.json"
+        self.lock_path = self.pool_dir / f"instance-{index}.lock"
+        self.profile_dir = self.pool_dir / f"profile-{index}"
+        self.pid: Optional[int] = None
+        self.port: Optional[int] = None
+        self._desktop = None
+        self._load_state()
+
+    def _load_state(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+            self.pid, self.port = state["pid"], state["port"]
+        except (OSError, ValueError, KeyError):
+            self.pid = self.port = None
+
+    @property
+    def configured(self) -> bool:
+        """Whether the instance was started, whether or not it still runs."""
+        return self.pid is not None
+
+    def is_alive(self) -> bool:
+        """Whether the instance process still exists.
+
+        The state file outlives reboots, so where /proc is available the
+        process must also have been started with this instance's profile; a
+        process that merely reuses the recorded ID does not count.
+        """
+        if self.pid is None:
+            return False
+        try:
+            # Reap the process if this one started it and it has exited
+            if os.waitpid(self.pid, os.WNOHANG)[0] == self.pid:
+                return False
+        except ChildProcessError:
+            pass
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        if not Path("/proc/self").exists():
+            return True  # No /proc (e.g. macOS): the process ID is all there is
+        try:
+            cmdline = Path(f"/proc/{self.pid}/cmdline").read_bytes()
+        except OSError:
+            return False
+        return self.profile_dir.resolve().as_uri().encode() in cmdline
+
+    def start(self) -> None:
+        """Start the process and wait until it accepts UNO connections."""
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        self.port = _free_port()
+        process = subprocess.Popen(
+            [
+                "soffice",
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;"
+                "StarOffice.ComponentContext",
+                f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self.pid = process.pid
+        self._desktop = None
+        self.state_path.write_text(json.dumps({"pid": self.pid, "port": self.port}))
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                self.desktop()
+                return
+            except Exception:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise ConversionError(
+                        f"LibreOffice instance {self.index} did not start"
+                    )
+                time.sleep(0.5)
+
+    def stop(self) -> None:
+        """Terminate the process and forget its state."""
+        if self.is_alive():
+            try:
+                os.killpg(self.pid, signal.SIGTERM)
+                deadline = time.monotonic() + STOP_TIMEOUT
+                while self.is_alive() and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                if self.is_alive():
+                    os.killpg(self.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.pid = self.port = None
+        self._desktop = None
+        self.state_path.unlink(missing_ok=True)
+
+    def kill(self) -> None:
+        """Kill a hung process without waiting for it to exit.
+
+        The state is kept, so the next job finds the instance dead and
+        restarts it.
+        """
+        if self.is_alive():
+            try:
+                os.killpg(self.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self._desktop = None
+
+    def restart(self) -> None:
+        """Replace a hung or crashed process with a fresh one.
+
+        Raises:
+            PoolUnavailable: If the new process does not start
+        """
+        self.stop()
+        try:
+            self.start()
+        except ConversionError as e:
+            raise PoolUnavailable(str(e)) from e
+
+    def desktop(self) -> Any:
+        """Connect to the instance and get its frame Desktop (cached)."""
+        if self._desktop is None:
+            uno = _uno()
+            local = uno.getComponentContext()
+            resolver = local.ServiceManager.createInstanceWithContext(
+                "com.sun.star.bridge.UnoUrlResolver", local
+            )
+            context = resolver.resolve(
+                f"uno:socket,host=127.0.0.1,port={self.port};urp;"
+                "StarOffice.ComponentContext"
+            )
+            self._desktop = context.ServiceManager.createInstanceWithContext(
+                "com.sun.star.frame.Desktop", context
+            )
+        return self._desktop
+
+    def connect(self) -> Any:
+        """Get the Desktop of a running instance, restarting it if needed.
+
+        A process that is gone, or that exists but does not accept UNO
+        connections (e.g. an unrelated process that reused its ID, or one
+        stuck after a job timed out), is replaced by a fresh one.
+
+        Raises:
+            PoolUnavailable: If no instance could be reached or restarted
+        """
+        if self.is_alive():
+            try:
+                return self.desktop()
+            except Exception:
+                self._desktop = None
+        self.restart()
+        try:
+            return self.desktop()
+        except Exception as e:
+            self._desktop = None
+            raise PoolUnavailable(
+                f"LibreOffice instance {self.index} is not reachable: {e}"
+            ) from e
+
+    def run(self, job: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Run job(desktop) on the instance, restarting it on a crash.
+
+        A job that crashes the instance or its connection is retried once on
+        the restarted instance. One that exceeds the timeout is not: the
+        instance is killed, without waiting, and restarted by the next job.
+
+        Raises:
+            ConversionError: If the job failed
+            PoolUnavailable: If the instance could not be reached or restarted
+            subprocess.TimeoutExpired: If the job did not finish in time
+        """
+        for attempt in range(2):
+            desktop = self.connect()
+            outcome: dict[str, Any] = {}
+
+            def target():
+                try:
+                    outcome["result"] = job(desktop)
+                except Exception as e:
+                    outcome["error"] = e
+
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join(timeout)
+            if thread.is_alive():
+                self.kill()
+                raise subprocess.TimeoutExpired("soffice", timeout)
+            if "error" not in outcome:
+                return outcome["result"]
+
+            error = outcome["error"]
+            if self.is_alive() and not _is_connection_error(error):
+                # The job failed on its own, e.g. on an unreadable document
+                if isinstance(error, ConversionError):
+                    raise error
+                raise ConversionError(str(error))
+            # Reconnect, or restart, for the next attempt
+            self._desktop = None
+        raise PoolUnavailable(f"LibreOffice crashed: {error}")
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Whether a UNO call failed because the bridge to the instance is gone."""
+    return type(error).__name__ in ("DisposedException", "NoConnectException")
+
+
+def _pool_instances(pool_dir: Optional[Path] = None) -> list[OfficeInstance]:
+    """Get the instances of a started pool, empty if there is none."""
+    pool_dir = Path(pool_dir or POOL_DIR)
+    if not pool_dir.is_dir():
+        return []
+    indices = sorted(
+        int(path.stem.split("-")[1]) for path in pool_dir.glob("instance-*.json")
+    )
+    return [OfficeInstance(index, pool_dir) for index in indices]
+
+
+def pool_available() -> bool:
+    """Whether jobs can run on a warm pool instead of one-shot processes."""
+    return fcntl is not None and _uno() is not None and bool(_pool_instances())
+
+
+def _run_in_pool(
+    job: Callable[[Any], Any], timeout: Optional[float] = None
+) -> Any:
+    """Run a job on the first free pool instance, waiting for one if all are busy.
+
+    The wait for a free instance and the job itself are each limited to
+    timeout seconds, so a caller is never queued indefinitely behind long
+    jobs of other processes.
+
+    Raises:
+        PoolUnavailable: If the pool was stopped, or no instance became free
+            in time; the caller should fall back to a one-shot process
+    """
+    instances = _pool_instances()
+    # Spread jobs from concurrent callers instead of all trying instance 0 first
+    start = random.randrange(len(instances))
+    instances = instances[start:] + instances[:start]
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while instances:
+        for instance in list(instances):
+            lock = open(instance.lock_path, "a")
+            try:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                instance._load_state()  # Another process may have restarted it
+                if not instance.configured:
+                    instances.remove(instance)  # Stopped while waiting
+                    continue
+                return instance.run(job, timeout)
+            finally:
+                lock.close()
+        if not instances:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            raise PoolUnavailable(
+                f"No LibreOffice pool instance became free within {timeout} seconds"
+            )
+        time.sleep(LOCK_POLL_INTERVAL)
+    raise PoolUnavailable("The LibreOffice pool was stopped")
+
+
+def _parse_convert_to(convert_to: str) -> tuple[str, Optional[str], Optional[str]]:
+    """Split a --convert-to argument into (extension, filter, filter options)."""
+    extension, _, rest = convert_to.partition(":")
+    filter_name, _, options = rest.partition(":")
+    return extension, filter_name or None, options or None
+
+
+def _filter_data(options: str) -> list[Any]:
+    """Convert --convert-to JSON filter options to a FilterData sequence."""
+    data = []
+    for name, spec in json.loads(options).items():
+        value = spec.get("value")
+        if spec.get("type") == "boolean":
+            value = str(value).lower() == "true"
+        elif spec.get("type") in ("long", "short", "int"):
+            value = int(value)
+        data.append(_property(name, value))
+    return data
+
+
+def _convert_job(
+    input_path: Path,
+    output_path: Path,
+    filter_name: Optional[str],
+    options: Optional[str],
+) -> Callable[[Any], None]:
+    """Make a pool job that loads a document and stores it with a filter."""
+    uno = _uno()
+
+    def job(desktop: Any) -> None:
+        document = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(input_path.resolve())),
+            "_blank",
+            0,
+            (_property("Hidden", True),),
+        )
+        if document is None:
+            raise ConversionError(f"Could not load {input_path}")
+        try:
+            name = filter_name
+            if name is None:
+                name = next(
+                    (f for s, f in PDF_FILTERS.items() if document.supportsService(s)),
+                    None,
+                )
+            if name is None:
+                raise ConversionError(f"No PDF export filter for {input_path}")
+            properties = [_property("FilterName", name)]
+            if options and options.lstrip().startswith("{"):
+                filter_data = uno.Any(
+                    "[]com.sun.star.beans.PropertyValue", tuple(_filter_data(options))
+                )
+                properties.append(_property("FilterData", filter_data))
+            elif options:
+                properties.append(_property("FilterOptions", options))
+            uno.invoke(
+                document,
+                "storeToURL",
+                (
+                    uno.systemPathToFileUrl(str(output_path.resolve())),
+                    tuple(properties),
+                ),
+            )
+        finally:
+            document.close(True)
+
+    return job
+
+
+def convert_document(
+    input_path: Path | str,
+    output_dir: Path | str,
+    convert_to: str,
+    timeout: Optional[float] = None,
+) -> Path:
+    """Convert a document like `soffice --headless --convert-to`.
+
+    Args:
+        input_path: Document to convert
+        output_dir: Directory for the output, named after the input
+        convert_to: Target as for --convert-to, e.g. "pdf", "html:HTML" or
+            'pdf:impress_pdf_Export:{"PageRange":{"type":"string","value":"2"}}'
+        timeout: Maximum time for the conversion in seconds
+
+    Returns:
+        Path of the converted document
+
+    Raises:
+        ConversionError: If no output was produced
+        FileNotFoundError: If LibreOffice is not installed
+        subprocess.TimeoutExpired: If the conversion did not finish in time
+    """
+    input_path, output_dir = Path(input_path), Path(output_dir)
+    extension, filter_name, options = _parse_convert_to(convert_to)
+    output_path = output_dir / f"{input_path.stem}.{extension}"
+
+    if pool_available() and (filter_name or extension == "pdf"):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        job = _convert_job(input_path, output_path, filter_name, options)
+        try:
+            _run_in_pool(job, timeout)
+        except PoolUnavailable:
+            pass  # Convert with a one-shot process below
+        else:
+            if output_path.exists():
+                return output_path
+            raise ConversionError(f"Conversion of {input_path} produced no output")
+
+    result = subprocess.run(
+        [
+            "soffice",
+            "--headless",
+            "--convert-to",
+            convert_to,
+            "--outdir",
+            str(output_dir),
+            str(input_path),
+        ],
+        capture_output=True,
+        timeout=timeout,
+        text=True,
+    )
+    if not output_path.exists():
+        raise ConversionError(
+            result.stderr.strip() or f"Conversion of {input_path} produced no output"
+        )
+    return output_path
+
+
+def recalculate_document(
+    path: Path | str, timeout: Optional[float] = None
+) -> bool:
+    """Recalculate all formulas of a spreadsheet in place on the pool.
+
+    Returns:
+        True if the pool recalculated and saved the document, False if no
+        pool is available, or none of its instances could be reached or
+        became free in time, and the caller should use its one-shot fallback
+
+    Raises:
+        ConversionError: If the document could not be recalculated
+        subprocess.TimeoutExpired: If recalculation did not finish in time
+    """
+    if not pool_available():
+        return False
+    uno = _uno()
+    path = Path(path)
+
+    def job(desktop: Any) -> None:
+        document = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(path.resolve())),
+            "_blank",
+            0,
+            (_property("Hidden", True),),
+        )
+        if document is None:
+            raise ConversionError(f"Could not load {path}")
+        try:
+            document.calculateAll()
+            document.store()
+        finally:
+            document.close(True)
+
+    try:
+        _run_in_pool(job, timeout)
+    except PoolUnavailable:
+        return False
+    return True
+
+
+def start_pool(size: int = DEFAULT_POOL_SIZE, pool_dir: Optional[Path] = None) -> None:
+    """Start instances 0..size-1 that are not running yet."""
+    if fcntl is None:
+        raise ConversionError("The LibreOffice pool is not supported on this platform")
+    if _uno() is None:
+        raise ConversionError(
+            "LibreOffice's Python bindings (uno) are not importable; run this "
+            "with LibreOffice's python or install python3-uno"
+        )
+    if shutil.which("soffice") is None:
+        raise FileNotFoundError("soffice not found")
+    for index in range(size):
+        instance = OfficeInstance(index, pool_dir)
+        if not instance.is_alive():
+            instance.start()
+            print(f"Started instance {index} (pid {instance.pid}, port {instance.port})")
+
+
+def stop_pool(pool_dir: Optional[Path] = None) -> None:
+    """Stop all instances and remove their profiles."""
+    for instance in _pool_instances(pool_dir):
+        instance.stop()
+        shutil.rmtree(instance.profile_dir, ignore_errors=True)
+        print(f"Stopped instance {instance.index}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage a pool of warm headless LibreOffice instances."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    start = subparsers.add_parser("start", help="Start the pool")
+    start.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help=f"Number of instances (default: {DEFAULT_POOL_SIZE})",
+    )
+    subparsers.add_parser("status", help="Show the pool's instances")
+    subparsers.add_parser("stop", help="Stop the pool")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "start":
+            start_pool(args.size)
+        elif args.command == "stop":
+            stop_pool()
+        else:
+            instances = _pool_instances()
+            if not instances:
+                print("No pool running; conversions start one-shot soffice processes")
+            for instance in instances:
+                state = "running" if instance.is_alive() else "crashed"
+                print(
+                    f"Instance {instance.index}: {state} "
+                    f"(pid {instance.pid}, port {instance.port})"
+                )
+    except (ConversionError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Tests for the LibreOffice pool, run against a fake soffice and fake uno.
+
+The fake soffice listens on the port given by --accept, which is all the
+fake uno checks when connecting, and handles --convert-to by writing the
+output file, like a one-shot conversion.
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import libreoffice
+
+FAKE_SOFFICE = f"""#!{sys.executable}
+import os, socket, sys, time
+
+args = sys.argv[1:]
+if "--convert-to" in args:
+    extension = args[args.index("--convert-to") + 1].split(":")[0]
+    stem = os.path.splitext(os.path.basename(args[-1]))[0]
+    output_dir = args[args.index("--outdir") + 1]
+    with open(os.path.join(output_dir, stem + "." + extension), "w") as f:
+        f.write("converted")
+    sys.exit(0)
+
+accept = next(arg for arg in args if arg.startswith("--accept="))
+port = int(accept.split("port=")[1].split(";")[0])
+if os.environ.get("FAKE_SOFFICE_DEAF"):
+    time.sleep(3600)
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("127.0.0.1", port))
+server.listen()
+while True:
+    server.accept()[0].close()
+"""
+
+
+class NoConnectException(Exception):
+    """Stands in for com.sun.star.connection.NoConnectException."""
+
+
+class DisposedException(Exception):
+    """Stands in for com.sun.star.lang.DisposedException."""
+
+
+def fake_uno():
+    """A uno module whose Desktop is a string naming the port it reached."""
+
+    def resolve(url):
+        port = int(url.split("port=")[1].split(";")[0])
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+        except OSError as e:
+            raise NoConnectException(str(e))
+        manager = SimpleNamespace(
+            createInstanceWithContext=lambda name, context: f"desktop:{port}"
+        )
+        return SimpleNamespace(ServiceManager=manager)
+
+    resolver = SimpleNamespace(resolve=resolve)
+    manager = SimpleNamespace(createInstanceWithContext=lambda name, context: resolver)
+    local = SimpleNamespace(ServiceManager=manager)
+    return SimpleNamespace(getComponentContext=lambda: local)
+
+
+class TestPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        bin_dir = self.tmpdir / "bin"
+        bin_dir.mkdir()
+        soffice = bin_dir / "soffice"
+        soffice.write_text(FAKE_SOFFICE)
+        soffice.chmod(0o755)
+        self.pool_dir = self.tmpdir / "pool"
+
+        uno = fake_uno()
+        for patcher in (
+            mock.patch.dict(os.environ, {"PATH": f"{bin_dir}:{os.environ['PATH']}"}),
+            mock.patch.object(libreoffice, "POOL_DIR", self.pool_dir),
+            mock.patch.object(libreoffice, "STARTUP_TIMEOUT", 2),
+            mock.patch.object(libreoffice, "_uno", lambda: uno),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.addCleanup(self.stop_pool)
+
+    def start_pool(self, size=1):
+        with mock.patch("builtins.print"):
+            libreoffice.start_pool(size)
+        return libreoffice._pool_instances()
+
+    def stop_pool(self):
+        with mock.patch("builtins.print"):
+            libreoffice.stop_pool()
+
+    def test_jobs_queue_on_instance_lock(self):
+        self.start_pool(1)
+        spans = []
+
+        def job(desktop):
+            start = time.monotonic()
+            time.sleep(0.3)
+            spans.append((start, time.monotonic()))
+            return desktop
+
+        threads = [
+            threading.Thread(target=libreoffice._run_in_pool, args=(job, 10))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        spans.sort()
+        self.assertEqual(len(spans), 3)
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertGreaterEqual(start, end)
+
+    def test_wait_for_busy_pool_is_limited_by_timeout(self):
+        self.start_pool(1)
+        busy = threading.Event()
+
+        def long_job(desktop):
+            busy.set()
+            time.sleep(2)
+
+        thread = threading.Thread(target=libreoffice._run_in_pool, args=(long_job, 10))
+        thread.start()
+        self.addCleanup(thread.join)
+        busy.wait()
+
+        started = time.monotonic()
+        with self.assertRaises(libreoffice.PoolUnavailable):
+            libreoffice._run_in_pool(lambda desktop: desktop, timeout=0.3)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_timeout_kills_instance_and_next_job_restarts_it(self):
+        (instance,) = self.start_pool(1)
+        started = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            libreoffice._run_in_pool(lambda desktop: time.sleep(3), timeout=0.2)
+        # The instance is killed, not restarted while the caller waits
+        self.assertLess(time.monotonic() - started, 1.5)
+
+        result = libreoffice._run_in_pool(lambda desktop: desktop, timeout=10)
+        (restarted,) = libreoffice._pool_instances()
+        self.assertNotEqual(restarted.pid, instance.pid)
+        self.assertEqual(result, f"desktop:{restarted.port}")
+
+    def test_crash_is_retried_on_restarted_instance(self):
+        (instance,) = self.start_pool(1)
+        attempts = []
+
+        def job(desktop):
+            attempts.append(desktop)
+            if len(attempts) == 1:
+                os.killpg(instance.pid, 9)
+                raise DisposedException("bridge disposed")
+            return "done"
+
+        self.assertEqual(libreoffice._run_in_pool(job, timeout=10), "done")
+        self.assertEqual(len(attempts), 2)
+        self.assertNotEqual(libreoffice._pool_instances()[0].pid, instance.pid)
+
+    def test_job_error_is_not_retried(self):
+        self.start_pool(1)
+        attempts = []
+
+        def job(desktop):
+            attempts.append(desktop)
+            raise ValueError("unreadable document")
+
+        with self.assertRaisesRegex(libreoffice.ConversionError, "unreadable"):
+            libreoffice._run_in_pool(job, timeout=10)
+        self.assertEqual(len(attempts), 1)
+
+    def test_reused_process_id_is_restarted_not_killed(self):
+        (instance,) = self.start_pool(1)
+        instance.stop()
+        # An unrelated process now has the ID recorded in the state file
+        other = subprocess.Popen(["sleep", "30"])
+        self.addCleanup(other.kill)
+        instance.state_path.write_text(json.dumps({"pid": other.pid, "port": 1}))
+
+        result = libreoffice._run_in_pool(lambda desktop: desktop, timeout=10)
+        (restarted,) = libreoffice._pool_instances()
+        self.assertEqual(result, f"desktop:{restarted.port}")
+        self.assertIsNone(other.poll())
+
+    def test_unreachable_instance_is_restarted(self):
+        (instance,) = self.start_pool(1)
+        # The process runs but no longer accepts connections on its port
+        instance.state_path.write_text(json.dumps({"pid": instance.pid, "port": 1}))
+
+        result = libreoffice._run_in_pool(lambda desktop: desktop, timeout=10)
+        (restarted,) = libreoffice._pool_instances()
+        self.assertNotEqual(restarted.pid, instance.pid)
+        self.assertEqual(result, f"desktop:{restarted.port}")
+
+    def test_unreachable_pool_falls_back_to_one_shot(self):
+        self.pool_dir.mkdir()
+        libreoffice.OfficeInstance(0).state_path.write_text(
+            json.dumps({"pid": 999999, "port": 1})
+        )
+        document = self.tmpdir / "deck.pptx"
+        document.write_text("deck")
+
+        # Restarted instances run but never accept connections
+        with mock.patch.dict(os.environ, {"FAKE_SOFFICE_DEAF": "1"}):
+            self.assertTrue(libreoffice.pool_available())
+            output = libreoffice.convert_document(document, self.tmpdir / "out", "pdf")
+            self.assertEqual(output.read_text(), "converted")
+            self.assertFalse(libreoffice.recalculate_document(document, timeout=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
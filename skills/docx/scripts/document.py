@@ -19,6 +19,8 @@ Usage:
 
     # Suggest tracked changes
     doc["word/document.xml"].suggest_deletion(node)  # Delete content
+    doc.suggest_text_change("1A2B3C4D", "New paragraph text")  # Diff by w14:paraId
+    doc.suggest_text_changes({"1A2B3C4D": "New text", "5E6F7A8B": "More text"})
     doc["word/document.xml"].revert_insertion(ins_node)  # Reject insertion
     doc["word/document.xml"].revert_deletion(del_node)  # Reject deletion
 
@@ -26,8 +28,11 @@ Usage:
     doc.save()
 """
 
+import difflib
 import html
+import itertools
 import random
+import re
 import shutil
 import tempfile
 from datetime import datetime, timezone
@@ -43,6 +48,9 @@ from .utilities import XMLEditor
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Words, whitespace runs and single punctuation marks are the units of text diffs
+_DIFF_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
 
 class DocxXMLEditor(XMLEditor):
     """XMLEditor that automatically applies RSID, author, and date to new elements.
@@ -592,6 +600,209 @@ class DocxXMLEditor(XMLEditor):
         else:
             raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
 
+    def suggest_text_change(self, elem, new_text: str) -> bool:
+        """Rewrite a paragraph's text as minimal tracked changes (in-place DOM manipulation).
+
+        Diffs the paragraph's current text against new_text word by word and wraps
+        only the differing spans in <w:del>/<w:ins>, splitting runs where needed.
+        Unchanged text keeps its original runs, and deleted and inserted text reuse
+        the w:rPr of the run they replace, so formatting is preserved.
+
+        Only runs containing nothing but w:rPr and w:t take part in the diff. Other
+        runs (tabs, breaks, fields, drawings) and other paragraph children such as
+        hyperlinks and bookmarks are left in place.
+
+        Args:
+            elem: A w:p DOM element without existing tracked changes
+            new_text: The desired text of the paragraph
+
+        Returns:
+            bool: True if the paragraph was changed, False if its text already matched
+
+        Raises:
+            ValueError: If elem is not a w:p, already contains tracked changes,
+                or has no text runs to edit
+
+        Example:
+            para = doc["word/document.xml"].get_node(tag="w:p", contains="within 30 days")
+            doc["word/document.xml"].suggest_text_change(para, "Payment is due within 45 days.")
+        """
+        change_ids = itertools.count(self._get_next_change_id())
+        return self._suggest_text_change(elem, new_text, change_ids)
+
+    def _suggest_text_change(self, elem, new_text, change_ids):
+        """Apply suggest_text_change, drawing w:id values from the change_ids iterator.
+
+        Sharing one iterator across many paragraphs avoids rescanning the whole
+        DOM for the next free change ID on every edit.
+        """
+        plan = self._plan_text_change(elem, new_text)
+        if plan is None:
+            return False
+        self._apply_text_change(elem, plan, change_ids)
+        return True
+
+    def _plan_text_change(self, elem, new_text):
+        """Validate a paragraph and diff its text against new_text, without editing it.
+
+        Returns:
+            (spans, old_text, ops) for _apply_text_change, or None if the text
+            already matches
+
+        Raises:
+            ValueError: As suggest_text_change
+        """
+        if elem.nodeName != "w:p":
+            raise ValueError(f"Element must be w:p, got {elem.nodeName}")
+        if elem.getElementsByTagName("w:ins") or elem.getElementsByTagName("w:del"):
+            raise ValueError("w:p element already contains tracked changes")
+
+        # Map each editable run to its [start, end) span of the paragraph text
+        spans = []
+        old_parts = []
+        offset = 0
+        for child in elem.childNodes:
+            text = _plain_run_text(child)
+            if text is None:
+                continue
+            spans.append((child, offset, offset + len(text)))
+            old_parts.append(text)
+            offset += len(text)
+
+        old_text = "".join(old_parts)
+        if old_text == new_text:
+            return None
+        if not spans:
+            raise ValueError("w:p element has no text runs to edit")
+        return spans, old_text, _diff_text(old_text, new_text)
+
+    def _apply_text_change(self, elem, plan, change_ids):
+        """Rewrite a paragraph's runs as the tracked changes _plan_text_change found."""
+        spans, old_text, ops = plan
+        first_run = spans[0][0]
+
+        for run, start, end in spans:
+            pieces = []
+            for tag, i1, i2, inserted in ops:
+                lo, hi = max(start, i1), min(end, i2)
+                if tag == "equal" and lo < hi:
+                    if lo == start and hi == end:
+                        pieces.append(run)
+                    else:
+                        pieces.append(self._clone_run(run, old_text[lo:hi]))
+                elif tag in ("delete", "replace") and lo < hi:
+                    deleted = self._clone_run(run, old_text[lo:hi], deleted=True)
+                    pieces.append(self._wrap_change("w:del", deleted, change_ids))
+
+                # Insertions follow the character before them, taking its formatting
+                anchored_here = start < i2 <= end or (i2 == 0 and run is first_run)
+                if tag in ("insert", "replace") and anchored_here:
+                    added = self._clone_run(run, inserted, inserted=True)
+                    pieces.append(self._wrap_change("w:ins", added, change_ids))
+
+            if pieces == [run]:
+                continue
+            # Replace the run with its pieces in order; the run itself may be one
+            # of them, with insertions before or after it
+            next_sibling = run.nextSibling
+            elem.removeChild(run)
+            for piece in pieces:
+                elem.insertBefore(piece, next_sibling)
+            self._inject_attributes_to_nodes([p for p in pieces if p is not run])
+
+    def _clone_run(self, run, text, deleted=False, inserted=False):
+        """Create a run holding text with the same w:rPr as run.
+
+        Unchanged and deleted pieces keep the original run attributes (with
+        w:rsidR moved to w:rsidDel for deletions); inserted pieces start bare so
+        they pick up this editor's RSID.
+        """
+        new_run = self.dom.createElement("w:r") if inserted else run.cloneNode(False)
+        if deleted and new_run.hasAttribute("w:rsidR"):
+            new_run.setAttribute("w:rsidDel", new_run.getAttribute("w:rsidR"))
+            new_run.removeAttribute("w:rsidR")
+
+        for child in run.childNodes:
+            if child.nodeName == "w:rPr":
+                new_run.appendChild(child.cloneNode(True))
+                break
+
+        text_elem = self.dom.createElement("w:delText" if deleted else "w:t")
+        if text[0].isspace() or text[-1].isspace():
+            text_elem.setAttribute("xml:space", "preserve")
+        text_elem.appendChild(self.dom.createTextNode(text))
+        new_run.appendChild(text_elem)
+        return new_run
+
+    def _wrap_change(self, tag, run, change_ids):
+        """Wrap run in a w:ins or w:del element with the next change ID."""
+        wrapper = self.dom.createElement(tag)
+        wrapper.setAttribute("w:id", str(next(change_ids)))
+        wrapper.appendChild(run)
+        return wrapper
+
+
+def _plain_run_text(node):
+    """Return the text of a run made only of w:rPr and w:t children, else None."""
+    if node.nodeType != node.ELEMENT_NODE or node.tagName != "w:r":
+        return None
+    parts = []
+    for child in node.childNodes:
+        if child.nodeType == child.TEXT_NODE:
+            if child.data.strip():
+                return None
+        elif child.nodeType != child.ELEMENT_NODE or child.tagName == "w:rPr":
+            continue
+        elif child.tagName == "w:t":
+            parts.append(
+                "".join(n.data for n in child.childNodes if n.nodeType == n.TEXT_NODE)
+            )
+        else:
+            return None
+    return "".join(parts)
+
+
+def _diff_text(old_text: str, new_text: str) -> list:
+    """Diff two strings word by word, returning character-offset opcodes.
+
+    Returns a list of (tag, i1, i2, inserted) tuples in document order, where
+    tag is "equal", "delete", "insert" or "replace", old_text[i1:i2] is the span
+    the opcode covers and inserted is the text that replaces it. Whitespace left
+    unchanged between two edits is folded into a single replacement so that
+    "the quick fox" -> "a slow dog" reads as one change rather than three.
+    """
+    old_tokens = _DIFF_TOKEN_RE.findall(old_text)
+    new_tokens = _DIFF_TOKEN_RE.findall(new_text)
+    old_offsets = list(itertools.accumulate(map(len, old_tokens), initial=0))
+    new_offsets = list(itertools.accumulate(map(len, new_tokens), initial=0))
+
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    opcodes = matcher.get_opcodes()
+
+    ops = []
+    for index, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        start, end = old_offsets[i1], old_offsets[i2]
+        inserted = new_text[new_offsets[j1] : new_offsets[j2]]
+        between_edits = 0 < index < len(opcodes) - 1
+        if tag == "equal" and not (between_edits and old_text[start:end].isspace()):
+            ops.append(("equal", start, end, ""))
+            continue
+
+        # Merge consecutive edits (and the whitespace between them) into one
+        if tag == "equal":
+            inserted = old_text[start:end]
+        if ops and ops[-1][0] != "equal":
+            _, start, _, previous = ops.pop()
+            inserted = previous + inserted
+        if start == end:
+            tag = "insert"
+        elif not inserted:
+            tag = "delete"
+        else:
+            tag = "replace"
+        ops.append((tag, start, end, inserted))
+    return ops
+
 
 def _generate_hex_id() -> str:
     """Generate random 8-character hex ID for para/durable IDs.
@@ -830,6 +1041,73 @@ class Document:
         self.next_comment_id += 1
         return comment_id
 
+    def suggest_text_change(self, para_id: str, new_text: str) -> bool:
+        """
+        Rewrite one paragraph of document.xml as minimal tracked changes.
+
+        Args:
+            para_id: The w14:paraId of the paragraph to edit
+            new_text: The desired text of the paragraph
+
+        Returns:
+            True if the paragraph was changed, False if its text already matched
+
+        Example:
+            doc.suggest_text_change("1A2B3C4D", "Payment is due within 45 days.")
+        """
+        return bool(self.suggest_text_changes({para_id: new_text}))
+
+    def suggest_text_changes(self, changes: dict[str, str]) -> list[str]:
+        """
+        Rewrite many paragraphs of document.xml as minimal tracked changes.
+
+        Paragraphs are located in a single pass over document.xml and change IDs
+        are allocated once for the whole batch, so thousands of paragraphs can be
+        edited without repeated node lookups. See
+        DocxXMLEditor.suggest_text_change for how each paragraph is diffed.
+
+        Every paragraph is checked and diffed before any is edited, so the
+        batch is all or nothing: if it raises, the document is unchanged.
+
+        Args:
+            changes: Mapping of w14:paraId to the desired paragraph text
+
+        Returns:
+            The paraIds of the paragraphs that were changed, in the order given
+
+        Raises:
+            ValueError: If a paraId is not found, or a paragraph cannot be edited
+
+        Example:
+            doc.suggest_text_changes({
+                "1A2B3C4D": "Payment is due within 45 days.",
+                "5E6F7A8B": "This agreement renews quarterly.",
+            })
+        """
+        paragraphs = {}
+        for para in self._document.dom.getElementsByTagName("w:p"):
+            para_id = para.getAttribute("w14:paraId")
+            if para_id in changes and para_id not in paragraphs:
+                paragraphs[para_id] = para
+
+        missing = [para_id for para_id in changes if para_id not in paragraphs]
+        if missing:
+            raise ValueError(f"Paragraphs not found: w14:paraId {', '.join(missing)}")
+
+        editor = self._document
+        plans = {
+            para_id: editor._plan_text_change(paragraphs[para_id], new_text)
+            for para_id, new_text in changes.items()
+        }
+
+        change_ids = itertools.count(editor._get_next_change_id())
+        changed = []
+        for para_id, plan in plans.items():
+            if plan is not None:
+                editor._apply_text_change(paragraphs[para_id], plan, change_ids)
+                changed.append(para_id)
+        return changed
+
     def __del__(self):
         """Clean up temporary directory on deletion."""
         if hasattr(self, "temp_dir") and Path(self.temp_dir).exists():
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Tests for suggesting paragraph text changes as tracked changes."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.document import Document
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W14_NS = "http://schemas.microsoft.com/office/word/2010/wordml"
+
+PACKAGE = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/settings.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+        "</Relationships>"
+    ),
+    "word/_rels/document.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/settings" Target="settings.xml"/>'
+        "</Relationships>"
+    ),
+    "word/settings.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:settings xmlns:w="{W_NS}"/>'
+    ),
+}
+
+
+class TestSuggestTextChange(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def load(self, *paragraphs):
+        """Unpack a document whose paragraphs are given as lists of run texts,
+        or (text, rPr XML) pairs, with paraIds P0, P1, ..."""
+        body = []
+        for index, runs in enumerate(paragraphs):
+            xml = []
+            for run in runs:
+                text, rpr = run if isinstance(run, tuple) else (run, "")
+                xml.append(f'<w:r>{rpr}<w:t xml:space="preserve">{text}</w:t></w:r>')
+            body.append(f'<w:p w14:paraId="P{index}">{"".join(xml)}</w:p>')
+        parts = dict(PACKAGE)
+        parts["word/document.xml"] = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<w:document xmlns:w="{W_NS}" xmlns:w14="{W14_NS}">'
+            f'<w:body>{"".join(body)}</w:body></w:document>'
+        )
+        unpacked = Path(self.tmpdir) / "unpacked"
+        for name, content in parts.items():
+            path = unpacked / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        self.doc = Document(unpacked, rsid="00AB12CD")
+        return self.doc
+
+    def paragraph(self, index=0):
+        return self.doc["word/document.xml"].dom.getElementsByTagName("w:p")[index]
+
+    def pieces(self, index=0):
+        """The paragraph's runs in order as (kind, text), where kind is "" for
+        unchanged text, "ins" for insertions and "del" for deletions."""
+        result = []
+        for child in self.paragraph(index).childNodes:
+            if child.nodeType != child.ELEMENT_NODE:
+                continue
+            kind = {"w:r": "", "w:ins": "ins", "w:del": "del"}[child.tagName]
+            tag = "w:delText" if kind == "del" else "w:t"
+            text = "".join(
+                node.firstChild.data if node.firstChild else ""
+                for node in child.getElementsByTagName(tag)
+            )
+            result.append((kind, text))
+        return result
+
+    def change(self, index, new_text):
+        editor = self.doc["word/document.xml"]
+        return editor.suggest_text_change(self.paragraph(index), new_text)
+
+    def test_append(self):
+        self.load(["Hello"])
+        self.assertTrue(self.change(0, "Hello world"))
+        self.assertEqual(self.pieces(), [("", "Hello"), ("ins", " world")])
+
+    def test_insert_at_run_boundary(self):
+        self.load(["First ", "second"])
+        self.change(0, "First and second")
+        self.assertEqual(
+            self.pieces(), [("", "First "), ("ins", "and "), ("", "second")]
+        )
+
+    def test_insert_at_paragraph_start(self):
+        self.load(["quick ", "fox"])
+        self.change(0, "The quick fox")
+        self.assertEqual(
+            self.pieces(), [("ins", "The "), ("", "quick "), ("", "fox")]
+        )
+
+    def test_replacement_spanning_runs(self):
+        self.load(["Pay within 30 ", "days of receipt."])
+        self.change(0, "Pay within 45 weeks of receipt.")
+        self.assertEqual(
+            self.pieces(),
+            [
+                ("", "Pay within "),
+                ("del", "30 "),
+                ("del", "days"),
+                ("ins", "45 weeks"),
+                ("", " of receipt."),
+            ],
+        )
+
+    def test_preserves_run_properties(self):
+        self.load([("Bold", "<w:rPr><w:b/></w:rPr>"), " plain"])
+        self.change(0, "Very bold plain")
+        para = self.paragraph()
+        self.assertEqual(
+            self.pieces(), [("del", "Bold"), ("ins", "Very bold"), ("", " plain")]
+        )
+        for tag in ("w:del", "w:ins"):
+            (wrapper,) = para.getElementsByTagName(tag)
+            self.assertEqual(len(wrapper.getElementsByTagName("w:b")), 1)
+            self.assertEqual(wrapper.getAttribute("w:author"), "Claude")
+
+    def test_unchanged_text(self):
+        self.load(["Same text"])
+        self.assertFalse(self.change(0, "Same text"))
+        self.assertEqual(self.pieces(), [("", "Same text")])
+
+    def test_batch(self):
+        doc = self.load(["Hello"], ["Keep me"], ["Due in 30 days"])
+        changed = doc.suggest_text_changes(
+            {"P0": "Hello world", "P1": "Keep me", "P2": "Due in 45 days"}
+        )
+        self.assertEqual(changed, ["P0", "P2"])
+        self.assertEqual(self.pieces(0), [("", "Hello"), ("ins", " world")])
+        self.assertEqual(self.pieces(1), [("", "Keep me")])
+        self.assertEqual(
+            self.pieces(2),
+            [("", "Due in "), ("del", "30"), ("ins", "45"), ("", " days")],
+        )
+        dom = doc["word/document.xml"].dom
+        ids = [
+            elem.getAttribute("w:id")
+            for tag in ("w:ins", "w:del")
+            for elem in dom.getElementsByTagName(tag)
+        ]
+        self.assertEqual(len(set(ids)), len(ids))
+
+        with self.assertRaises(ValueError):
+            doc.suggest_text_changes({"MISSING": "text"})
+
+    def test_failed_batch_leaves_document_unchanged(self):
+        # P1 has no text runs to edit
+        doc = self.load(["Hello"], [])
+        with self.assertRaisesRegex(ValueError, "no text runs"):
+            doc.suggest_text_changes({"P0": "Hello world", "P1": "New text"})
+        self.assertEqual(self.pieces(0), [("", "Hello")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@
 # ///
 
 from dataclasses import dataclass
+import heapq
 import json
 import sys
 
@@ -19,36 +20,66 @@ class RectAndField:
     field: dict
 
 
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
+
+# Returns the first `limit` pairs (i, j), i < j, of rects on the same page that
+# intersect, in sorted order. Each page is swept from top to bottom, so a rect is only
+# compared with the rects whose vertical extent overlaps its own (usually those in
+# the same row of the form). Pages are swept in the order of their first rect, and
+# pages that start after the last pair found so far are skipped.
+def first_intersecting_pairs(rects_and_fields, limit):
+    pages = {}
+    for i, rf in enumerate(rects_and_fields):
+        pages.setdefault(rf.field["page_number"], []).append(i)
+    pairs = []
+    for indices in pages.values():
+        if len(pairs) == limit and pairs[-1][0] < indices[0]:
+            continue
+        active = []
+        for j in sorted(indices, key=lambda k: rects_and_fields[k].rect[1]):
+            rj = rects_and_fields[j].rect
+            active = [i for i in active if rects_and_fields[i].rect[3] > rj[1]]
+            for i in active:
+                if rects_intersect(rects_and_fields[i].rect, rj):
+                    pairs.append((min(i, j), max(i, j)))
+            active.append(j)
+        pairs = heapq.nsmallest(limit, pairs)
+    return pairs
+
+
 # Returns a list of messages that are printed to stdout for Claude to read.
 def get_bounding_box_messages(fields_json_stream) -> list[str]:
     messages = []
     fields = json.load(fields_json_stream)
     messages.append(f"Read {len(fields['form_fields'])} fields")
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
-
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    # Messages are reported in (i, j) order and checking stops after 20 messages, so
+    # the 20 first intersecting pairs are all that can ever be reported.
+    intersections = {}
+    for i, j in first_intersecting_pairs(rects_and_fields, 20):
+        intersections.setdefault(i, []).append(j)
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in intersections.get(i, []):
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
+            has_error = True
+            if ri.field is rj.field:
+                messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+            else:
+                messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+            if len(messages) >= 20:
+                messages.append("Aborting further checks; fix bounding boxes and try again")
+                return messages
         if ri.rect_type == "entry":
             if "entry_text" in ri.field:
                 font_size = ri.field["entry_text"].get("font_size", 14)
@@ -0,0 +1,40 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = []
+# ///
+
+import io
+import json
+import random
+import time
+
+from check_bounding_boxes import get_bounding_box_messages
+from check_bounding_boxes_test import random_form, reference_get_bounding_box_messages
+
+
+# Benchmarks get_bounding_box_messages against the original pairwise check on
+# large forms, after checking that both produce identical messages.
+#
+# Usage: python check_bounding_boxes_benchmark.py
+
+
+def timed(check, data):
+    text = json.dumps(data)
+    start = time.perf_counter()
+    messages = check(io.StringIO(text))
+    return messages, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    print("Bounding box checks (rows of label/entry pairs, 25 fields per page)")
+    for num_fields in (100, 500, 1500):
+        for jitter, outcome in ((0, "valid"), (40, "aborting")):
+            data = random_form(rng, num_fields, max(num_fields // 25, 1), jitter)
+            old, old_time = timed(reference_get_bounding_box_messages, data)
+            new, new_time = timed(get_bounding_box_messages, data)
+            assert old == new, "messages differ from the pairwise check"
+            print(
+                f"  {num_fields:>5} fields, {outcome:>8}: pairwise {old_time * 1000:8.1f} ms, "
+                f"sweep line {new_time * 1000:8.1f} ms ({old_time / new_time:5.1f}x)"
+            )
@@ -6,7 +6,74 @@
 import unittest
 import json
 import io
-from check_bounding_boxes import get_bounding_box_messages
+import random
+from check_bounding_boxes import RectAndField, get_bounding_box_messages, rects_intersect
+
+
+def reference_get_bounding_box_messages(fields_json_stream):
+    """The original check, which compares every pair of rects."""
+    messages = []
+    fields = json.load(fields_json_stream)
+    messages.append(f"Read {len(fields['form_fields'])} fields")
+
+    rects_and_fields = []
+    for f in fields["form_fields"]:
+        rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
+        rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+
+    has_error = False
+    for i, ri in enumerate(rects_and_fields):
+        for j in range(i + 1, len(rects_and_fields)):
+            rj = rects_and_fields[j]
+            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
+                has_error = True
+                if ri.field is rj.field:
+                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+                else:
+                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+                if len(messages) >= 20:
+                    messages.append("Aborting further checks; fix bounding boxes and try again")
+                    return messages
+        if ri.rect_type == "entry":
+            if "entry_text" in ri.field:
+                font_size = ri.field["entry_text"].get("font_size", 14)
+                entry_height = ri.rect[3] - ri.rect[1]
+                if entry_height < font_size:
+                    has_error = True
+                    messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
+                    if len(messages) >= 20:
+                        messages.append("Aborting further checks; fix bounding boxes and try again")
+                        return messages
+
+    if not has_error:
+        messages.append("SUCCESS: All bounding boxes are valid")
+    return messages
+
+
+def random_form(rng, num_fields, num_pages=1, jitter=0):
+    """Build a fields.json dict laid out in rows of label/entry pairs, with boxes
+    moved by up to `jitter` so that some of them intersect."""
+    fields = []
+    for k in range(num_fields):
+        page, row = divmod(k, max(num_fields // num_pages, 1))
+        row, column = divmod(row, 3)
+        x, y = 10 + column * 200, 10 + row * 25
+
+        def box(left, width):
+            dx, dy = rng.randint(-jitter, jitter), rng.randint(-jitter, jitter)
+            return [left + dx, y + dy, left + width + dx, y + 20 + dy]
+
+        field = {
+            "description": f"Field{k}",
+            "page_number": page + 1,
+            "label_bounding_box": box(x, 60),
+            "entry_bounding_box": box(x + 70, 110),
+        }
+        if rng.random() < 0.5:
+            font_size = 22 if rng.random() < 0.02 else rng.choice([10, 14])
+            field["entry_text"] = {"text": "x", "font_size": font_size}
+        fields.append(field)
+    return {"form_fields": fields}
 
 
 # Currently this is not run automatically in CI; it's just for documentation and manual checking.
@@ -226,6 +293,22 @@ class TestGetBoundingBoxMessages(unittest.TestCase):
         self.assertTrue(any("SUCCESS" in msg for msg in messages))
         self.assertFalse(any("FAILURE" in msg for msg in messages))
     
+    def test_matches_pairwise_check(self):
+        """Test that messages match comparing every pair of rects, including where
+        checking aborts"""
+        rng = random.Random(0)
+        for jitter in (0, 3, 6, 40):
+            for num_pages in (1, 3, 5):
+                with self.subTest(jitter=jitter, num_pages=num_pages):
+                    data = random_form(rng, 40, num_pages, jitter)
+                    if num_pages == 5:
+                        # Fields of different pages interleaved
+                        rng.shuffle(data["form_fields"])
+                    self.assertEqual(
+                        get_bounding_box_messages(self.create_json_stream(data)),
+                        reference_get_bounding_box_messages(self.create_json_stream(data)),
+                    )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,41 +2,186 @@
 # /// script
 # dependencies = [
 #   "pdf2image>=1.16.0",
+#   "Pillow>=10.0.0",
 # ]
 # ///
 
+import argparse
+import hashlib
+import math
 import os
-import sys
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
 
 
 # Converts each page of a PDF to a PNG image.
+#
+# Pages are rendered one at a time directly at the size that fits `max_dim`, and
+# each PNG is written as soon as its page is ready, so memory use doesn't grow
+# with the number of pages. With a cache directory, rendered pages are kept
+# across runs and only pages that haven't been rendered before at this size are
+# rendered again.
 
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+DPI = 200
 
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
+
+def parse_page_ranges(spec, page_count):
+    # "1-3,7,10-" -> [1, 2, 3, 7, 10, ..., page_count]
+    pages = []
+    for part in spec.split(","):
+        first, dash, last = part.strip().partition("-")
+        first = int(first) if first else 1
+        last = (int(last) if last else page_count) if dash else first
+        pages.extend(range(max(first, 1), min(last, page_count) + 1))
+    return sorted(set(pages))
+
+
+def page_sizes(pdf_path, page_count):
+    # Returns {page number: (width, height)} in points of each page's MediaBox, as
+    # displayed after rotation, or an empty dict if pdfinfo doesn't report them.
+    # pdftoppm renders the MediaBox; pdfinfo's "Page N size" is the CropBox, which
+    # can be smaller, so the boxes are read with -box.
+    try:
+        result = subprocess.run(
+            ["pdfinfo", "-box", "-f", "1", "-l", str(page_count), str(pdf_path)],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return {}
+    sizes = {}
+    rotations = {}
+    for line in result.stdout.splitlines():
+        match = re.match(r"Page\s+(\d+)\s+(MediaBox|rot):\s+(.*)", line)
+        if not match:
+            continue
+        page = int(match.group(1))
+        if match.group(2) == "rot":
+            rotations[page] = int(float(match.group(3)))
+            continue
+        x0, y0, x1, y1 = (float(value) for value in match.group(3).split())
+        sizes[page] = (abs(x1 - x0), abs(y1 - y0))
+    for page, rotation in rotations.items():
+        if page in sizes and rotation % 180 == 90:
+            sizes[page] = sizes[page][::-1]
+    return sizes
+
+
+def fit_size(width, height, max_dim):
+    # Scale image if needed to keep width/height under `max_dim`
+    if width > max_dim or height > max_dim:
+        scale_factor = min(max_dim / width, max_dim / height)
+        return int(width * scale_factor), int(height * scale_factor)
+    return None
+
+
+def render_page(pdf_path, page, size_in_points, max_dim):
+    # Renders a single page, at the size that fits `max_dim` when the page size is
+    # known and otherwise at the full DPI followed by a resize.
+    size = None
+    if size_in_points:
+        width, height = (math.ceil(points * DPI / 72) for points in size_in_points)
+        size = fit_size(width, height, max_dim)
+    (image,) = convert_from_path(
+        pdf_path, dpi=DPI, first_page=page, last_page=page, size=size
+    )
+    if not size_in_points:
+        new_size = fit_size(*image.size, max_dim)
+        if new_size:
+            image = image.resize(new_size)
+    return image
+
+
+class PageCache:
+    # Rendered pages stored under a hash of the PDF's content, the page number
+    # and the rendering size, so an edited PDF never reuses stale images.
+
+    def __init__(self, cache_dir, pdf_path, max_dim):
+        os.makedirs(cache_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.prefix = os.path.join(
+            cache_dir, f"{digest.hexdigest()[:32]}-{DPI}dpi-{max_dim}px"
+        )
+
+    def get(self, page):
+        path = f"{self.prefix}-page_{page}.png"
+        return path if os.path.exists(path) else None
+
+    def put(self, page, image_path):
+        # Write to a temporary file first so a concurrent run never reads a
+        # partial image.
+        path = f"{self.prefix}-page_{page}.png"
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(image_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def convert_pages(pdf_path, output_dir, max_dim=1000, pages=None, workers=1, cache_dir=None):
+    # Yields (page number, image path, image size) for each page as it's saved, in
+    # page order.
+    page_count = pdfinfo_from_path(pdf_path)["Pages"]
+    if pages:
+        page_numbers = parse_page_ranges(pages, page_count)
+    else:
+        page_numbers = range(1, page_count + 1)
+    cache = PageCache(cache_dir, pdf_path, max_dim) if cache_dir else None
+    if cache and all(cache.get(page) for page in page_numbers):
+        sizes = {}
+    else:
+        sizes = page_sizes(pdf_path, page_count)
+
+    def convert_page(page):
+        image_path = os.path.join(output_dir, f"page_{page}.png")
+        cached_path = cache.get(page) if cache else None
+        if cached_path:
+            shutil.copyfile(cached_path, image_path)
+            with Image.open(image_path) as image:
+                return page, image_path, image.size
+        image = render_page(pdf_path, page, sizes.get(page), max_dim)
         image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
+        if cache:
+            cache.put(page, image_path)
+        return page, image_path, image.size
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        yield from executor.map(convert_page, page_numbers)
+
+
+def convert(pdf_path, output_dir, max_dim=1000, pages=None, workers=1, cache_dir=None):
+    num_pages = 0
+    for page, image_path, size in convert_pages(
+        pdf_path, output_dir, max_dim, pages, workers, cache_dir
+    ):
+        print(f"Saved page {page} as {image_path} (size: {size})")
+        num_pages += 1
 
-    print(f"Converted {len(images)} pages to PNG images")
+    print(f"Converted {num_pages} pages to PNG images")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: convert_pdf_to_images.py [input pdf] [output directory]")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    output_directory = sys.argv[2]
-    convert(pdf_path, output_directory)
+    parser = argparse.ArgumentParser(description="Convert each page of a PDF to a PNG image.")
+    parser.add_argument("pdf_path", help="Input PDF")
+    parser.add_argument("output_dir", help="Directory for the page_N.png images")
+    parser.add_argument("--max-dim", type=int, default=1000,
+                        help="Maximum width and height of the images (default: 1000)")
+    parser.add_argument("--pages", help="Pages to convert, such as 1-3,7 (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of pages rendered in parallel (default: number of CPUs)")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Directory for keeping rendered pages across runs; pages already "
+                        "rendered from the same PDF at the same size are copied from it")
+    args = parser.parse_args()
+    convert(args.pdf_path, args.output_dir, args.max_dim, args.pages, args.workers, args.cache_dir)
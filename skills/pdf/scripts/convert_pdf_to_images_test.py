@@ -0,0 +1,178 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "pdf2image>=1.16.0",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pdf2image import convert_from_path
+from convert_pdf_to_images import DPI, convert_pages, fit_size
+from create_validation_image import create_validation_images
+
+
+# Fake poppler tools reading a "PDF" that is a JSON list of pages, each with a
+# MediaBox, a CropBox and a rotation. Like the real tools, pdfinfo reports the
+# CropBox as the page size and pdftoppm renders the MediaBox, stretching it to
+# -scale-to-x/-scale-to-y when given. pdftoppm logs the pages it renders to
+# pdftoppm.log beside it.
+FAKE_PDFINFO = f"""#!{sys.executable}
+import json, sys
+
+args = sys.argv[1:]
+pages = json.load(open(args[-1]))
+print(f"Pages:          {{len(pages)}}")
+if "-f" in args:
+    for number, page in enumerate(pages, 1):
+        print(f"Page {{number:4}} size: {{page['crop'][0]}} x {{page['crop'][1]}} pts")
+        print(f"Page {{number:4}} rot:  {{page['rot']}}")
+        if "-box" in args:
+            print(f"Page {{number:4}} MediaBox: 0 0 {{page['media'][0]}} {{page['media'][1]}}")
+            print(f"Page {{number:4}} CropBox: 0 0 {{page['crop'][0]}} {{page['crop'][1]}}")
+"""
+
+FAKE_PDFTOPPM = f"""#!{sys.executable}
+import json, math, os, sys
+
+args = sys.argv[1:]
+option = lambda name, default: args[args.index(name) + 1] if name in args else default
+pages = json.load(open(next(arg for arg in args if arg.endswith(".pdf"))))
+first, last = int(option("-f", 1)), int(option("-l", len(pages)))
+with open(os.path.join(os.path.dirname(sys.argv[0]), "pdftoppm.log"), "a") as log:
+    log.write(f"{{first}}-{{last}}\\n")
+dpi = float(option("-r", 150))
+for page in pages[first - 1:last]:
+    width, height = page["crop" if "-cropbox" in args else "media"]
+    if page["rot"] % 180 == 90:
+        width, height = height, width
+    scale_x, scale_y = int(option("-scale-to-x", 0)), int(option("-scale-to-y", 0))
+    if scale_x > 0 and scale_y > 0:
+        width, height = scale_x, scale_y
+    else:
+        width, height = math.ceil(width * dpi / 72), math.ceil(height * dpi / 72)
+    sys.stdout.buffer.write(b"P6\\n%d %d\\n255\\n" % (width, height) + bytes(3 * width * height))
+"""
+
+PAGES = [
+    {"media": [612, 792], "crop": [612, 792], "rot": 0},
+    # Trimmed page whose CropBox has a different aspect ratio from its MediaBox
+    {"media": [612, 792], "crop": [500, 400], "rot": 0},
+    {"media": [595.3, 841.9], "crop": [595.3, 841.9], "rot": 90},
+    {"media": [200, 100], "crop": [200, 100], "rot": 0},
+]
+
+
+class TestConvertPages(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for name, script in (("pdfinfo", FAKE_PDFINFO), ("pdftoppm", FAKE_PDFTOPPM)):
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "w") as f:
+                f.write(script)
+            os.chmod(path, 0o755)
+        patcher = mock.patch.dict(
+            os.environ, {"PATH": f"{self.tmpdir.name}:{os.environ['PATH']}"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.pdf_path = os.path.join(self.tmpdir.name, "document.pdf")
+        with open(self.pdf_path, "w") as f:
+            json.dump(PAGES, f)
+
+    def test_sizes_match_full_render_then_resize(self):
+        for max_dim in (1000, 300, 5000):
+            with self.subTest(max_dim=max_dim):
+                # The original conversion: render every page at the full DPI and
+                # shrink it afterwards
+                expected = []
+                for image in convert_from_path(self.pdf_path, dpi=DPI):
+                    expected.append(fit_size(*image.size, max_dim) or image.size)
+
+                output_dir = tempfile.mkdtemp(dir=self.tmpdir.name)
+                sizes = [
+                    size
+                    for _, _, size in convert_pages(self.pdf_path, output_dir, max_dim)
+                ]
+                self.assertEqual(sizes, expected)
+
+    def rendered_pages(self):
+        """The pages pdftoppm rendered since the last call, as "first-last"."""
+        log_path = os.path.join(self.tmpdir.name, "pdftoppm.log")
+        if not os.path.exists(log_path):
+            return []
+        with open(log_path) as f:
+            calls = f.read().split()
+        os.remove(log_path)
+        return calls
+
+    def convert(self, max_dim=1000, pages=None):
+        """Convert into a new directory with the cache, returning {page: (path, size)}."""
+        output_dir = tempfile.mkdtemp(dir=self.tmpdir.name)
+        cache_dir = os.path.join(self.tmpdir.name, "cache")
+        return {
+            page: (path, size)
+            for page, path, size in convert_pages(
+                self.pdf_path, output_dir, max_dim, pages, cache_dir=cache_dir
+            )
+        }
+
+    def test_cache_reuses_rendered_pages(self):
+        first = self.convert()
+        self.assertEqual(self.rendered_pages(), ["1-1", "2-2", "3-3", "4-4"])
+
+        second = self.convert()
+        self.assertEqual(self.rendered_pages(), [])
+        for page, (path, size) in second.items():
+            self.assertEqual(size, first[page][1])
+            with open(path, "rb") as copy, open(first[page][0], "rb") as original:
+                self.assertEqual(copy.read(), original.read())
+
+        # Only pages missing from the cache are rendered
+        self.assertEqual(len(self.convert(max_dim=500, pages="2-3")), 2)
+        self.assertEqual(self.rendered_pages(), ["2-2", "3-3"])
+        self.convert(max_dim=500)
+        self.assertEqual(self.rendered_pages(), ["1-1", "4-4"])
+
+    def test_changed_pdf_misses_cache(self):
+        self.convert()
+        self.rendered_pages()
+        # Same pages and sizes, different bytes
+        with open(self.pdf_path, "w") as f:
+            json.dump(PAGES, f, indent=1)
+
+        self.convert()
+        self.assertEqual(self.rendered_pages(), ["1-1", "2-2", "3-3", "4-4"])
+
+    def test_validation_images_for_pages_with_fields(self):
+        box = [10, 10, 50, 20]
+        fields = {
+            "form_fields": [
+                {"page_number": page, "entry_bounding_box": box, "label_bounding_box": box}
+                for page in (3, 1, 3)
+            ]
+        }
+        fields_path = os.path.join(self.tmpdir.name, "fields.json")
+        with open(fields_path, "w") as f:
+            json.dump(fields, f)
+        output_dir = tempfile.mkdtemp(dir=self.tmpdir.name)
+
+        with mock.patch("builtins.print"):
+            create_validation_images(fields_path, self.pdf_path, output_dir)
+        self.assertEqual(
+            sorted(os.listdir(output_dir)),
+            ["validation_page_1.png", "validation_page_3.png"],
+        )
+        self.assertEqual(self.rendered_pages(), ["1-1", "3-3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
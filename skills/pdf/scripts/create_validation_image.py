@@ -1,45 +1,94 @@
 #!/usr/bin/env -S uv run
 # /// script
 # dependencies = [
+#   "pdf2image>=1.16.0",
 #   "Pillow>=10.0.0",
 # ]
 # ///
 
+import argparse
 import json
+import os
 import sys
+import tempfile
 
 from PIL import Image, ImageDraw
 
+from convert_pdf_to_images import convert_pages
+
 
 # Creates "validation" images with rectangles for the bounding box information that
 # Claude creates when determining where to add text annotations in PDFs. See forms.md.
 
 
+def draw_boxes(data, page_number, input_path, output_path):
+    img = Image.open(input_path)
+    draw = ImageDraw.Draw(img)
+    num_boxes = 0
+
+    for field in data["form_fields"]:
+        if field["page_number"] == page_number:
+            entry_box = field['entry_bounding_box']
+            label_box = field['label_bounding_box']
+            # Draw red rectangle over entry bounding box and blue rectangle over the label.
+            draw.rectangle(entry_box, outline='red', width=2)
+            draw.rectangle(label_box, outline='blue', width=2)
+            num_boxes += 2
+
+    img.save(output_path)
+    print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+
+
 def create_validation_image(page_number, fields_json_path, input_path, output_path):
     # Input file should be in the `fields.json` format described in forms.md.
     with open(fields_json_path, 'r') as f:
         data = json.load(f)
+    draw_boxes(data, page_number, input_path, output_path)
+
+
+def create_validation_images(fields_json_path, pdf_path, output_dir, max_dim=1000, workers=1, cache_dir=None):
+    # Creates validation_page_N.png in `output_dir` for every page with fields, in
+    # one run. Pages are rendered as by convert_pdf_to_images.py, so with the same
+    # cache directory the page images it rendered are reused instead of rendered
+    # again.
+    with open(fields_json_path, 'r') as f:
+        data = json.load(f)
+    pages = sorted({field["page_number"] for field in data["form_fields"]})
+    if not pages:
+        print("No form fields found")
+        return
 
-        img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        num_boxes = 0
-        
-        for field in data["form_fields"]:
-            if field["page_number"] == page_number:
-                entry_box = field['entry_bounding_box']
-                label_box = field['label_bounding_box']
-                # Draw red rectangle over entry bounding box and blue rectangle over the label.
-                draw.rectangle(entry_box, outline='red', width=2)
-                draw.rectangle(label_box, outline='blue', width=2)
-                num_boxes += 2
-        
-        img.save(output_path)
-        print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        page_images = convert_pages(
+            pdf_path, temp_dir, max_dim, ",".join(map(str, pages)), workers, cache_dir
+        )
+        for page, image_path, _ in page_images:
+            output_path = os.path.join(output_dir, f"validation_page_{page}.png")
+            draw_boxes(data, page, image_path, output_path)
 
 
 if __name__ == "__main__":
+    if any(arg.startswith("--") for arg in sys.argv[1:]):
+        parser = argparse.ArgumentParser(
+            description="Create validation images for every page with fields.",
+            usage="create_validation_image.py --pdf [input pdf] [fields.json file] [output directory]",
+        )
+        parser.add_argument("--pdf", required=True, help="PDF the fields belong to")
+        parser.add_argument("fields_json_path")
+        parser.add_argument("output_dir")
+        parser.add_argument("--max-dim", type=int, default=1000,
+                            help="Maximum width and height of the page images (default: 1000)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Number of pages rendered in parallel (default: number of CPUs)")
+        parser.add_argument("--cache-dir", metavar="DIR",
+                            help="Directory of rendered pages shared with convert_pdf_to_images.py")
+        args = parser.parse_args()
+        create_validation_images(args.fields_json_path, args.pdf, args.output_dir,
+                                 args.max_dim, args.workers, args.cache_dir)
+        sys.exit(0)
     if len(sys.argv) != 5:
         print("Usage: create_validation_image.py [page number] [fields.json file] [input image path] [output image path]")
+        print("   or: create_validation_image.py --pdf [input pdf] [fields.json file] [output directory] [--cache-dir DIR]")
         sys.exit(1)
     page_number = int(sys.argv[1])
     fields_json_path = sys.argv[2]
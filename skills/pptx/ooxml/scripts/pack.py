@@ -20,6 +20,12 @@ import defusedxml.minidom
 import zipfile
 from pathlib import Path
 
+# Validation runs on the shared LibreOffice pool when one is started
+sys.path.insert(
+    0, str(Path(__file__).parent.parent.parent.parent.parent / "scripts")
+)
+from libreoffice import ConversionError, convert_document
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
@@ -105,25 +111,12 @@ def validate_document(doc_path):
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
-            if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
-                print(f"Validation error: {error_msg}", file=sys.stderr)
-                return False
+            convert_document(doc_path, temp_dir, filter_name, timeout=10)
             return True
+        except ConversionError as e:
+            error_msg = str(e).strip() or "Document validation failed"
+            print(f"Validation error: {error_msg}", file=sys.stderr)
+            return False
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
@@ -0,0 +1,596 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "lxml>=4.9.0",
+# ]
+# ///
+"""
+Assemble a presentation from slides of several PowerPoint files.
+
+Usage:
+    skills/pptx/scripts/assemble.py output.pptx intro.pptx:0,2 sales.pptx:4,4 intro.pptx:7
+
+Each argument after the output names a deck and the 0-based slides to take
+from it; slides are added in the order given. The first deck is the base:
+its slide size, notes master and other presentation settings are kept.
+
+Slide layouts, masters (with their themes) and media that are identical in
+content are stored once, so 200 slides using the same logo or master add
+them only once. Links between slides are kept when both slides are
+assembled and dropped otherwise. Comments of imported slides keep their
+authors, which are merged into the base deck's list of comment authors.
+"""
+
+import argparse
+import copy
+import hashlib
+import posixpath
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import lxml.etree
+from rearrange import (
+    P_NS,
+    R_NS,
+    PackageParts,
+    duplicate_slide,
+    new_slide_id,
+    numbered_partname,
+    set_slide_list,
+)
+
+# Relationship types whose targets are shared by content instead of copied.
+# Themes are not: each slide master needs a theme part of its own, so a theme
+# is only shared together with the master that uses it.
+SHARED_RELATIONSHIPS = {
+    "slideLayout",
+    "slideMaster",
+    "image",
+    "media",
+    "audio",
+    "video",
+}
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+SLIDE_MASTER_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideMaster"
+)
+# Slide master and layout IDs share one range starting at 2^31
+MIN_MASTER_ID = 2147483648
+
+# Comments refer to their authors by IDs into a list kept for the whole deck:
+# commentAuthors.xml for classic comments, authors.xml (with GUID IDs) for
+# modern ones
+COMMENT_AUTHORS_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/commentAuthors"
+)
+COMMENT_AUTHORS_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.commentAuthors+xml"
+)
+COMMENTS_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.comments+xml"
+)
+MODERN_AUTHORS_RELATIONSHIP = (
+    "http://schemas.microsoft.com/office/2018/10/relationships/authors"
+)
+MODERN_AUTHORS_CONTENT_TYPE = "application/vnd.ms-powerpoint.authors+xml"
+MODERN_COMMENTS_CONTENT_TYPE = "application/vnd.ms-powerpoint.comments+xml"
+P188_NS = "{http://schemas.microsoft.com/office/powerpoint/2018/8/main}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Assemble a presentation from slides of several PowerPoint files.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python assemble.py output.pptx intro.pptx:0,2 sales.pptx:4,4 intro.pptx:7
+    Creates output.pptx with slides 0 and 2 of intro.pptx, slide 4 of
+    sales.pptx twice, then slide 7 of intro.pptx
+
+Note: Slide indices are 0-based (first slide is 0, second is 1, etc.)
+        """,
+    )
+
+    parser.add_argument("output", help="Path for output PPTX file")
+    parser.add_argument(
+        "slides",
+        nargs="+",
+        help="Deck and comma-separated slide indices (0-based), e.g. deck.pptx:0,3",
+    )
+
+    args = parser.parse_args()
+
+    # Parse the slide sequence
+    slide_sequence = []
+    for spec in args.slides:
+        path, _, indices = spec.rpartition(":")
+        try:
+            slide_sequence.extend(
+                (Path(path), int(x.strip())) for x in indices.split(",")
+            )
+        except ValueError:
+            print(
+                f"Error: Invalid slides '{spec}'. Use deck.pptx followed by "
+                "comma-separated integers (e.g., deck.pptx:0,34,34)"
+            )
+            sys.exit(1)
+        if not path:
+            print(f"Error: No deck given for slides '{spec}'")
+            sys.exit(1)
+
+    # Check decks exist
+    for path in dict.fromkeys(path for path, _ in slide_sequence):
+        if not path.exists():
+            print(f"Error: Deck not found: {path}")
+            sys.exit(1)
+
+    # Create output directory if needed
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        assemble_presentation(output_path, slide_sequence)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error assembling presentation: {e}")
+        sys.exit(1)
+
+
+class DeckAssembler:
+    """Builds one package from slides of several decks.
+
+    The output starts as a copy of the base deck. Slides of other decks are
+    imported with everything they refer to; parts reached through shared
+    relationship types (layouts, masters, media) are fingerprinted
+    by their content and that of the parts they refer to, and imported only
+    if the output has no part with the same fingerprint.
+    """
+
+    def __init__(self, base_path: Path, deduplicate: bool = True):
+        """Start an output package from the base deck.
+
+        Args:
+            base_path: Deck whose presentation settings the output keeps
+            deduplicate: Share identical layouts, masters and media.
+                If False, every imported slide gets its own copy of them.
+        """
+        self.package = PackageParts(base_path)
+        self.deduplicate = deduplicate
+        self.decks: Dict[Path, PackageParts] = {base_path.resolve(): self.package}
+        # Source part -> output part name, keyed by (id(source), partname)
+        self._imported: Dict[Tuple[int, str], str] = {}
+        # Fingerprint -> output part name
+        self._shared: Dict[str, str] = {}
+        self._blob_hashes: Dict[Tuple[int, str], bytes] = {}
+        self._slide_partnames: Dict[int, List[str]] = {}
+        # (id(source), source slide) -> output slide, for the first copy of each
+        self.placements: Dict[Tuple[int, str], str] = {}
+        # (output slide, rId) -> (source, source slide) of links between slides
+        self._slide_links: Dict[Tuple[str, str], Tuple[PackageParts, str]] = {}
+        self.reused = 0
+
+        originals = self.package.slide_ids()
+        self._next_sld_id = max((int(s.get("id")) for s in originals), default=255) + 1
+        presentation = self.package.element(self.package.presentation_partname)
+        ids = [int(e.get("id")) for e in presentation.iter(f"{P_NS}sldMasterId")]
+        for master in self.package.related_parts(
+            self.package.presentation_partname
+        ).values():
+            if "slideMaster" in (self.package.content_type(master) or ""):
+                ids += [
+                    int(e.get("id"))
+                    for e in self.package.element(master).iter(f"{P_NS}sldLayoutId")
+                ]
+        self._next_master_id = max(ids + [MIN_MASTER_ID - 1]) + 1
+
+        if deduplicate:
+            self._index_shared_parts(self.package)
+
+    def deck(self, path: Path) -> PackageParts:
+        """Get a source deck, reading it on first use."""
+        key = path.resolve()
+        if key not in self.decks:
+            self.decks[key] = PackageParts(path)
+        return self.decks[key]
+
+    def slide_partnames(self, source: PackageParts) -> List[str]:
+        """Get the part names of a deck's slides, in order."""
+        if id(source) not in self._slide_partnames:
+            related = source.related_parts(source.presentation_partname)
+            self._slide_partnames[id(source)] = [
+                related[sldId.get(f"{R_NS}id")] for sldId in source.slide_ids()
+            ]
+        return self._slide_partnames[id(source)]
+
+    def _blob_hash(self, source: PackageParts, partname: str) -> bytes:
+        key = (id(source), partname)
+        if key not in self._blob_hashes:
+            self._blob_hashes[key] = hashlib.sha256(source.blobs[partname]).digest()
+        return self._blob_hashes[key]
+
+    def fingerprint(
+        self, source: PackageParts, partname: str, stack: Set[str] = frozenset()
+    ) -> str:
+        """Hash a part's content type, content and everything it refers to.
+
+        Parts related in a cycle (a master and its layouts) contribute only
+        their own content when reached again.
+        """
+        digest = hashlib.sha256()
+        digest.update(str(source.content_type(partname)).encode())
+        digest.update(self._blob_hash(source, partname))
+        if not source.has_relationships(partname):
+            return digest.hexdigest()
+        stack = stack | {partname}
+        related = source.related_parts(partname)
+        for rel in source.relationships(partname):
+            rId = rel.get("Id", "")
+            digest.update(f"\0{rId}\0{rel.get('Type')}\0".encode())
+            target = related.get(rId)
+            if target is None or target not in source.blobs:
+                digest.update(rel.get("Target", "").encode())
+            elif target in stack:
+                digest.update(self._blob_hash(source, target))
+            else:
+                digest.update(self.fingerprint(source, target, stack).encode())
+        return digest.hexdigest()
+
+    def _index_shared_parts(self, package: PackageParts) -> None:
+        """Fingerprint the shared parts already in the output."""
+        shared: Set[str] = set()
+        for partname in [""] + list(package.reachable_parts()):
+            if not package.has_relationships(partname):
+                continue
+            related = package.related_parts(partname)
+            for rel in package.relationships(partname):
+                target = related.get(rel.get("Id"))
+                if target in package.blobs and is_shared(rel.get("Type", "")):
+                    shared.add(target)
+        for partname in sorted(shared):
+            self._shared.setdefault(self.fingerprint(package, partname), partname)
+
+    def import_part(self, source: PackageParts, partname: str, shared: bool) -> str:
+        """Copy a part and everything it refers to into the output.
+
+        Args:
+            source: Deck the part belongs to
+            partname: Name of the part in the source deck
+            shared: Whether the part may be shared with identical parts
+
+        Returns:
+            Name of the part in the output
+        """
+        if source is self.package:
+            return partname
+        key = (id(source), partname)
+        if key in self._imported:
+            return self._imported[key]
+
+        fingerprint = None
+        if shared and self.deduplicate:
+            fingerprint = self.fingerprint(source, partname)
+            if fingerprint in self._shared:
+                self.reused += 1
+                self._imported[key] = self._shared[fingerprint]
+                return self._imported[key]
+
+        package = self.package
+        new_partname = partname
+        if partname in package.blobs:
+            new_partname = package.next_partname(numbered_partname(partname))
+        # Register before following relationships, which may lead back here
+        self._imported[key] = new_partname
+        if fingerprint:
+            self._shared[fingerprint] = new_partname
+        package.add_part(
+            new_partname, source.blobs[partname], source.content_type(partname)
+        )
+        self._copy_relationships(source, partname, new_partname)
+
+        content_type = source.content_type(partname) or ""
+        if "slideMaster" in content_type:
+            self._add_slide_master(new_partname)
+        elif content_type == COMMENTS_CONTENT_TYPE:
+            self._merge_comment_authors(source, new_partname)
+        elif content_type == MODERN_COMMENTS_CONTENT_TYPE:
+            self._merge_modern_comment_authors(source, new_partname)
+        return new_partname
+
+    def _copy_relationships(
+        self, source: PackageParts, partname: str, new_partname: str
+    ) -> None:
+        """Copy a part's relationships, importing their targets.
+
+        Notes are left out. Links to other slides are not followed; they are
+        retargeted by link_slides once all slides are assembled.
+        """
+        if not source.has_relationships(partname):
+            return
+        related = source.related_parts(partname)
+        relationships = self.package.relationships(new_partname)
+        for rel in source.relationships(partname):
+            rel_type = rel.get("Type", "")
+            if rel_type.endswith("/notesSlide"):
+                continue
+            rel = lxml.etree.fromstring(lxml.etree.tostring(rel))
+            target = related.get(rel.get("Id"))
+            if rel_type.endswith("/slide") and target is not None:
+                self._slide_links[(new_partname, rel.get("Id"))] = (source, target)
+            elif target is not None and target in source.blobs:
+                target = self.import_part(source, target, is_shared(rel_type))
+                rel.set(
+                    "Target",
+                    posixpath.relpath(target, posixpath.dirname(new_partname)),
+                )
+            relationships.append(rel)
+
+    def _add_slide_master(self, partname: str) -> None:
+        """List an imported slide master in the presentation with fresh IDs."""
+        package = self.package
+        presentation_partname = package.presentation_partname
+        presentation = package.element(presentation_partname)
+        for sldLayoutId in package.element(partname).iter(f"{P_NS}sldLayoutId"):
+            sldLayoutId.set("id", str(self._next_master_id))
+            self._next_master_id += 1
+
+        rId = package.add_relationship(
+            presentation_partname, SLIDE_MASTER_RELATIONSHIP, partname
+        )
+        sldMasterIdLst = presentation.find(f"{P_NS}sldMasterIdLst")
+        if sldMasterIdLst is None:
+            sldMasterIdLst = lxml.etree.Element(f"{P_NS}sldMasterIdLst")
+            presentation.insert(0, sldMasterIdLst)
+        sldMasterId = lxml.etree.SubElement(sldMasterIdLst, f"{P_NS}sldMasterId")
+        sldMasterId.set("id", str(self._next_master_id))
+        sldMasterId.set(f"{R_NS}id", rId)
+        self._next_master_id += 1
+
+    def _author_list(
+        self,
+        rel_type: str,
+        partname: str,
+        content_type: str,
+        root: lxml.etree._Element,
+    ) -> lxml.etree._Element:
+        """Get the root of the output's comment author list.
+
+        If the output has none, one is added with the given empty root.
+        """
+        package = self.package
+        presentation_partname = package.presentation_partname
+        existing = related_part(package, presentation_partname, rel_type)
+        if existing is not None:
+            return package.element(existing)
+        package.add_part(
+            partname,
+            lxml.etree.tostring(
+                root, xml_declaration=True, encoding="UTF-8", standalone=True
+            ),
+            content_type,
+        )
+        package.add_relationship(presentation_partname, rel_type, partname)
+        return package.element(partname)
+
+    def _merge_comment_authors(self, source: PackageParts, partname: str) -> None:
+        """Point the comments of an imported comments part at output authors.
+
+        Authors are matched by name and initials; those the output lacks are
+        added to its commentAuthors.xml. Comment indices must be unique per
+        author, so each comment is numbered past its author's lastIdx.
+        """
+        source_authors = {}
+        source_list = related_part(
+            source, source.presentation_partname, COMMENT_AUTHORS_RELATIONSHIP
+        )
+        if source_list is not None:
+            for author in source.element(source_list).iter(f"{P_NS}cmAuthor"):
+                source_authors[author.get("id")] = author
+        authors = self._author_list(
+            COMMENT_AUTHORS_RELATIONSHIP,
+            "ppt/commentAuthors.xml",
+            COMMENT_AUTHORS_CONTENT_TYPE,
+            lxml.etree.Element(f"{P_NS}cmAuthorLst", nsmap={"p": P_NS[1:-1]}),
+        )
+        by_name = {
+            (author.get("name"), author.get("initials")): author
+            for author in authors.iter(f"{P_NS}cmAuthor")
+        }
+
+        for comment in self.package.element(partname).iter(f"{P_NS}cm"):
+            original = source_authors.get(comment.get("authorId"))
+            name = original.get("name", "") if original is not None else ""
+            initials = original.get("initials", "") if original is not None else ""
+            author = by_name.get((name, initials))
+            if author is None:
+                ids = [int(a.get("id")) for a in authors.iter(f"{P_NS}cmAuthor")]
+                author = lxml.etree.SubElement(
+                    authors,
+                    f"{P_NS}cmAuthor",
+                    id=str(max(ids, default=-1) + 1),
+                    name=name,
+                    initials=initials,
+                    lastIdx="0",
+                    clrIdx=str(len(ids)),
+                )
+                by_name[(name, initials)] = author
+            idx = int(author.get("lastIdx", "0")) + 1
+            author.set("lastIdx", str(idx))
+            comment.set("authorId", author.get("id"))
+            comment.set("idx", str(idx))
+
+    def _merge_modern_comment_authors(
+        self, source: PackageParts, partname: str
+    ) -> None:
+        """Add the authors of an imported modern comments part to the output.
+
+        Modern comments refer to authors by GUID, so the IDs stay valid once
+        the authors are in the output's authors.xml.
+        """
+        source_list = related_part(
+            source, source.presentation_partname, MODERN_AUTHORS_RELATIONSHIP
+        )
+        if source_list is None:
+            return
+        authors = self._author_list(
+            MODERN_AUTHORS_RELATIONSHIP,
+            "ppt/authors.xml",
+            MODERN_AUTHORS_CONTENT_TYPE,
+            lxml.etree.Element(f"{P188_NS}authorLst", nsmap={"p188": P188_NS[1:-1]}),
+        )
+        known = {author.get("id") for author in authors.iter(f"{P188_NS}author")}
+        used = {
+            element.get("authorId")
+            for element in self.package.element(partname).iter()
+            if element.get("authorId")
+        }
+        for author in source.element(source_list).iter(f"{P188_NS}author"):
+            if author.get("id") in used and author.get("id") not in known:
+                authors.append(copy.deepcopy(author))
+                known.add(author.get("id"))
+
+    def import_slide(self, source: PackageParts, index: int) -> lxml.etree._Element:
+        """Copy a slide of another deck and return the p:sldId element for it."""
+        if not self.deduplicate:
+            # Naive copying: nothing is shared between imported slides
+            self._imported.clear()
+        slide_partname = self.slide_partnames(source)[index]
+
+        package = self.package
+        partname = package.next_partname("ppt/slides/slide%d.xml")
+        package.add_part(
+            partname,
+            source.blobs[slide_partname],
+            source.content_type(slide_partname),
+        )
+        self._copy_relationships(source, slide_partname, partname)
+        self.placements.setdefault((id(source), slide_partname), partname)
+        return new_slide_id(package, partname, self.next_slide_id())
+
+    def link_slides(self, slide_partnames: List[str]) -> None:
+        """Point links between slides at the assembled copies of their targets.
+
+        Links to slides that were not assembled are removed, with the
+        hyperlinks using them, so no slide outside the slide list is kept.
+
+        Args:
+            slide_partnames: Output part names of all assembled slides
+        """
+        package = self.package
+        for partname in slide_partnames:
+            if not package.has_relationships(partname):
+                continue
+            relationships = package.relationships(partname)
+            related = None
+            for rel in list(relationships):
+                if not rel.get("Type", "").endswith("/slide"):
+                    continue
+                rId = rel.get("Id")
+                origin = self._slide_links.get((partname, rId))
+                if origin is None:
+                    # A slide of the base deck linking within the base deck
+                    if related is None:
+                        related = package.related_parts(partname)
+                    origin = (package, related.get(rId))
+                target = self.placements.get((id(origin[0]), origin[1]))
+                if target is not None:
+                    rel.set(
+                        "Target",
+                        posixpath.relpath(target, posixpath.dirname(partname)),
+                    )
+                    continue
+                relationships.remove(rel)
+                slide = package.element(partname)
+                hyperlinks = slide.iter(f"{A_NS}hlinkClick", f"{A_NS}hlinkHover")
+                for link in list(hyperlinks):
+                    if link.get(f"{R_NS}id") == rId:
+                        link.getparent().remove(link)
+
+    def next_slide_id(self) -> int:
+        """Get an unused slide ID for a p:sldId element."""
+        self._next_sld_id += 1
+        return self._next_sld_id - 1
+
+
+def related_part(
+    package: PackageParts, partname: str, rel_type: str
+) -> Optional[str]:
+    """Get the first part related to partname by a relationship type, if any."""
+    related = package.related_parts(partname)
+    for rel in package.relationships(partname):
+        target = related.get(rel.get("Id"))
+        if rel.get("Type") == rel_type and target in package.blobs:
+            return target
+    return None
+
+
+def is_shared(rel_type: str) -> bool:
+    """Whether targets of a relationship type are shared by content."""
+    return rel_type.rsplit("/", 1)[-1] in SHARED_RELATIONSHIPS
+
+
+def assemble_presentation(
+    output_path: Path,
+    slide_sequence: List[Tuple[Path, int]],
+    deduplicate: bool = True,
+) -> None:
+    """
+    Create a presentation from slides of several decks in the specified order.
+
+    Args:
+        output_path: Path for output PPTX file
+        slide_sequence: List of (deck path, 0-based slide index) to include
+        deduplicate: Store identical layouts, masters and media once
+    """
+    if not slide_sequence:
+        raise ValueError("No slides to assemble")
+    base_path = slide_sequence[0][0]
+    assembler = DeckAssembler(base_path, deduplicate)
+    base = assembler.package
+
+    # Validate indices
+    for path, idx in slide_sequence:
+        total_slides = len(assembler.slide_partnames(assembler.deck(path)))
+        if idx < 0 or idx >= total_slides:
+            raise ValueError(
+                f"Slide index {idx} of {path} out of range (0-{total_slides - 1})"
+            )
+
+    decks = {id(assembler.deck(path)) for path, _ in slide_sequence}
+    print(f"Assembling {len(slide_sequence)} slides from {len(decks)} decks...")
+    originals = base.slide_ids()
+    final: List[lxml.etree._Element] = []
+    used: Set[int] = set()
+    for i, (path, idx) in enumerate(slide_sequence):
+        source = assembler.deck(path)
+        if source is not base:
+            final.append(assembler.import_slide(source, idx))
+            print(f"  [{i}] Copying slide {idx} of {path}")
+        elif idx not in used:
+            used.add(idx)
+            final.append(originals[idx])
+            slide_partname = assembler.slide_partnames(base)[idx]
+            assembler.placements[(id(base), slide_partname)] = slide_partname
+            print(f"  [{i}] Using slide {idx} of {path}")
+        else:
+            slide_partname = assembler.slide_partnames(base)[idx]
+            final.append(
+                duplicate_slide(base, slide_partname, assembler.next_slide_id())
+            )
+            print(f"  [{i}] Using duplicate of slide {idx} of {path}")
+
+    set_slide_list(base, final)
+    related = base.related_parts(base.presentation_partname)
+    assembler.link_slides([related[sldId.get(f"{R_NS}id")] for sldId in final])
+    base.save(output_path)
+    print(f"\nSaved assembled presentation to: {output_path}")
+    print(f"Final presentation has {len(final)} slides")
+    if deduplicate:
+        print(f"Reused {assembler.reused} identical layouts, masters and media")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+"""Benchmark assemble.py against naive copying of every slide's parts.
+
+Usage:
+    python assemble_benchmark.py
+
+Both runs must produce the same slides in the same order before sizes and
+timings are reported.
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from assemble_test import assemble_quietly, build_deck, make_logo, slide_labels
+
+
+def timed(func, *args):
+    """Run func(*args) and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_assembly():
+    """Assemble slides from four decks on two templates, all with one logo."""
+    rng = random.Random(0)
+    logo = make_logo(size=256)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        decks = []
+        for i in range(4):
+            path = tmp / f"deck{i}.pptx"
+            build_deck(path, f"deck{i}", 50, logo, master_name=f"Template {i % 2}")
+            decks.append(path)
+
+        print("Deck assembly (4 decks on 2 templates, one logo)")
+        for count in (50, 200, 1000):
+            sequence = [(rng.choice(decks), rng.randrange(50)) for _ in range(count)]
+            shared, naive = tmp / "shared.pptx", tmp / "naive.pptx"
+            _, new_time = timed(assemble_quietly, shared, sequence)
+            _, old_time = timed(assemble_quietly, naive, sequence, False)
+            assert slide_labels(shared) == slide_labels(naive), "slides differ"
+            print(
+                f"  {count:>5} slides: naive {old_time * 1000:8.1f} ms "
+                f"{naive.stat().st_size / 1024:8.0f} KB, "
+                f"shared {new_time * 1000:8.1f} ms "
+                f"{shared.stat().st_size / 1024:8.0f} KB"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_assembly()
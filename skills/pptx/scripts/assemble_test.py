@@ -0,0 +1,269 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+
+import contextlib
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from assemble import (
+    COMMENT_AUTHORS_CONTENT_TYPE,
+    COMMENTS_CONTENT_TYPE,
+    assemble_presentation,
+)
+from lxml import etree
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.action import PP_ACTION
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
+from pptx.util import Inches
+
+P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+
+
+def make_logo(seed=0, size=64):
+    """A small PNG that differs for each seed."""
+    image = Image.new("RGB", (size, size), (seed * 40 % 256, 90, 160))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_deck(path, name, slides, logo, master_name=None):
+    """Save a deck whose slides show "<name> <i>" and the logo.
+
+    Decks built with the same master_name have identical masters, layouts and
+    themes, as decks made from one corporate template do.
+    """
+    prs = Presentation()
+    if master_name:
+        prs.slide_master.element.cSld.set("name", master_name)
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[i % 2 + 5])
+        slide.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(1)).text = (
+            f"{name} {i}"
+        )
+        slide.shapes.add_picture(io.BytesIO(logo), Inches(8), Inches(6))
+    prs.save(path)
+
+
+def slide_labels(path):
+    """The "<name> <i>" label of each slide."""
+    return [
+        next(
+            shape.text_frame.text
+            for shape in slide.shapes
+            if shape.has_text_frame and shape.text_frame.text
+        )
+        for slide in Presentation(path).slides
+    ]
+
+
+def add_comments(path, authors, comments):
+    """Add classic comments to a deck.
+
+    Args:
+        authors: (name, initials, lastIdx) per author, whose ID is its position
+        comments: (slide index, authorId, idx, text) per comment
+    """
+    prs = Presentation(path)
+    author_list = "".join(
+        f'<p:cmAuthor id="{i}" name="{name}" initials="{initials}" '
+        f'lastIdx="{last}" clrIdx="{i}"/>'
+        for i, (name, initials, last) in enumerate(authors)
+    )
+    prs.part.relate_to(
+        Part(
+            PackURI("/ppt/commentAuthors.xml"),
+            COMMENT_AUTHORS_CONTENT_TYPE,
+            prs.part.package,
+            f'<p:cmAuthorLst xmlns:p="{P}">{author_list}</p:cmAuthorLst>'.encode(),
+        ),
+        RT.COMMENT_AUTHORS,
+    )
+    for index, slide in enumerate(prs.slides):
+        entries = "".join(
+            f'<p:cm authorId="{author}" dt="2024-01-01T00:00:00.000" idx="{idx}">'
+            f'<p:pos x="10" y="10"/><p:text>{text}</p:text></p:cm>'
+            for slide_index, author, idx, text in comments
+            if slide_index == index
+        )
+        if entries:
+            slide.part.relate_to(
+                Part(
+                    PackURI(f"/ppt/comments/comment{index + 1}.xml"),
+                    COMMENTS_CONTENT_TYPE,
+                    prs.part.package,
+                    f'<p:cmLst xmlns:p="{P}">{entries}</p:cmLst>'.encode(),
+                ),
+                RT.COMMENTS,
+            )
+    prs.save(path)
+
+
+def comment_authors(path):
+    """{comment text: (author name, idx)} of a deck, and its authors by ID."""
+    prs = Presentation(path)
+    authors_part = prs.part.part_related_by(RT.COMMENT_AUTHORS)
+    authors = {
+        author.get("id"): author
+        for author in etree.fromstring(authors_part.blob).iter(f"{{{P}}}cmAuthor")
+    }
+    comments = {}
+    for slide in prs.slides:
+        for rel in slide.part.rels.values():
+            if rel.reltype == RT.COMMENTS:
+                for cm in etree.fromstring(rel.target_part.blob).iter(f"{{{P}}}cm"):
+                    name = authors[cm.get("authorId")].get("name")
+                    comments[cm.findtext(f"{{{P}}}text")] = (name, cm.get("idx"))
+    return comments, authors
+
+
+def assemble_quietly(output, sequence, deduplicate=True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assemble_presentation(output, sequence, deduplicate)
+
+
+class TestAssemblePresentation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        tmp = Path(self.tmpdir.name)
+        self.a, self.b, self.c = tmp / "a.pptx", tmp / "b.pptx", tmp / "c.pptx"
+        build_deck(self.a, "a", 4, make_logo())
+        build_deck(self.b, "b", 4, make_logo())
+        build_deck(self.c, "c", 3, make_logo(1), master_name="Variant")
+        self.output = tmp / "out.pptx"
+        self.sequence = [
+            (self.b, 1),
+            (self.a, 0),
+            (self.c, 2),
+            (self.b, 1),
+            (self.a, 0),
+            (self.c, 0),
+        ]
+
+    def test_slides_in_order(self):
+        assemble_quietly(self.output, self.sequence)
+        self.assertEqual(
+            slide_labels(self.output), ["b 1", "a 0", "c 2", "b 1", "a 0", "c 0"]
+        )
+        prs = Presentation(self.output)
+        self.assertEqual(len({slide.slide_id for slide in prs.slides}), 6)
+        self.assertEqual(
+            [
+                sum(1 for shape in slide.shapes if shape.shape_type == 13)
+                for slide in prs.slides
+            ],
+            [1] * 6,
+        )
+
+    def test_identical_parts_are_stored_once(self):
+        assemble_quietly(self.output, self.sequence)
+        names = zipfile.ZipFile(self.output).namelist()
+        # a and b share one master and logo; c brings its own. Its theme is
+        # the same as theirs, but each master keeps a theme part of its own
+        self.assertEqual(
+            sum(1 for name in names if name.startswith("ppt/slideMasters/s")), 2
+        )
+        self.assertEqual(sum(1 for name in names if name.startswith("ppt/theme/")), 2)
+        self.assertEqual(sum(1 for name in names if name.startswith("ppt/media/")), 2)
+
+        prs = Presentation(self.output)
+        self.assertEqual(len(prs.slide_masters), 2)
+        ids = [int(master.get("id")) for master in prs.slide_masters._sldMasterIdLst]
+        for master in prs.slide_masters:
+            ids += [int(e.get("id")) for e in master.element.sldLayoutIdLst]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            prs.slides[2].slide_layout.slide_master, prs.slide_masters[1]
+        )
+        themes = [
+            next(
+                rel.target_part.partname
+                for rel in master.part.rels.values()
+                if rel.reltype.endswith("/theme")
+            )
+            for master in prs.slide_masters
+        ]
+        self.assertEqual(len(set(themes)), 2)
+
+    def test_naive_copying_is_larger(self):
+        naive = Path(self.tmpdir.name) / "naive.pptx"
+        assemble_quietly(self.output, self.sequence)
+        assemble_quietly(naive, self.sequence, deduplicate=False)
+        self.assertEqual(slide_labels(naive), slide_labels(self.output))
+        self.assertGreater(naive.stat().st_size, self.output.stat().st_size)
+
+    def test_links_between_slides(self):
+        for path in (self.a, self.c):
+            prs = Presentation(path)
+            for slide in list(prs.slides)[:2]:
+                button = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(2), 1)
+                button.click_action.target_slide = prs.slides[-1]
+            prs.save(path)
+
+        # c 0 links to c 2, which is assembled; a 0 links to a 3 and c 1 to
+        # c 2 of the other copy, which are not
+        assemble_quietly(self.output, [(self.a, 0), (self.c, 0), (self.c, 2)])
+        prs = Presentation(self.output)
+        targets = [
+            [
+                shape.click_action.target_slide
+                for shape in slide.shapes
+                if shape.click_action.action == PP_ACTION.NAMED_SLIDE
+            ]
+            for slide in prs.slides
+        ]
+        self.assertEqual(targets, [[], [prs.slides[2]], []])
+        names = zipfile.ZipFile(self.output).namelist()
+        self.assertEqual(sum(1 for n in names if n.startswith("ppt/slides/s")), 3)
+
+        assemble_quietly(self.output, [(self.b, 0), (self.c, 1)])
+        prs = Presentation(self.output)
+        self.assertEqual(slide_labels(self.output), ["b 0", "c 1"])
+        names = zipfile.ZipFile(self.output).namelist()
+        self.assertEqual(sum(1 for n in names if n.startswith("ppt/slides/s")), 2)
+
+    def test_comment_authors_are_merged(self):
+        add_comments(self.a, [("Ann", "A", 1)], [(0, 0, 1, "from a")])
+        add_comments(
+            self.c,
+            [("Bob", "B", 1), ("Ann", "A", 1)],
+            [(2, 0, 1, "from bob"), (2, 1, 1, "from ann")],
+        )
+
+        assemble_quietly(self.output, [(self.a, 0), (self.c, 2)])
+        comments, authors = comment_authors(self.output)
+        self.assertEqual(
+            comments,
+            {"from a": ("Ann", "1"), "from bob": ("Bob", "1"), "from ann": ("Ann", "2")},
+        )
+        self.assertEqual(
+            {(a.get("name"), a.get("lastIdx")) for a in authors.values()},
+            {("Ann", "2"), ("Bob", "1")},
+        )
+
+        # A base deck without comments gets a list of authors
+        assemble_quietly(self.output, [(self.b, 0), (self.c, 2)])
+        comments, _ = comment_authors(self.output)
+        self.assertEqual(
+            comments, {"from bob": ("Bob", "1"), "from ann": ("Ann", "1")}
+        )
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(ValueError):
+            assemble_quietly(self.output, [(self.a, 0), (self.c, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
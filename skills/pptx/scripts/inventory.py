@@ -3,6 +3,7 @@
 # dependencies = [
 #   "python-pptx>=0.6.21",
 #   "Pillow>=10.0.0",
+#   "lxml>=4.9.0",
 # ]
 # ///
 """
@@ -17,11 +18,17 @@ This module provides functionality to:
 - Export to JSON with clean, structured data
 
 Classes:
+    FontIndex: Resolves font names to installed font files
+    TextMeasurer: Measures and wraps text with cached word widths
+    InventoryCache: Caches per-slide text measurements on disk
     ParagraphData: Represents a text paragraph with formatting
     ShapeData: Represents a shape with position and text content
+    XmlPackage: Read-only view of a presentation's XML parts
+    XmlShapeData, XmlParagraphData: The same, read directly from slide XML
 
 Main Functions:
     extract_text_inventory: Extract all text from a presentation
+    extract_text_inventory_xml: The same, without the python-pptx object model
     save_inventory: Save extracted data to JSON
 
 Usage:
@@ -29,16 +36,39 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
+import os
 import platform
+import posixpath
 import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
-
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+import lxml.etree
 from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
-from pptx.enum.text import PP_ALIGN
+from pptx.enum.dml import MSO_FILL, MSO_THEME_COLOR
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.enum.text import MSO_UNDERLINE, PP_ALIGN
 from pptx.shapes.base import BaseShape
 
 # Type aliases for cleaner signatures
@@ -52,6 +82,26 @@ InventoryData = Dict[
 ]  # Dict of slide_id -> {shape_id -> ShapeData}
 InventoryDict = Dict[str, Dict[str, ShapeDict]]  # JSON-serializable inventory
 
+# Analysis passes of an inventory, in the order they run. Geometry (finding
+# text shapes, their positions and placeholder types, and sorting them) is
+# always included; the others can be selected as needed:
+#   text:           paragraphs with formatting, layout default font sizes
+#   frame-overflow: text measurement to estimate overflow of the text frame
+#   slide-overflow: shapes extending past the slide edges
+#   bullets:        paragraphs starting with a typed bullet symbol
+#   overlaps:       overlapping shapes on the same slide
+INVENTORY_PASSES = (
+    "geometry",
+    "text",
+    "frame-overflow",
+    "slide-overflow",
+    "bullets",
+    "overlaps",
+)
+
+# Smallest font size in points ShapeData.fit_font_size suggests
+MIN_FIT_FONT_SIZE = 8
+
 
 def main():
     """Main entry point for command-line usage."""
@@ -66,6 +116,22 @@ Examples:
   python inventory.py presentation.pptx inventory.json --issues-only
     Extracts only text shapes that have overflow or overlap issues
 
+  python inventory.py large-deck.pptx inventory.json --workers 8
+    Measures text on 8 processes in parallel
+
+  python inventory.py template.pptx inventory.json --cache-dir .inventory-cache
+    Reuses measurements of slides that have not changed since the last run
+
+  python inventory.py presentation.pptx inventory.json --engine xml
+    Reads the slide XML directly instead of through python-pptx (same output)
+
+  python inventory.py presentation.pptx regions.json --passes geometry --profile
+    Only locates text shapes (no paragraphs or issue checks) and prints the
+    time spent in each pass
+
+  python inventory.py large-deck.pptx shapes.jsonl --format jsonl --compact
+    Writes one compact JSON line per shape as each slide is analyzed
+
 The output JSON includes:
   - All text content organized by slide and shape
   - Correct absolute positions for shapes in groups
@@ -82,8 +148,59 @@ The output JSON includes:
         action="store_true",
         help="Include only text shapes that have overflow or overlap issues",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for measuring text on large decks (default: 1)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Directory for caching text measurements; unchanged slides are not re-measured",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["pptx", "xml"],
+        default="pptx",
+        help="Read the presentation with python-pptx (default) or parse its XML "
+        "directly, which is faster and never modifies the document",
+    )
+    parser.add_argument(
+        "--passes",
+        type=lambda value: value.split(","),
+        help="Comma-separated analysis passes to run (default: all): "
+        + ", ".join(INVENTORY_PASSES),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each analysis pass",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl"],
+        default="json",
+        help="Write one JSON document (default) or one JSON line per shape",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write without indentation and omit default paragraph values",
+    )
+    parser.add_argument(
+        "--font-cache",
+        metavar="PATH",
+        help="JSON file for caching the installed font index between runs",
+    )
 
     args = parser.parse_args()
+    if args.engine == "xml" and args.workers > 1:
+        parser.error("--workers is only supported by the pptx engine")
+    try:
+        passes = resolve_passes(args.passes)
+    except ValueError as e:
+        parser.error(str(e))
 
     input_path = Path(args.input)
     if not input_path.exists():
@@ -94,23 +211,45 @@ The output JSON includes:
         print("Error: Input must be a PowerPoint file (.pptx)")
         sys.exit(1)
 
+    if args.font_cache:
+        get_font_index(Path(args.font_cache))
+
     try:
         print(f"Extracting text inventory from: {args.input}")
         if args.issues_only:
             print(
                 "Filtering to include only text shapes with issues (overflow/overlap)"
             )
-        inventory = extract_text_inventory(input_path, issues_only=args.issues_only)
+        cache_dir = Path(args.cache_dir) if args.cache_dir else None
+        profile = InventoryProfile() if args.profile else None
+        if args.engine == "xml":
+            inventory = iter_text_inventory_xml(
+                input_path,
+                issues_only=args.issues_only,
+                cache_dir=cache_dir,
+                passes=passes,
+                profile=profile,
+            )
+        else:
+            inventory = iter_text_inventory(
+                input_path,
+                issues_only=args.issues_only,
+                workers=args.workers,
+                cache_dir=cache_dir,
+                passes=passes,
+                profile=profile,
+            )
 
         output_path = Path(args.output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        save_inventory(inventory, output_path)
+        # Slides are written as they are analyzed
+        total_slides, total_shapes = save_inventory(
+            inventory, output_path, args.format, args.compact
+        )
 
         print(f"Output saved to: {args.output}")
 
         # Report statistics
-        total_slides = len(inventory)
-        total_shapes = sum(len(shapes) for shapes in inventory.values())
         if args.issues_only:
             if total_shapes > 0:
                 print(
@@ -123,6 +262,10 @@ The output JSON includes:
                 f"Found text in {total_slides} slides with {total_shapes} text elements"
             )
 
+        if profile:
+            print("Time per pass:")
+            print(profile.report())
+
     except Exception as e:
         print(f"Error processing presentation: {e}")
         import traceback
@@ -140,6 +283,367 @@ class ShapeWithPosition:
     absolute_top: int  # in EMUs
 
 
+def resolve_passes(passes: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """Validate a selection of analysis passes, adding the required geometry pass.
+
+    Args:
+        passes: Pass names from INVENTORY_PASSES, or None for all of them
+
+    Raises:
+        ValueError: If a pass name is unknown
+    """
+    if passes is None:
+        return frozenset(INVENTORY_PASSES)
+    selected = frozenset(passes) | {"geometry"}
+    unknown = selected - set(INVENTORY_PASSES)
+    if unknown:
+        raise ValueError(
+            f"Unknown inventory pass(es): {', '.join(sorted(unknown))} "
+            f"(choose from {', '.join(INVENTORY_PASSES)})"
+        )
+    return selected
+
+
+class InventoryProfile:
+    """Wall-clock time spent in each stage of an inventory.
+
+    Times are exclusive: a pass that runs inside another one (such as text
+    measurement while shapes are built during the geometry pass) is counted
+    only towards the inner pass.
+    """
+
+    STAGES = ("load",) + INVENTORY_PASSES
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self._nested: List[float] = []
+
+    @contextmanager
+    def timing(self, stage: str):
+        """Context manager adding the time spent in its body to a stage."""
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[stage] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def report(self) -> str:
+        """Format the time per stage as a table."""
+        total = sum(self.seconds.values()) or 1.0
+        lines = [
+            f"  {stage:<15}{seconds * 1000:10.1f} ms {seconds / total:6.1%}"
+            for stage, seconds in self.seconds.items()
+        ]
+        lines.append(f"  {'total':<15}{sum(self.seconds.values()) * 1000:10.1f} ms")
+        return "\n".join(lines)
+
+
+def pass_timer(profile: Optional[InventoryProfile], stage: str) -> Any:
+    """Time a stage in profile, or do nothing if there is no profile."""
+    return profile.timing(stage) if profile else nullcontext()
+
+
+class FontIndex:
+    """Index of the font files installed in the platform font directories.
+
+    Resolving a font name used to probe the filesystem and list every font
+    directory for each paragraph measured. The index lists each directory once
+    per process (see get_font_index) and memoizes name lookups, while keeping
+    the original resolution order: per directory, exact file name variants
+    first, then the first file whose name contains the font name.
+
+    The directory listings can be persisted to a JSON cache file. A listing is
+    reused as long as its directory's mtime is unchanged, which is the case
+    until font files are added to or removed from it.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, listings: Dict[str, List[str]], extensions: List[str]):
+        """Initialize from directory listings.
+
+        Args:
+            listings: Font directory path -> file names, in search order
+            extensions: Font file extensions to match, in preference order
+        """
+        self.listings = listings
+        self.extensions = extensions
+        self._file_sets = {d: set(names) for d, names in listings.items()}
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def search_paths() -> Tuple[List[Path], List[str]]:
+        """Return the font directories and extensions for this platform."""
+        if platform.system() == "Darwin":  # macOS
+            font_dirs = [
+                "/System/Library/Fonts/",
+                "/Library/Fonts/",
+                "~/Library/Fonts/",
+            ]
+            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
+        else:  # Linux
+            font_dirs = [
+                "/usr/share/fonts/truetype/",
+                "/usr/local/share/fonts/",
+                "~/.fonts/",
+            ]
+            extensions = [".ttf", ".otf"]
+        return [Path(d).expanduser() for d in font_dirs], extensions
+
+    @staticmethod
+    def _list_directory(font_dir: Path) -> List[str]:
+        """List the file names in a font directory, in iterdir() order."""
+        try:
+            return [p.name for p in font_dir.iterdir() if p.is_file()]
+        except (OSError, PermissionError):
+            return []
+
+    @classmethod
+    def build(cls, cache_path: Optional[Path] = None) -> "FontIndex":
+        """List the font directories, reusing a persisted listing when still fresh.
+
+        Args:
+            cache_path: Optional JSON file to read listings from and write them to
+
+        Returns:
+            FontIndex for the current platform
+        """
+        font_dirs, extensions = cls.search_paths()
+
+        cached: Dict[str, Any] = {}
+        if cache_path and Path(cache_path).exists():
+            try:
+                data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+                if data.get("version") == cls.CACHE_VERSION:
+                    cached = data.get("directories", {})
+            except (OSError, ValueError):
+                cached = {}
+
+        listings: Dict[str, List[str]] = {}
+        entries: Dict[str, Any] = {}
+        stale = False
+        for font_dir in font_dirs:
+            try:
+                mtime = font_dir.stat().st_mtime
+            except OSError:
+                continue  # Directory does not exist
+            key = str(font_dir)
+            entry = cached.get(key)
+            if entry is None or entry.get("mtime") != mtime:
+                entry = {"mtime": mtime, "files": cls._list_directory(font_dir)}
+                stale = True
+            listings[key] = entry["files"]
+            entries[key] = entry
+
+        if cache_path and (stale or set(entries) != set(cached)):
+            try:
+                Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(cache_path).write_text(
+                    json.dumps({"version": cls.CACHE_VERSION, "directories": entries}),
+                    encoding="utf-8",
+                )
+            except OSError:
+                pass  # The cache is an optimization only
+
+        return cls(listings, extensions)
+
+    def fingerprint(self) -> str:
+        """Hash of the directory listings, which changes when fonts are installed."""
+        return hashlib.sha256(
+            json.dumps(self.listings, sort_keys=True).encode()
+        ).hexdigest()
+
+    def find(self, font_name: str) -> Optional[str]:
+        """Get the font file path for a given font name.
+
+        Args:
+            font_name: Name of the font (e.g., 'Arial', 'Calibri')
+
+        Returns:
+            Path to the font file, or None if not found
+        """
+        if font_name not in self._resolved:
+            self._resolved[font_name] = self._search(font_name)
+        return self._resolved[font_name]
+
+    def _search(self, font_name: str) -> Optional[str]:
+        """Resolve a font name against the directory listings."""
+        # Common font file variations to try
+        font_variations = [
+            font_name,
+            font_name.lower(),
+            font_name.replace(" ", ""),
+            font_name.replace(" ", "-"),
+        ]
+        font_name_lower = font_name.lower().replace(" ", "")
+
+        for font_dir, names in self.listings.items():
+            # First try exact matches
+            files = self._file_sets[font_dir]
+            for variant in font_variations:
+                for ext in self.extensions:
+                    if f"{variant}{ext}" in files:
+                        return str(Path(font_dir) / f"{variant}{ext}")
+
+            # Then try fuzzy matching - find files containing the font name
+            for name in names:
+                file_name_lower = name.lower()
+                if font_name_lower in file_name_lower and any(
+                    file_name_lower.endswith(ext) for ext in self.extensions
+                ):
+                    return str(Path(font_dir) / name)
+
+        return None
+
+
+_font_index: Optional[FontIndex] = None
+
+
+def get_font_index(cache_path: Optional[Path] = None) -> FontIndex:
+    """Get the process-wide FontIndex, building it on first use.
+
+    Args:
+        cache_path: Optional JSON file used to persist directory listings
+            across runs. Only consulted when the index is first built.
+    """
+    global _font_index
+    if _font_index is None:
+        _font_index = FontIndex.build(cache_path)
+    return _font_index
+
+
+@lru_cache(maxsize=256)
+def load_font(font_path: Optional[str], size: int) -> Any:
+    """Load a font for text measurement, cached by (path, size).
+
+    Falls back to PIL's default font when font_path is None or unreadable.
+    """
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size=size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+class TextMeasurer:
+    """Measures and word-wraps text in one font, caching advance widths.
+
+    Wrapping used to re-measure the whole candidate line after every word.
+    Instead, a line's width is computed from cached word widths plus the width
+    of each gap between words, where a gap is measured once per pair of
+    characters around the space so that kerning against the space is included.
+    Fit decisions that land within a pixel of the limit are still confirmed by
+    measuring the line itself, so the output matches full re-measurement.
+    """
+
+    # Estimates this close to the limit are re-measured exactly (in pixels)
+    MARGIN_PX = 1.0
+
+    def __init__(self, font: Any):
+        """Initialize for a loaded PIL font.
+
+        Args:
+            font: FreeTypeFont or default PIL font to measure with
+        """
+        self.font = font
+        self._draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self._widths: Dict[str, float] = {}
+        self._gaps: Dict[Tuple[str, str], float] = {}
+
+    def word_width(self, word: str) -> float:
+        """Get the advance width of a word in pixels (cached)."""
+        width = self._widths.get(word)
+        if width is None:
+            width = self._widths[word] = self.text_width(word)
+        return width
+
+    def gap_width(self, before: str, after: str) -> float:
+        """Get the width a space adds between two words, including kerning (cached).
+
+        Args:
+            before: The word preceding the space
+            after: The word following the space
+        """
+        key = (before[-1:], after[:1])
+        width = self._gaps.get(key)
+        if width is None:
+            left, right = key
+            width = self._gaps[key] = (
+                self.text_width(f"{left} {right}")
+                - self.text_width(left)
+                - self.text_width(right)
+            )
+        return width
+
+    def text_width(self, text: str) -> float:
+        """Measure the advance width of arbitrary text in pixels (uncached)."""
+        return self._draw.textlength(text, font=self.font)
+
+    def _fits(self, text: str, estimated_width: float, max_width_px: float) -> bool:
+        """Check whether text fits, measuring it only when the estimate is close."""
+        if estimated_width <= max_width_px - self.MARGIN_PX:
+            return True
+        if estimated_width > max_width_px + self.MARGIN_PX:
+            return False
+        return self.text_width(text) <= max_width_px
+
+    def wrap(self, line: str, max_width_px: float) -> List[str]:
+        """Wrap a single line of text at spaces to fit within max_width_px.
+
+        Words wider than max_width_px are kept whole on a line of their own.
+        """
+        if not line:
+            return [""]
+
+        words = line.split(" ")
+        widths = [self.word_width(word) for word in words]
+        total_width = sum(widths) + sum(
+            self.gap_width(words[i], words[i + 1]) for i in range(len(words) - 1)
+        )
+        if self._fits(line, total_width, max_width_px):
+            return [line]
+
+        # Need to wrap - greedily fill lines word by word
+        wrapped = []
+        current_line = ""
+        current_width = 0.0
+        previous_word = ""
+
+        for word, width in zip(words, widths):
+            if current_line:
+                test_line = current_line + " " + word
+                test_width = current_width + self.gap_width(previous_word, word) + width
+            else:
+                test_line = word
+                test_width = width
+
+            if self._fits(test_line, test_width, max_width_px):
+                current_line = test_line
+                current_width = test_width
+            else:
+                if current_line:
+                    wrapped.append(current_line)
+                current_line = word
+                current_width = width
+            previous_word = word
+
+        if current_line:
+            wrapped.append(current_line)
+
+        return wrapped
+
+
+@lru_cache(maxsize=256)
+def get_text_measurer(font_path: Optional[str], size: int) -> TextMeasurer:
+    """Get the shared TextMeasurer for a font file and size."""
+    return TextMeasurer(load_font(font_path, size))
+
+
 class ParagraphData:
     """Data structure for paragraph properties extracted from a PowerPoint paragraph."""
 
@@ -149,20 +653,7 @@ class ParagraphData:
         Args:
             paragraph: The PowerPoint paragraph object
         """
-        self.text: str = paragraph.text.strip()
-        self.bullet: bool = False
-        self.level: Optional[int] = None
-        self.alignment: Optional[str] = None
-        self.space_before: Optional[float] = None
-        self.space_after: Optional[float] = None
-        self.font_name: Optional[str] = None
-        self.font_size: Optional[float] = None
-        self.bold: Optional[bool] = None
-        self.italic: Optional[bool] = None
-        self.underline: Optional[bool] = None
-        self.color: Optional[str] = None
-        self.theme_color: Optional[str] = None
-        self.line_spacing: Optional[float] = None
+        self._init_fields(paragraph.text)
 
         # Check for bullet formatting
         if (
@@ -180,8 +671,13 @@ class ParagraphData:
                 if hasattr(paragraph, "level"):
                     self.level = paragraph.level
 
-        # Add alignment if not LEFT (default)
-        if hasattr(paragraph, "alignment") and paragraph.alignment is not None:
+        # Add alignment if not LEFT (default). paragraph.alignment adds an empty
+        # <a:pPr> when there is none, and without one there is no alignment.
+        if (
+            getattr(paragraph, "_p", None) is not None
+            and paragraph._p.pPr is not None
+            and paragraph.alignment is not None
+        ):
             alignment_map = {
                 PP_ALIGN.CENTER: "CENTER",
                 PP_ALIGN.RIGHT: "RIGHT",
@@ -196,10 +692,12 @@ class ParagraphData:
         if hasattr(paragraph, "space_after") and paragraph.space_after:
             self.space_after = paragraph.space_after.pt
 
-        # Extract font properties from first run
+        # Extract font properties from first run. Only look at the font when the
+        # run has properties: run.font adds an empty <a:rPr> otherwise, so that
+        # reading a paragraph never changes the document.
         if paragraph.runs:
             first_run = paragraph.runs[0]
-            if hasattr(first_run, "font"):
+            if first_run._r.rPr is not None:
                 font = first_run.font
                 if font.name:
                     self.font_name = font.name
@@ -212,18 +710,20 @@ class ParagraphData:
                 if font.underline is not None:
                     self.underline = font.underline
 
-                # Handle color - both RGB and theme colors
-                try:
-                    # Try RGB color first
-                    if font.color.rgb:
-                        self.color = str(font.color.rgb)
-                except (AttributeError, TypeError):
-                    # Fall back to theme color
+                # Handle color - both RGB and theme colors. font.color turns any
+                # other fill into a solid one, so only read it for solid fills.
+                if font.fill.type == MSO_FILL.SOLID:
                     try:
-                        if font.color.theme_color:
-                            self.theme_color = font.color.theme_color.name
+                        # Try RGB color first
+                        if font.color.rgb:
+                            self.color = str(font.color.rgb)
                     except (AttributeError, TypeError):
-                        pass
+                        # Fall back to theme color
+                        try:
+                            if font.color.theme_color:
+                                self.theme_color = font.color.theme_color.name
+                        except (AttributeError, TypeError):
+                            pass
 
         # Add line spacing if set
         if hasattr(paragraph, "line_spacing") and paragraph.line_spacing is not None:
@@ -232,22 +732,49 @@ class ParagraphData:
             else:
                 # Multiplier - convert to points
                 font_size = self.font_size if self.font_size else 12.0
+                self.line_spacing_lines = paragraph.line_spacing
                 self.line_spacing = round(paragraph.line_spacing * font_size, 2)
 
-    def to_dict(self) -> ParagraphDict:
-        """Convert to dictionary for JSON serialization, excluding None values."""
+    def _init_fields(self, text: str) -> None:
+        """Set the paragraph text and unset all formatting properties."""
+        self.text: str = text.strip()
+        self.bullet: bool = False
+        self.level: Optional[int] = None
+        self.alignment: Optional[str] = None
+        self.space_before: Optional[float] = None
+        self.space_after: Optional[float] = None
+        self.font_name: Optional[str] = None
+        self.font_size: Optional[float] = None
+        self.bold: Optional[bool] = None
+        self.italic: Optional[bool] = None
+        self.underline: Optional[bool] = None
+        self.color: Optional[str] = None
+        self.theme_color: Optional[str] = None
+        self.line_spacing: Optional[float] = None
+        # Line spacing as a multiple of the font size, if it is set that way
+        self.line_spacing_lines: Optional[float] = None
+
+    def to_dict(self, compact: bool = False) -> ParagraphDict:
+        """Convert to dictionary for JSON serialization, excluding None values.
+
+        Args:
+            compact: Also omit values equal to the PowerPoint defaults
+                (level 0, no space before or after)
+        """
         result: ParagraphDict = {"text": self.text}
+        # Values that are left out in compact mode
+        defaults = (0,) if compact else ()
 
         # Add optional fields only if they have values
         if self.bullet:
             result["bullet"] = self.bullet
-        if self.level is not None:
+        if self.level is not None and self.level not in defaults:
             result["level"] = self.level
         if self.alignment:
             result["alignment"] = self.alignment
-        if self.space_before is not None:
+        if self.space_before is not None and self.space_before not in defaults:
             result["space_before"] = self.space_before
-        if self.space_after is not None:
+        if self.space_after is not None and self.space_after not in defaults:
             result["space_after"] = self.space_after
         if self.font_name:
             result["font_name"] = self.font_name
@@ -292,61 +819,7 @@ class ShapeData:
         Returns:
             Path to the font file, or None if not found
         """
-        system = platform.system()
-
-        # Common font file variations to try
-        font_variations = [
-            font_name,
-            font_name.lower(),
-            font_name.replace(" ", ""),
-            font_name.replace(" ", "-"),
-        ]
-
-        # Define font directories and extensions by platform
-        if system == "Darwin":  # macOS
-            font_dirs = [
-                "/System/Library/Fonts/",
-                "/Library/Fonts/",
-                "~/Library/Fonts/",
-            ]
-            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
-        else:  # Linux
-            font_dirs = [
-                "/usr/share/fonts/truetype/",
-                "/usr/local/share/fonts/",
-                "~/.fonts/",
-            ]
-            extensions = [".ttf", ".otf"]
-
-        # Try to find the font file
-        from pathlib import Path
-
-        for font_dir in font_dirs:
-            font_dir_path = Path(font_dir).expanduser()
-            if not font_dir_path.exists():
-                continue
-
-            # First try exact matches
-            for variant in font_variations:
-                for ext in extensions:
-                    font_path = font_dir_path / f"{variant}{ext}"
-                    if font_path.exists():
-                        return str(font_path)
-
-            # Then try fuzzy matching - find files containing the font name
-            try:
-                for file_path in font_dir_path.iterdir():
-                    if file_path.is_file():
-                        file_name_lower = file_path.name.lower()
-                        font_name_lower = font_name.lower().replace(" ", "")
-                        if font_name_lower in file_name_lower and any(
-                            file_name_lower.endswith(ext) for ext in extensions
-                        ):
-                            return str(file_path)
-            except (OSError, PermissionError):
-                continue
-
-        return None
+        return get_font_index().find(font_name)
 
     @staticmethod
     def get_slide_dimensions(slide: Any) -> tuple[Optional[int], Optional[int]]:
@@ -397,6 +870,9 @@ class ShapeData:
         absolute_left: Optional[int] = None,
         absolute_top: Optional[int] = None,
         slide: Optional[Any] = None,
+        estimate_overflow: bool = True,
+        passes: Iterable[str] = INVENTORY_PASSES,
+        profile: Optional["InventoryProfile"] = None,
     ):
         """Initialize from a PowerPoint shape object.
 
@@ -405,9 +881,17 @@ class ShapeData:
             absolute_left: Absolute left position in EMUs (for shapes in groups)
             absolute_top: Absolute top position in EMUs (for shapes in groups)
             slide: Optional slide object to get dimensions and layout information
+            estimate_overflow: If False, skip text measurement and leave
+                frame_overflow_bottom for the caller to fill in
+            passes: Analysis passes to run (see INVENTORY_PASSES)
+            profile: Optional InventoryProfile to record the passes' cost in
         """
         self.shape = shape  # Store reference to original shape
         self.shape_id: str = ""  # Will be set after sorting
+        self.passes = resolve_passes(passes)
+        self.profile = profile
+        self._slide = slide
+        self._paragraphs: Optional[List[ParagraphData]] = None
 
         # Get slide dimensions from slide object
         self.slide_width_emu, self.slide_height_emu = (
@@ -423,12 +907,6 @@ class ShapeData:
                     str(shape.placeholder_format.type).split(".")[-1].split(" ")[0]  # type: ignore
                 )
 
-                # Get default font size from layout
-                if slide and hasattr(slide, "slide_layout"):
-                    self.default_font_size = self.get_default_font_size(
-                        shape, slide.slide_layout
-                    )
-
         # Get position information
         # Use absolute positions if provided (for shapes in groups), otherwise use shape's position
         left_emu = (
@@ -442,24 +920,31 @@ class ShapeData:
             else (shape.top if hasattr(shape, "top") else 0)
         )
 
-        self.left: float = round(self.emu_to_inches(left_emu), 2)  # type: ignore
-        self.top: float = round(self.emu_to_inches(top_emu), 2)  # type: ignore
-        self.width: float = round(
-            self.emu_to_inches(shape.width if hasattr(shape, "width") else 0),
-            2,  # type: ignore
-        )
-        self.height: float = round(
-            self.emu_to_inches(shape.height if hasattr(shape, "height") else 0),
-            2,  # type: ignore
+        self._set_geometry(
+            left_emu,  # type: ignore
+            top_emu,  # type: ignore
+            shape.width if hasattr(shape, "width") else 0,  # type: ignore
+            shape.height if hasattr(shape, "height") else 0,  # type: ignore
         )
+        self._run_passes(estimate_overflow)
+
+    def _set_geometry(
+        self, left_emu: int, top_emu: int, width_emu: int, height_emu: int
+    ) -> None:
+        """Set the position and size, in inches and in EMUs."""
+        self.left: float = round(self.emu_to_inches(left_emu), 2)
+        self.top: float = round(self.emu_to_inches(top_emu), 2)
+        self.width: float = round(self.emu_to_inches(width_emu), 2)
+        self.height: float = round(self.emu_to_inches(height_emu), 2)
 
         # Store EMU positions for overflow calculations
         self.left_emu = left_emu
         self.top_emu = top_emu
-        self.width_emu = shape.width if hasattr(shape, "width") else 0
-        self.height_emu = shape.height if hasattr(shape, "height") else 0
+        self.width_emu = width_emu
+        self.height_emu = height_emu
 
-        # Calculate overflow status
+    def _run_passes(self, estimate_overflow: bool) -> None:
+        """Run the selected per-shape passes: text, overflow and bullet checks."""
         self.frame_overflow_bottom: Optional[float] = None
         self.slide_overflow_right: Optional[float] = None
         self.slide_overflow_bottom: Optional[float] = None
@@ -467,15 +952,40 @@ class ShapeData:
             str, float
         ] = {}  # Dict of shape_id -> overlap area in sq inches
         self.warnings: List[str] = []
-        self._estimate_frame_overflow()
-        self._calculate_slide_overflow()
-        self._detect_bullet_issues()
 
-    @property
-    def paragraphs(self) -> List[ParagraphData]:
-        """Calculate paragraphs from the shape's text frame."""
-        if not self.shape or not hasattr(self.shape, "text_frame"):
-            return []
+        shape_passes = [
+            ("text", self._read_text),
+            ("frame-overflow", self._estimate_frame_overflow),
+            ("slide-overflow", self._calculate_slide_overflow),
+            ("bullets", self._detect_bullet_issues),
+        ]
+        for name, run in shape_passes:
+            if name not in self.passes:
+                continue
+            if name == "frame-overflow" and not estimate_overflow:
+                continue
+            with pass_timer(self.profile, name):
+                run()
+
+    def _read_text(self) -> None:
+        """Read paragraph formatting and the layout's default font size."""
+        self.default_font_size = self._get_layout_font_size()
+        self._paragraphs = self._read_paragraphs()
+
+    def _get_layout_font_size(self) -> Optional[float]:
+        """Get the default font size of a placeholder from the slide layout."""
+        if (
+            self.placeholder_type
+            and self._slide
+            and hasattr(self._slide, "slide_layout")
+        ):
+            return self.get_default_font_size(self.shape, self._slide.slide_layout)
+        return None
+
+    def _read_paragraphs(self) -> List[ParagraphData]:
+        """Read the non-empty paragraphs of the shape's text frame."""
+        if not self.shape or not hasattr(self.shape, "text_frame"):
+            return []
 
         paragraphs = []
         for paragraph in self.shape.text_frame.paragraphs:  # type: ignore
@@ -483,6 +993,13 @@ class ShapeData:
                 paragraphs.append(ParagraphData(paragraph))
         return paragraphs
 
+    @property
+    def paragraphs(self) -> List[ParagraphData]:
+        """Paragraphs read by the text pass, or read now if it did not run."""
+        if self._paragraphs is None:
+            return self._read_paragraphs()
+        return self._paragraphs
+
     def _get_default_font_size(self) -> int:
         """Get default font size from theme text styles or use conservative default."""
         try:
@@ -494,14 +1011,32 @@ class ShapeData:
             slide_master = self.shape.part.slide_layout.slide_master  # type: ignore
             if not hasattr(slide_master, "element"):
                 return 14
+        except Exception:
+            return 14
 
+        return self.get_theme_font_size(slide_master.element, self.placeholder_type)
+
+    @staticmethod
+    def get_theme_font_size(
+        master_element: Any, placeholder_type: Optional[str] = None
+    ) -> int:
+        """Get the default font size from a slide master's text styles.
+
+        Args:
+            master_element: Root XML element of the slide master
+            placeholder_type: Placeholder type of the shape, if any
+
+        Returns:
+            Font size in points, or a conservative 14 if none is found
+        """
+        try:
             # Determine theme style based on placeholder type
             style_name = "bodyStyle"  # Default
-            if self.placeholder_type and "TITLE" in self.placeholder_type:
+            if placeholder_type and "TITLE" in placeholder_type:
                 style_name = "titleStyle"
 
             # Find font size in theme styles
-            for child in slide_master.element.iter():
+            for child in master_element.iter():
                 tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
                 if tag == style_name:
                     for elem in child.iter():
@@ -537,89 +1072,110 @@ class ShapeData:
             self.inches_to_pixels(usable_height),
         )
 
-    def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
-        """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
+    def _frame_paragraphs(
+        self,
+    ) -> Optional[Tuple[Any, Iterator[Tuple[int, str, ParagraphData]]]]:
+        """Get the text frame and its non-empty paragraphs, for measuring.
 
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
+        Returns:
+            The text frame and (index among all paragraphs, text,
+            ParagraphData) per non-empty paragraph, read lazily, or None if
+            the shape has no paragraphs
+        """
+        if not self.shape or not hasattr(self.shape, "text_frame"):
+            return None
 
-        if current_line:
-            wrapped.append(current_line)
+        text_frame = self.shape.text_frame  # type: ignore
+        if not text_frame or not text_frame.paragraphs:
+            return None
 
-        return wrapped
+        return text_frame, (
+            (para_idx, paragraph.text, ParagraphData(paragraph))
+            for para_idx, paragraph in enumerate(text_frame.paragraphs)
+            if paragraph.text.strip()
+        )
 
     def _estimate_frame_overflow(self) -> None:
         """Estimate if text overflows the shape bounds using PIL text measurement."""
-        if not self.shape or not hasattr(self.shape, "text_frame"):
+        frame = self._frame_paragraphs()
+        if frame is None:
             return
 
-        text_frame = self.shape.text_frame  # type: ignore
-        if not text_frame or not text_frame.paragraphs:
-            return
+        self._estimate_paragraphs_overflow(*frame)
 
+    def _estimate_paragraphs_overflow(
+        self,
+        text_frame: Any,
+        paragraphs: Iterable[Tuple[int, str, ParagraphData]],
+    ) -> None:
+        """Estimate frame overflow from a text frame's non-empty paragraphs.
+
+        Args:
+            text_frame: Object with the frame's margin_* attributes
+            paragraphs: (index among all paragraphs, text, ParagraphData) per
+                non-empty paragraph, only consumed if the frame has usable area
+        """
         # Get usable dimensions after accounting for margins
         usable_width_px, usable_height_px = self._get_usable_dimensions(text_frame)
         if usable_width_px <= 0 or usable_height_px <= 0:
             return
 
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-
         # Get default font size from placeholder or use conservative estimate
         default_font_size = self._get_default_font_size()
 
-        # Calculate total height of all paragraphs
-        total_height_px = 0
+        total_height_px = self._measure_text_height(
+            paragraphs, usable_width_px, default_font_size
+        )
+        self.frame_overflow_bottom = self._get_overflow_inches(
+            total_height_px, usable_height_px
+        )
 
-        for para_idx, paragraph in enumerate(text_frame.paragraphs):
-            if not paragraph.text.strip():
-                continue
+    def _measure_text_height(
+        self,
+        paragraphs: Iterable[Tuple[int, str, ParagraphData]],
+        usable_width_px: int,
+        default_font_size: int,
+        font_size_override: Optional[int] = None,
+    ) -> float:
+        """Measure the height of wrapped paragraphs in pixels.
 
-            para_data = ParagraphData(paragraph)
+        Args:
+            paragraphs: (index among all paragraphs, text, ParagraphData) per
+                non-empty paragraph
+            usable_width_px: Width to wrap the text at
+            default_font_size: Size of paragraphs without a font size
+            font_size_override: Measure every paragraph at this size instead.
+                Line spacing set as a multiple follows the size, and spacing
+                set in points is scaled if the paragraph has an explicit size.
+        """
+        # Calculate total height of all paragraphs
+        total_height_px = 0
 
+        for para_idx, text, para_data in paragraphs:
             # Load font for this paragraph
             font_name = para_data.font_name or "Arial"
             font_size = int(para_data.font_size or default_font_size)
+            line_spacing = para_data.line_spacing
+            if font_size_override is not None:
+                if para_data.line_spacing_lines:
+                    line_spacing = para_data.line_spacing_lines * font_size_override
+                elif line_spacing and para_data.font_size:
+                    line_spacing *= font_size_override / para_data.font_size
+                font_size = font_size_override
 
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
+            measurer = get_text_measurer(self.get_font_path(font_name), font_size)
 
             # Wrap all lines in this paragraph
             all_wrapped_lines = []
-            for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
+            for line in text.split("\n"):
+                wrapped = measurer.wrap(line, usable_width_px)
                 all_wrapped_lines.extend(wrapped)
 
             if all_wrapped_lines:
                 # Calculate line height
-                if para_data.line_spacing:
+                if line_spacing:
                     # Custom line spacing explicitly set
-                    line_height_px = para_data.line_spacing * 96 / 72
+                    line_height_px = line_spacing * 96 / 72
                 else:
                     # PowerPoint default single spacing (1.0x font size)
                     line_height_px = font_size * 96 / 72
@@ -635,12 +1191,78 @@ class ShapeData:
                 if para_data.space_after:
                     total_height_px += para_data.space_after * 96 / 72
 
+        return total_height_px
+
+    @staticmethod
+    def _get_overflow_inches(
+        total_height_px: float, usable_height_px: int
+    ) -> Optional[float]:
+        """Get the overflow of text of the given height, or None if it fits."""
         # Check for overflow (ignore negligible overflows <= 0.05")
         if total_height_px > usable_height_px:
             overflow_px = total_height_px - usable_height_px
             overflow_inches = round(overflow_px / 96.0, 2)
             if overflow_inches > 0.05:  # Only report significant overflows
-                self.frame_overflow_bottom = overflow_inches
+                return overflow_inches
+        return None
+
+    def fit_font_size(
+        self, allowed_overflow: float = 0.0, min_font_size: int = MIN_FIT_FONT_SIZE
+    ) -> Optional[int]:
+        """Find the largest font size at which the shape's text fits its frame.
+
+        Binary search over whole point sizes, measuring every paragraph at the
+        candidate size (see _measure_text_height for how line spacing follows).
+        Word widths are cached per font and size, so each probe mostly re-sums
+        known widths.
+
+        Args:
+            allowed_overflow: Overflow in inches that still counts as fitting,
+                e.g. the overflow the shape had before its text was replaced
+            min_font_size: Smallest size to suggest
+
+        Returns:
+            The largest fitting size below the current largest paragraph
+            size, or None if the text already fits, does not fit even at
+            min_font_size, or cannot be measured
+        """
+        frame = self._frame_paragraphs()
+        if frame is None:
+            return None
+        text_frame, paragraph_iter = frame
+        usable_width_px, usable_height_px = self._get_usable_dimensions(text_frame)
+        if usable_width_px <= 0 or usable_height_px <= 0:
+            return None
+        paragraphs = list(paragraph_iter)
+        if not paragraphs:
+            return None
+        default_font_size = self._get_default_font_size()
+
+        def fits(font_size: Optional[int]) -> bool:
+            height = self._measure_text_height(
+                paragraphs, usable_width_px, default_font_size, font_size
+            )
+            overflow = self._get_overflow_inches(height, usable_height_px)
+            return overflow is None or overflow <= allowed_overflow
+
+        if fits(None):
+            return None
+
+        # Largest size known not to fit, and smallest candidate
+        high = max(
+            int(para_data.font_size or default_font_size)
+            for _, _, para_data in paragraphs
+        )
+        low = min_font_size
+        if low >= high or not fits(low):
+            return None
+        while high - low > 1:
+            middle = (low + high) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle
+        return low
 
     def _calculate_slide_overflow(self) -> None:
         """Calculate if shape overflows the slide boundaries."""
@@ -672,11 +1294,15 @@ class ShapeData:
         if not text_frame or not text_frame.paragraphs:
             return
 
+        self._detect_manual_bullets(p.text for p in text_frame.paragraphs)
+
+    def _detect_manual_bullets(self, paragraph_texts: Iterable[str]) -> None:
+        """Warn about paragraphs that start with a typed bullet symbol."""
         # Common bullet symbols that indicate manual bullets
         bullet_symbols = ["•", "●", "○"]
 
-        for paragraph in text_frame.paragraphs:
-            text = paragraph.text.strip()
+        for text in paragraph_texts:
+            text = text.strip()
             # Check for manual bullet symbols
             if text and any(text.startswith(symbol + " ") for symbol in bullet_symbols):
                 self.warnings.append(
@@ -695,8 +1321,13 @@ class ShapeData:
             or len(self.warnings) > 0
         )
 
-    def to_dict(self) -> ShapeDict:
-        """Convert to dictionary for JSON serialization."""
+    def to_dict(self, compact: bool = False) -> ShapeDict:
+        """Convert to dictionary for JSON serialization.
+
+        Args:
+            compact: Omit paragraph values equal to their defaults, including
+                font sizes equal to the shape's default_font_size
+        """
         result: ShapeDict = {
             "left": self.left,
             "top": self.top,
@@ -740,7 +1371,14 @@ class ShapeData:
             result["warnings"] = self.warnings
 
         # Add paragraphs after placeholder_type
-        result["paragraphs"] = [para.to_dict() for para in self.paragraphs]
+        if "text" in self.passes:
+            result["paragraphs"] = [
+                para.to_dict(compact) for para in self.paragraphs
+            ]
+            if compact and self.default_font_size:
+                for para in result["paragraphs"]:
+                    if para.get("font_size") == self.default_font_size:
+                        del para["font_size"]
 
         return result
 
@@ -822,6 +1460,14 @@ def collect_shapes_with_absolute_positions(
     return []
 
 
+def collect_slide_shapes(slide: Any) -> List[ShapeWithPosition]:
+    """Collect all valid text shapes on a slide with absolute positions."""
+    shapes_with_positions = []
+    for shape in slide.shapes:  # type: ignore
+        shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
+    return shapes_with_positions
+
+
 def sort_shapes_by_position(shapes: List[ShapeData]) -> List[ShapeData]:
     """Sort shapes by visual position (top-to-bottom, left-to-right).
 
@@ -891,96 +1537,1068 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     This function requires each ShapeData to have its shape_id already set.
     It modifies the shapes in-place, adding shape IDs with overlap areas in square inches.
 
+    Uses a sweep line over the shapes' left edges, so only shapes whose
+    horizontal extents overlap by more than the tolerance are compared with
+    calculate_overlap. Each overlapping_shapes dictionary lists its shapes in
+    list order, exactly as comparing every pair would.
+
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
+    tolerance = 0.05  # Same default as calculate_overlap
+    rects = []
+    for i, shape in enumerate(shapes):
+        # Ensure shape IDs are set
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
+        rects.append((shape.left, shape.top, shape.width, shape.height))
+
+    # Sweep left to right; a shape stays active while the next left edge is
+    # more than the tolerance short of its right edge
+    pairs = []
+    active: List[int] = []
+    for j in sorted(range(len(shapes)), key=lambda k: rects[k][0]):
+        left = rects[j][0]
+        active = [i for i in active if rects[i][0] + rects[i][2] - left > tolerance]
+        for i in active:
+            overlaps, overlap_area = calculate_overlap(rects[i], rects[j], tolerance)
+            if overlaps:
+                pairs.append((min(i, j), max(i, j), overlap_area))
+        active.append(j)
 
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
+    # Record overlaps in pairwise (i, j) order
+    for i, j, overlap_area in sorted(pairs):
+        # Add shape IDs with overlap area in square inches
+        shapes[i].overlapping_shapes[shapes[j].shape_id] = overlap_area
+        shapes[j].overlapping_shapes[shapes[i].shape_id] = overlap_area
 
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
 
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+class InventoryCache:
+    """On-disk cache of per-slide text measurements, keyed by content hash.
 
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
+    Measuring text is the expensive part of an inventory, and agents re-run
+    inventories on the same template many times. Each slide's frame overflow
+    estimates are stored under a hash of the slide XML, its layout and master
+    XML, and the installed font index, so a slide is only re-measured after it
+    (or something it inherits from) changes. Other inventory options do not
+    affect the measurements and are therefore not part of the key.
+    """
 
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        """Initialize with the directory holding cache entries (created if needed)."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._part_digests: Dict[int, str] = {}
+        self._xml_digests: Dict[str, str] = {}
+        self._environment = f"{self.VERSION}:{get_font_index().fingerprint()}"
+
+    def _part_digest(self, part: Any) -> str:
+        """Hash a package part's XML, once per part for shared layouts and masters."""
+        digest = self._part_digests.get(id(part))
+        if digest is None:
+            digest = self._part_digests[id(part)] = hashlib.sha256(
+                part.blob
+            ).hexdigest()
+        return digest
+
+    def _combine(self, *digests: str) -> str:
+        """Combine part digests with the environment into a cache key."""
+        key = "|".join([self._environment, *digests])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def key(self, slide: Any) -> str:
+        """Compute the cache key of a slide.
+
+        The key hashes the slide XML as it is in memory. Measuring a slide
+        leaves that XML unchanged, because ParagraphData only reads run fonts
+        with an existing <a:rPr> and colors of solid fills, so the key can be
+        computed before or after measuring. It changes only if the slide itself
+        is edited, or if a font or color accessor that adds elements is used.
+        """
+        layout = slide.slide_layout
+        return self._combine(
+            hashlib.sha256(slide.part.blob).hexdigest(),
+            self._part_digest(layout.part),
+            self._part_digest(layout.slide_master.part),
+        )
 
+    def xml_key(self, slide: "XmlSlide") -> str:
+        """Compute the cache key of a slide read by XmlPackage, from raw part bytes."""
+        digests = []
+        for partname in (slide.partname, slide.layout_partname, slide.master_partname):
+            if partname is None:
+                digests.append("")
+                continue
+            digest = self._xml_digests.get(partname)
+            if digest is None:
+                digest = self._xml_digests[partname] = hashlib.sha256(
+                    slide.package.blob(partname)
+                ).hexdigest()
+            digests.append(digest)
+        return self._combine("xml", *digests)
+
+    def get(self, key: str) -> Optional[List[Optional[float]]]:
+        """Get the cached frame overflow per shape, or None on a miss."""
+        try:
+            return json.loads((self.cache_dir / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, frame_overflows: List[Optional[float]]) -> None:
+        """Store the frame overflow per shape of a slide."""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(frame_overflows))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # The cache is an optimization only
 
-def extract_text_inventory(
-    pptx_path: Path, prs: Optional[Any] = None, issues_only: bool = False
-) -> InventoryData:
-    """Extract text content from all slides in a PowerPoint presentation.
 
-    Args:
-        pptx_path: Path to the PowerPoint file
-        prs: Optional Presentation object to use. If not provided, will load from pptx_path.
-        issues_only: If True, only include shapes that have overflow or overlap issues
+# Presentation loaded once by each worker process of a parallel extraction
+_worker_prs: Optional[Any] = None
 
-    Returns a nested dictionary: {slide-N: {shape-N: ShapeData}}
-    Shapes are sorted by visual position (top-to-bottom, left-to-right).
-    The ShapeData objects contain the full shape information and can be
-    converted to dictionaries for JSON serialization using to_dict().
-    """
-    if prs is None:
-        prs = Presentation(str(pptx_path))
-    inventory: InventoryData = {}
 
-    for slide_idx, slide in enumerate(prs.slides):
-        # Collect all valid shapes from this slide with absolute positions
-        shapes_with_positions = []
-        for shape in slide.shapes:  # type: ignore
-            shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
+def _init_worker(pptx_path: str) -> None:
+    """Load the presentation in a worker process."""
+    global _worker_prs
+    _worker_prs = Presentation(pptx_path)
 
-        if not shapes_with_positions:
-            continue
 
-        # Convert to ShapeData with absolute positions and slide reference
-        shape_data_list = [
+def _estimate_slides_overflow(
+    slide_indices: List[int],
+) -> Dict[int, List[Optional[float]]]:
+    """Estimate frame overflow of every text shape on the given slides (in a worker).
+
+    Returns slide index -> frame_overflow_bottom per shape, in the order of
+    collect_slide_shapes.
+    """
+    slides = _worker_prs.slides  # type: ignore
+    return {
+        slide_idx: [
             ShapeData(
                 swp.shape,
                 swp.absolute_left,
                 swp.absolute_top,
-                slide,
-            )
-            for swp in shapes_with_positions
+                slides[slide_idx],
+                passes=["frame-overflow"],
+            ).frame_overflow_bottom
+            for swp in collect_slide_shapes(slides[slide_idx])
         ]
+        for slide_idx in slide_indices
+    }
+
 
-        # Sort by visual position and assign stable IDs in one step
+def estimate_frame_overflow_parallel(
+    pptx_path: Path, slide_indices: List[int], workers: int
+) -> Dict[int, List[Optional[float]]]:
+    """Estimate frame overflow for the given slides, sharded across a process pool.
+
+    Font resolution and text measurement dominate inventory time and are
+    independent per slide, so each worker loads the presentation from
+    pptx_path once and measures an interleaved share of the slides.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        slide_indices: Indices of the slides to measure
+        workers: Number of worker processes
+
+    Returns:
+        Slide index -> frame_overflow_bottom per shape, in collect_slide_shapes order
+    """
+    workers = max(1, min(workers, len(slide_indices)))
+    shards = [slide_indices[k::workers] for k in range(workers)]
+
+    results: Dict[int, List[Optional[float]]] = {}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(str(pptx_path),)
+    ) as executor:
+        for shard_results in executor.map(_estimate_slides_overflow, shards):
+            results.update(shard_results)
+    return results
+
+
+def arrange_slide_shapes(
+    shape_data_list: List[ShapeData],
+    issues_only: bool = False,
+    passes: Iterable[str] = INVENTORY_PASSES,
+    profile: Optional[InventoryProfile] = None,
+) -> List[ShapeData]:
+    """Sort a slide's shapes, assign their IDs and run the slide-level passes.
+
+    Args:
+        shape_data_list: The slide's shapes, in collection order
+        issues_only: If True, only return shapes with issues
+        passes: Analysis passes to run (see INVENTORY_PASSES)
+        profile: Optional InventoryProfile to record the passes' cost in
+
+    Returns:
+        Shapes sorted by visual position with shape_id set
+    """
+    passes = resolve_passes(passes)
+
+    # Sort by visual position and assign stable IDs in one step
+    with pass_timer(profile, "geometry"):
         sorted_shapes = sort_shapes_by_position(shape_data_list)
         for idx, shape_data in enumerate(sorted_shapes):
             shape_data.shape_id = f"shape-{idx}"
 
-        # Detect overlaps using the stable shape IDs
-        if len(sorted_shapes) > 1:
+    # Detect overlaps using the stable shape IDs
+    if "overlaps" in passes and len(sorted_shapes) > 1:
+        with pass_timer(profile, "overlaps"):
             detect_overlaps(sorted_shapes)
 
-        # Filter for issues only if requested (after overlap detection)
-        if issues_only:
-            sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+    # Filter for issues only if requested (after overlap detection)
+    if issues_only:
+        sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+
+    return sorted_shapes
+
 
+def extract_text_inventory(
+    pptx_path: Path,
+    prs: Optional[Any] = None,
+    issues_only: bool = False,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    passes: Optional[Iterable[str]] = None,
+    profile: Optional[InventoryProfile] = None,
+) -> InventoryData:
+    """Extract text content from all slides in a PowerPoint presentation.
+
+    Collects iter_text_inventory into a dictionary; see it for the arguments.
+
+    Returns a nested dictionary: {slide-N: {shape-N: ShapeData}}
+    Shapes are sorted by visual position (top-to-bottom, left-to-right).
+    The ShapeData objects contain the full shape information and can be
+    converted to dictionaries for JSON serialization using to_dict().
+    """
+    return dict(
+        iter_text_inventory(
+            pptx_path, prs, issues_only, workers, cache_dir, passes, profile
+        )
+    )
+
+
+def iter_text_inventory(
+    pptx_path: Path,
+    prs: Optional[Any] = None,
+    issues_only: bool = False,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    passes: Optional[Iterable[str]] = None,
+    profile: Optional[InventoryProfile] = None,
+) -> Iterator[Tuple[str, Dict[str, ShapeData]]]:
+    """Extract text content slide by slide, yielding each slide once analyzed.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        prs: Optional Presentation object to use. If not provided, will load from pptx_path.
+        issues_only: If True, only include shapes that have overflow or overlap issues
+        workers: Number of processes used to estimate text overflow. With more
+            than one, each worker loads pptx_path itself, so prs (if given)
+            must not have unsaved changes.
+        cache_dir: Optional directory for caching text measurements across
+            runs (see InventoryCache). Unchanged slides are not re-measured.
+        passes: Analysis passes to run (see INVENTORY_PASSES), or None for
+            all. For example, ["geometry"] only locates the text shapes.
+        profile: Optional InventoryProfile to record the cost of each pass in
+
+    Yields:
+        ("slide-N", {shape-N: ShapeData}) for each slide with text shapes,
+        the shapes sorted by visual position
+    """
+    passes = resolve_passes(passes)
+    measure = "frame-overflow" in passes
+
+    if prs is None:
+        with pass_timer(profile, "load"):
+            prs = Presentation(str(pptx_path))
+
+    # Text measurements (frame overflow per shape) known before the main pass
+    frame_overflows: Dict[int, List[Optional[float]]] = {}
+
+    # Serve unchanged slides from the cache (keys are computed before measuring)
+    cache = InventoryCache(cache_dir) if cache_dir and measure else None
+    cache_keys: Dict[int, str] = {}
+    if cache:
+        with pass_timer(profile, "frame-overflow"):
+            for slide_idx, slide in enumerate(prs.slides):
+                cache_keys[slide_idx] = cache.key(slide)
+                cached = cache.get(cache_keys[slide_idx])
+                if cached is not None:
+                    frame_overflows[slide_idx] = cached
+    cached_slides = set(frame_overflows)
+
+    # Measure text in worker processes; everything else is cheap and stays here
+    pending = [i for i in range(len(prs.slides)) if i not in cached_slides]
+    if measure and workers > 1 and len(pending) > 1:
+        with pass_timer(profile, "frame-overflow"):
+            frame_overflows.update(
+                estimate_frame_overflow_parallel(pptx_path, pending, workers)
+            )
+
+    for slide_idx, slide in enumerate(prs.slides):
+        with pass_timer(profile, "geometry"):
+            # Collect all valid shapes from this slide with absolute positions
+            shapes_with_positions = collect_slide_shapes(slide)
+
+            if not shapes_with_positions:
+                continue
+
+            # Convert to ShapeData with absolute positions and slide reference
+            measured = frame_overflows.get(slide_idx)
+            if measured is not None and len(measured) != len(shapes_with_positions):
+                measured = None  # Stale cache entry; measure again
+            shape_data_list = [
+                ShapeData(
+                    swp.shape,
+                    swp.absolute_left,
+                    swp.absolute_top,
+                    slide,
+                    estimate_overflow=measured is None,
+                    passes=passes,
+                    profile=profile,
+                )
+                for swp in shapes_with_positions
+            ]
+        if measured is None:
+            measured = [sd.frame_overflow_bottom for sd in shape_data_list]
+        else:
+            for shape_data, overflow in zip(shape_data_list, measured):
+                shape_data.frame_overflow_bottom = overflow
+        if cache and slide_idx not in cached_slides:
+            cache.put(cache_keys[slide_idx], measured)
+
+        sorted_shapes = arrange_slide_shapes(
+            shape_data_list, issues_only, passes, profile
+        )
         if not sorted_shapes:
             continue
 
         # Create slide inventory using the stable shape IDs
-        inventory[f"slide-{slide_idx}"] = {
+        yield f"slide-{slide_idx}", {
             shape_data.shape_id: shape_data for shape_data in sorted_shapes
         }
 
-    return inventory
 
+# Namespace prefixes of the elements read by the XML inventory engine
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Children of p:spTree and p:grpSp that python-pptx treats as shapes
+SHAPE_TAGS = {
+    f"{P_NS}sp",
+    f"{P_NS}grpSp",
+    f"{P_NS}graphicFrame",
+    f"{P_NS}cxnSp",
+    f"{P_NS}pic",
+    f"{P_NS}contentPart",
+}
+
+# Master placeholder type that a layout placeholder inherits its position from
+LAYOUT_BASE_PLACEHOLDER_TYPES = {
+    PP_PLACEHOLDER.BODY: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.BITMAP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CENTER_TITLE: PP_PLACEHOLDER.TITLE,
+    PP_PLACEHOLDER.ORG_CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.DATE: PP_PLACEHOLDER.DATE,
+    PP_PLACEHOLDER.FOOTER: PP_PLACEHOLDER.FOOTER,
+    PP_PLACEHOLDER.MEDIA_CLIP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.OBJECT: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.PICTURE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.SLIDE_NUMBER: PP_PLACEHOLDER.SLIDE_NUMBER,
+    PP_PLACEHOLDER.SUBTITLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TABLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TITLE: PP_PLACEHOLDER.TITLE,
+}
+
+# Transform child and attribute holding each shape dimension
+XFRM_ATTRIBUTES = {
+    "left": ("off", "x"),
+    "top": ("off", "y"),
+    "width": ("ext", "cx"),
+    "height": ("ext", "cy"),
+}
+
+
+def get_placeholder_element(shape_elm: Any) -> Optional[Any]:
+    """Get the p:ph element of a shape element, or None if it is not a placeholder."""
+    for child in shape_elm:
+        if isinstance(child.tag, str):
+            # Only the first child (the p:nvXxPr element) is checked
+            nvPr = child.find(f"{P_NS}nvPr")
+            return nvPr.find(f"{P_NS}ph") if nvPr is not None else None
+    return None
+
+
+def get_placeholder_type(ph: Any) -> PP_PLACEHOLDER:
+    """Get the placeholder type of a p:ph element ("obj" when not specified)."""
+    return PP_PLACEHOLDER.from_xml(ph.get("type", "obj"))
+
+
+def get_own_dimension(shape_elm: Any, name: str) -> Optional[int]:
+    """Get a shape's directly-applied left, top, width or height in EMUs.
+
+    Returns None when the shape has no transform, e.g. a placeholder that
+    inherits its position from the slide layout.
+    """
+    if shape_elm.tag == f"{P_NS}graphicFrame":
+        xfrm = shape_elm.find(f"{P_NS}xfrm")
+    else:
+        properties = shape_elm.find(
+            f"{P_NS}grpSpPr" if shape_elm.tag == f"{P_NS}grpSp" else f"{P_NS}spPr"
+        )
+        xfrm = properties.find(f"{A_NS}xfrm") if properties is not None else None
+    if xfrm is None:
+        return None
+    child_name, attribute = XFRM_ATTRIBUTES[name]
+    child = xfrm.find(f"{A_NS}{child_name}")
+    if child is None or child.get(attribute) is None:
+        return None
+    return int(child.get(attribute))
+
+
+def get_paragraph_text(p: Any) -> str:
+    """Get the text of an a:p element the way python-pptx does.
+
+    Runs and fields contribute their a:t text and line breaks a vertical tab.
+    """
+    parts = []
+    for child in p:
+        if child.tag == f"{A_NS}r" or child.tag == f"{A_NS}fld":
+            t = child.find(f"{A_NS}t")
+            parts.append((t.text if t is not None else None) or "")
+        elif child.tag == f"{A_NS}br":
+            parts.append("\v")
+    return "".join(parts)
+
+
+class XmlPackage:
+    """Read-only view of the XML parts of a .pptx file.
+
+    Parts are parsed with lxml on first use and shared by all slides, so each
+    layout and master is parsed once. Nothing is ever written back.
+    """
+
+    def __init__(self, pptx_path: Path):
+        """Open the package.
+
+        Args:
+            pptx_path: Path to the PowerPoint file
+        """
+        self._zip = zipfile.ZipFile(pptx_path)
+        self._names = set(self._zip.namelist())
+        self._elements: Dict[str, Any] = {}
+        self._relationships: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self._placeholders: Dict[str, List[Tuple[Any, Any]]] = {}
+
+    def __enter__(self) -> "XmlPackage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying zip file."""
+        self._zip.close()
+
+    def has_part(self, partname: str) -> bool:
+        """Whether the package contains a part."""
+        return partname in self._names
+
+    def blob(self, partname: str) -> bytes:
+        """Get the raw bytes of a part."""
+        return self._zip.read(partname)
 
-def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> InventoryDict:
+    def element(self, partname: str, cache: bool = True) -> Any:
+        """Get the parsed root element of an XML part.
+
+        Args:
+            partname: Name of the part
+            cache: Keep the element for later calls. Slides are parsed
+                without caching so that only one is held in memory at a time.
+        """
+        element = self._elements.get(partname)
+        if element is None:
+            element = lxml.etree.fromstring(self.blob(partname))
+            if cache:
+                self._elements[partname] = element
+        return element
+
+    def relationships(self, partname: str) -> Dict[str, Tuple[str, str]]:
+        """Get a part's internal relationships as rId -> (type, target part name).
+
+        Args:
+            partname: Name of the source part, or "" for the package itself
+        """
+        if partname in self._relationships:
+            return self._relationships[partname]
+
+        directory, name = posixpath.split(partname)
+        rels_name = posixpath.join(directory, "_rels", f"{name}.rels")
+        relationships: Dict[str, Tuple[str, str]] = {}
+        if rels_name in self._names:
+            for rel in self.element(rels_name).iter(f"{RELS_NS}Relationship"):
+                if rel.get("TargetMode") == "External":
+                    continue
+                target = rel.get("Target", "")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join(directory, target))
+                relationships[rel.get("Id")] = (rel.get("Type", ""), target)
+        self._relationships[partname] = relationships
+        return relationships
+
+    def related(self, partname: str, relationship_type: str) -> Optional[str]:
+        """Get the first part related to partname by type, e.g. "slideLayout"."""
+        for rel_type, target in self.relationships(partname).values():
+            if rel_type.rsplit("/", 1)[-1] == relationship_type:
+                return target
+        return None
+
+    def placeholders(self, partname: Optional[str]) -> List[Tuple[Any, Any]]:
+        """Get (shape element, p:ph element) per top-level placeholder of a part."""
+        if partname is None:
+            return []
+        if partname not in self._placeholders:
+            placeholders = []
+            spTree = self.element(partname).find(f"{P_NS}cSld/{P_NS}spTree")
+            for shape_elm in spTree if spTree is not None else []:
+                if shape_elm.tag in SHAPE_TAGS:
+                    ph = get_placeholder_element(shape_elm)
+                    if ph is not None:
+                        placeholders.append((shape_elm, ph))
+            self._placeholders[partname] = placeholders
+        return self._placeholders[partname]
+
+    @property
+    def presentation_partname(self) -> str:
+        """Part name of the main presentation part."""
+        presentation = self.related("", "officeDocument")
+        if presentation is None:
+            raise ValueError("Package has no presentation part")
+        return presentation
+
+    def slide_size(self) -> Tuple[Optional[int], Optional[int]]:
+        """Get the slide (width, height) in EMUs, or (None, None) if not set."""
+        slide_size = self.element(self.presentation_partname).find(f"{P_NS}sldSz")
+        if slide_size is None:
+            return None, None
+        return int(slide_size.get("cx")), int(slide_size.get("cy"))
+
+    def slides(self) -> Iterator["XmlSlide"]:
+        """Iterate over the slides in presentation order.
+
+        Each slide part is parsed when it is reached and is not cached by the
+        package, so slides that are no longer referenced can be freed.
+        """
+        presentation = self.presentation_partname
+        root = self.element(presentation)
+        relationships = self.relationships(presentation)
+        slide_width, slide_height = self.slide_size()
+
+        for sldId in root.iterfind(f"{P_NS}sldIdLst/{P_NS}sldId"):
+            _, partname = relationships[sldId.get(f"{R_NS}id")]
+            yield XmlSlide(self, partname, slide_width, slide_height)
+
+
+class XmlSlide:
+    """A slide read by XmlPackage, with its layout and master."""
+
+    def __init__(
+        self,
+        package: XmlPackage,
+        partname: str,
+        slide_width_emu: Optional[int],
+        slide_height_emu: Optional[int],
+    ):
+        """Initialize from the slide's part name.
+
+        Args:
+            package: Package containing the slide
+            partname: Part name of the slide, e.g. "ppt/slides/slide1.xml"
+            slide_width_emu: Slide width from the presentation, if set
+            slide_height_emu: Slide height from the presentation, if set
+        """
+        self.package = package
+        self.partname = partname
+        self.element = package.element(partname, cache=False)
+        self.layout_partname = package.related(partname, "slideLayout")
+        self.master_partname = (
+            package.related(self.layout_partname, "slideMaster")
+            if self.layout_partname
+            else None
+        )
+        self.slide_width_emu = slide_width_emu
+        self.slide_height_emu = slide_height_emu
+
+    @property
+    def master_element(self) -> Optional[Any]:
+        """Root element of the slide master, if the slide has one."""
+        if self.master_partname is None:
+            return None
+        return self.package.element(self.master_partname)
+
+    def shape_elements(self) -> List[Any]:
+        """Get the top-level shape elements of the slide in document order."""
+        spTree = self.element.find(f"{P_NS}cSld/{P_NS}spTree")
+        if spTree is None:
+            return []
+        return [elm for elm in spTree if elm.tag in SHAPE_TAGS]
+
+    def dimension(self, shape_elm: Any, name: str) -> Optional[int]:
+        """Get the effective left, top, width or height of a shape in EMUs.
+
+        Top-level placeholder shapes without a transform of their own inherit
+        it from the layout placeholder with the same idx, which in turn
+        inherits from the master placeholder of the matching type. Shapes
+        inside groups never inherit, as in python-pptx.
+        """
+        value = get_own_dimension(shape_elm, name)
+        if value is not None or shape_elm.tag != f"{P_NS}sp":
+            return value
+        if shape_elm.getparent().tag != f"{P_NS}spTree":
+            return None
+        ph = get_placeholder_element(shape_elm)
+        if ph is None:
+            return None
+
+        idx = int(ph.get("idx", 0))
+        for layout_elm, layout_ph in self.package.placeholders(self.layout_partname):
+            if int(layout_ph.get("idx", 0)) != idx:
+                continue
+            value = get_own_dimension(layout_elm, name)
+            if value is not None or layout_elm.tag != f"{P_NS}sp":
+                return value
+            base_type = LAYOUT_BASE_PLACEHOLDER_TYPES.get(
+                get_placeholder_type(layout_ph)
+            )
+            for master_elm, master_ph in self.package.placeholders(
+                self.master_partname
+            ):
+                if (
+                    master_elm.tag == f"{P_NS}sp"
+                    and get_placeholder_type(master_ph) == base_type
+                ):
+                    return get_own_dimension(master_elm, name)
+            return None
+        return None
+
+    def layout_font_size(self, placeholder_type: PP_PLACEHOLDER) -> Optional[float]:
+        """Get the default font size of a placeholder type from the slide layout.
+
+        Mirrors ShapeData.get_default_font_size: the first layout placeholder
+        of the same type is searched for a defRPr element with a size.
+        """
+        for layout_elm, layout_ph in self.package.placeholders(self.layout_partname):
+            if get_placeholder_type(layout_ph) == placeholder_type:
+                for elem in layout_elm.iter():
+                    if (
+                        isinstance(elem.tag, str)
+                        and "defRPr" in elem.tag
+                        and (sz := elem.get("sz"))
+                    ):
+                        return float(sz) / 100.0
+                break
+        return None
+
+
+class XmlParagraphData(ParagraphData):
+    """ParagraphData read directly from an a:p element."""
+
+    ALIGNMENTS = {"ctr": "CENTER", "r": "RIGHT", "just": "JUSTIFY"}
+
+    def __init__(self, p: Any, text: Optional[str] = None):
+        """Initialize from an a:p element.
+
+        Args:
+            p: The a:p element
+            text: The paragraph's text, if already known
+        """
+        self._init_fields(get_paragraph_text(p) if text is None else text)
+
+        pPr = p.find(f"{A_NS}pPr")
+        if pPr is not None:
+            # Check for bullet formatting
+            if (
+                pPr.find(f"{A_NS}buChar") is not None
+                or pPr.find(f"{A_NS}buAutoNum") is not None
+            ):
+                self.bullet = True
+                self.level = int(pPr.get("lvl", 0))
+
+            # Add alignment if not LEFT (default)
+            self.alignment = self.ALIGNMENTS.get(pPr.get("algn"))
+
+            # Add spacing properties if set
+            self.space_before = self._spacing_points(pPr.find(f"{A_NS}spcBef"))
+            self.space_after = self._spacing_points(pPr.find(f"{A_NS}spcAft"))
+
+        # Extract font properties from first run
+        r = p.find(f"{A_NS}r")
+        rPr = r.find(f"{A_NS}rPr") if r is not None else None
+        if rPr is not None:
+            latin = rPr.find(f"{A_NS}latin")
+            if latin is not None and latin.get("typeface"):
+                self.font_name = latin.get("typeface")
+            if rPr.get("sz") is not None:
+                self.font_size = self._centipoints_to_points(rPr.get("sz"))
+            if rPr.get("b") is not None:
+                self.bold = rPr.get("b") in ("1", "true")
+            if rPr.get("i") is not None:
+                self.italic = rPr.get("i") in ("1", "true")
+            if rPr.get("u") is not None:
+                underline = MSO_UNDERLINE.from_xml(rPr.get("u"))
+                if underline == MSO_UNDERLINE.NONE:
+                    self.underline = False
+                elif underline == MSO_UNDERLINE.SINGLE_LINE:
+                    self.underline = True
+                else:
+                    self.underline = underline  # type: ignore
+
+            # Handle color - both RGB and theme colors
+            color = rPr.find(f"{A_NS}solidFill/*")
+            if color is not None and color.tag == f"{A_NS}srgbClr":
+                self.color = color.get("val", "").upper()
+            elif color is not None and color.tag == f"{A_NS}schemeClr":
+                try:
+                    self.theme_color = MSO_THEME_COLOR.from_xml(color.get("val")).name
+                except ValueError:
+                    pass
+
+        # Add line spacing if set
+        lnSpc = pPr.find(f"{A_NS}lnSpc") if pPr is not None else None
+        if lnSpc is not None:
+            spcPts = lnSpc.find(f"{A_NS}spcPts")
+            spcPct = lnSpc.find(f"{A_NS}spcPct")
+            if spcPts is not None:
+                self.line_spacing = round(
+                    self._centipoints_to_points(spcPts.get("val")), 2
+                )
+            elif spcPct is not None:
+                # Multiplier - convert to points
+                value = spcPct.get("val", "0")
+                lines = (
+                    float(value[:-1]) / 100.0
+                    if value.endswith("%")
+                    else int(value) / 100000.0
+                )
+                font_size = self.font_size if self.font_size else 12.0
+                self.line_spacing_lines = lines
+                self.line_spacing = round(lines * font_size, 2)
+
+    @staticmethod
+    def _centipoints_to_points(value: str) -> float:
+        """Convert a centipoint attribute to points via EMUs, as python-pptx does."""
+        return int(int(value) * 127) / 12700.0
+
+    @classmethod
+    def _spacing_points(cls, spacing: Optional[Any]) -> Optional[float]:
+        """Get the points of an a:spcBef or a:spcAft element (None if unset or 0)."""
+        spcPts = spacing.find(f"{A_NS}spcPts") if spacing is not None else None
+        if spcPts is None:
+            return None
+        return cls._centipoints_to_points(spcPts.get("val")) or None
+
+
+class XmlShapeData(ShapeData):
+    """ShapeData read directly from a p:sp element.
+
+    Has no python-pptx shape; the element attribute holds the p:sp element.
+    """
+
+    # Text frame insets python-pptx reports when bodyPr does not set them
+    DEFAULT_INSETS = {"lIns": 91440, "tIns": 45720, "rIns": 91440, "bIns": 45720}
+
+    def __init__(
+        self,
+        shape_elm: Any,
+        absolute_left: int,
+        absolute_top: int,
+        slide: XmlSlide,
+        estimate_overflow: bool = True,
+        passes: Iterable[str] = INVENTORY_PASSES,
+        profile: Optional["InventoryProfile"] = None,
+    ):
+        """Initialize from a p:sp element with text.
+
+        Args:
+            shape_elm: The p:sp element (should be pre-validated)
+            absolute_left: Absolute left position in EMUs
+            absolute_top: Absolute top position in EMUs
+            slide: Slide containing the shape
+            estimate_overflow: If False, skip text measurement and leave
+                frame_overflow_bottom for the caller to fill in
+            passes: Analysis passes to run (see INVENTORY_PASSES)
+            profile: Optional InventoryProfile to record the passes' cost in
+        """
+        self.shape = None
+        self.element = shape_elm
+        self.shape_id: str = ""  # Will be set after sorting
+        self.passes = resolve_passes(passes)
+        self.profile = profile
+        self._slide = slide
+        self._paragraphs: Optional[List[ParagraphData]] = None
+        self.slide_width_emu = slide.slide_width_emu
+        self.slide_height_emu = slide.slide_height_emu
+
+        txBody = shape_elm.find(f"{P_NS}txBody")
+        self._paragraph_elements = (
+            txBody.findall(f"{A_NS}p") if txBody is not None else []
+        )
+        self._paragraph_texts = [
+            get_paragraph_text(p) for p in self._paragraph_elements
+        ]
+        bodyPr = txBody.find(f"{A_NS}bodyPr") if txBody is not None else None
+        insets = {
+            name: int(bodyPr.get(name, default)) if bodyPr is not None else default
+            for name, default in self.DEFAULT_INSETS.items()
+        }
+        self._text_frame = SimpleNamespace(
+            margin_left=insets["lIns"],
+            margin_top=insets["tIns"],
+            margin_right=insets["rIns"],
+            margin_bottom=insets["bIns"],
+        )
+
+        # Get placeholder type if applicable
+        self.placeholder_type: Optional[str] = None
+        self.default_font_size: Optional[float] = None
+        ph = get_placeholder_element(shape_elm)
+        if ph is not None:
+            self.placeholder_type = get_placeholder_type(ph).name
+
+        self._set_geometry(
+            absolute_left,
+            absolute_top,
+            slide.dimension(shape_elm, "width") or 0,
+            slide.dimension(shape_elm, "height") or 0,
+        )
+        self._run_passes(estimate_overflow)
+
+    def _get_layout_font_size(self) -> Optional[float]:
+        """Get the default font size of a placeholder from the slide layout."""
+        if not self.placeholder_type:
+            return None
+        return self._slide.layout_font_size(PP_PLACEHOLDER[self.placeholder_type])
+
+    def _read_paragraphs(self) -> List[ParagraphData]:
+        """Read the non-empty paragraphs from the shape's a:p elements."""
+        return [
+            XmlParagraphData(p, text)
+            for p, text in zip(self._paragraph_elements, self._paragraph_texts)
+            if text.strip()
+        ]
+
+    def _get_default_font_size(self) -> int:
+        """Get default font size from the master's text styles."""
+        master_element = self._slide.master_element
+        if master_element is None:
+            return 14
+        return self.get_theme_font_size(master_element, self.placeholder_type)
+
+    def _frame_paragraphs(
+        self,
+    ) -> Optional[Tuple[Any, Iterator[Tuple[int, str, ParagraphData]]]]:
+        """Get the text frame and its non-empty paragraphs, for measuring."""
+        if not self._paragraph_elements:
+            return None
+
+        return self._text_frame, (
+            (para_idx, text, XmlParagraphData(p, text))
+            for para_idx, (p, text) in enumerate(
+                zip(self._paragraph_elements, self._paragraph_texts)
+            )
+            if text.strip()
+        )
+
+    def _detect_bullet_issues(self) -> None:
+        """Detect bullet point formatting issues in paragraphs."""
+        self._detect_manual_bullets(self._paragraph_texts)
+
+
+def is_valid_xml_shape(shape_elm: Any) -> bool:
+    """Check if a shape element contains meaningful text, like is_valid_shape."""
+    # Only p:sp shapes have a text frame
+    if shape_elm.tag != f"{P_NS}sp":
+        return False
+
+    txBody = shape_elm.find(f"{P_NS}txBody")
+    if txBody is None:
+        return False
+    text = "\n".join(get_paragraph_text(p) for p in txBody.iterfind(f"{A_NS}p"))
+    text = text.strip()
+    if not text:
+        return False
+
+    # Skip slide numbers and numeric footers
+    ph = get_placeholder_element(shape_elm)
+    if ph is not None:
+        placeholder_type = get_placeholder_type(ph)
+        if placeholder_type == PP_PLACEHOLDER.SLIDE_NUMBER:
+            return False
+        if placeholder_type == PP_PLACEHOLDER.FOOTER and text.isdigit():
+            return False
+
+    return True
+
+
+def collect_xml_shapes(
+    shape_elm: Any, slide: XmlSlide, parent_left: int = 0, parent_top: int = 0
+) -> List[Tuple[Any, int, int]]:
+    """Recursively collect text shape elements with absolute positions.
+
+    The XML counterpart of collect_shapes_with_absolute_positions.
+
+    Returns:
+        List of (p:sp element, absolute left, absolute top) in EMUs
+    """
+    if shape_elm.tag == f"{P_NS}grpSp":
+        # Calculate absolute position for this group
+        abs_group_left = parent_left + (slide.dimension(shape_elm, "left") or 0)
+        abs_group_top = parent_top + (slide.dimension(shape_elm, "top") or 0)
+
+        result = []
+        for child in shape_elm:
+            if child.tag in SHAPE_TAGS:
+                result.extend(
+                    collect_xml_shapes(child, slide, abs_group_left, abs_group_top)
+                )
+        return result
+
+    if is_valid_xml_shape(shape_elm):
+        return [
+            (
+                shape_elm,
+                parent_left + (slide.dimension(shape_elm, "left") or 0),
+                parent_top + (slide.dimension(shape_elm, "top") or 0),
+            )
+        ]
+
+    return []
+
+
+def extract_text_inventory_xml(
+    pptx_path: Path,
+    issues_only: bool = False,
+    cache_dir: Optional[Path] = None,
+    passes: Optional[Iterable[str]] = None,
+    profile: Optional[InventoryProfile] = None,
+) -> InventoryData:
+    """Extract text content from all slides by reading the package XML directly.
+
+    Collects iter_text_inventory_xml into a dictionary; see it for details.
+
+    Returns a nested dictionary: {slide-N: {shape-N: XmlShapeData}}
+    """
+    return dict(
+        iter_text_inventory_xml(pptx_path, issues_only, cache_dir, passes, profile)
+    )
+
+
+def iter_text_inventory_xml(
+    pptx_path: Path,
+    issues_only: bool = False,
+    cache_dir: Optional[Path] = None,
+    passes: Optional[Iterable[str]] = None,
+    profile: Optional[InventoryProfile] = None,
+) -> Iterator[Tuple[str, Dict[str, ShapeData]]]:
+    """Extract text content slide by slide by reading the package XML directly.
+
+    Produces the same inventory as extract_text_inventory without building
+    python-pptx objects: slide, layout and master parts are parsed once with
+    lxml, and inherited placeholder positions and font sizes are resolved
+    from them. The file is only read, never modified. The returned
+    XmlShapeData objects have no python-pptx shape, so use
+    extract_text_inventory when the shapes are to be edited.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        issues_only: If True, only include shapes that have overflow or overlap issues
+        cache_dir: Optional directory for caching text measurements across
+            runs (see InventoryCache). Entries are keyed by the raw part
+            bytes, so they are not shared with extract_text_inventory.
+        passes: Analysis passes to run (see INVENTORY_PASSES), or None for all
+        profile: Optional InventoryProfile to record the cost of each pass in
+
+    Yields:
+        ("slide-N", {shape-N: XmlShapeData}) for each slide with text shapes
+    """
+    passes = resolve_passes(passes)
+    measure = "frame-overflow" in passes
+    cache = InventoryCache(cache_dir) if cache_dir and measure else None
+
+    with XmlPackage(pptx_path) as package:
+        slides = enumerate(package.slides())
+        while True:
+            with pass_timer(profile, "load"):
+                slide_idx, slide = next(slides, (None, None))
+            if slide is None:
+                break
+
+            with pass_timer(profile, "geometry"):
+                shapes_with_positions = []
+                for shape_elm in slide.shape_elements():
+                    shapes_with_positions.extend(
+                        collect_xml_shapes(shape_elm, slide)
+                    )
+
+            if not shapes_with_positions:
+                continue
+
+            # Reuse cached measurements of unchanged slides
+            with pass_timer(profile, "frame-overflow"):
+                cache_key = cache.xml_key(slide) if cache else None
+                measured = cache.get(cache_key) if cache_key else None
+            if measured is not None and len(measured) != len(shapes_with_positions):
+                measured = None  # Stale cache entry; measure again
+            with pass_timer(profile, "geometry"):
+                shape_data_list = [
+                    XmlShapeData(
+                        shape_elm,
+                        left,
+                        top,
+                        slide,
+                        estimate_overflow=measured is None,
+                        passes=passes,
+                        profile=profile,
+                    )
+                    for shape_elm, left, top in shapes_with_positions
+                ]
+            if measured is None:
+                if cache_key:
+                    cache.put(
+                        cache_key, [sd.frame_overflow_bottom for sd in shape_data_list]
+                    )
+            else:
+                for shape_data, overflow in zip(shape_data_list, measured):
+                    shape_data.frame_overflow_bottom = overflow
+
+            sorted_shapes = arrange_slide_shapes(
+                shape_data_list, issues_only, passes, profile
+            )
+            if not sorted_shapes:
+                continue
+
+            yield f"slide-{slide_idx}", {
+                shape_data.shape_id: shape_data for shape_data in sorted_shapes
+            }
+
+
+def get_inventory_as_dict(
+    pptx_path: Path,
+    issues_only: bool = False,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    engine: str = "pptx",
+    passes: Optional[Iterable[str]] = None,
+) -> InventoryDict:
     """Extract text inventory and return as JSON-serializable dictionaries.
 
     This is a convenience wrapper around extract_text_inventory that returns
@@ -990,11 +2608,28 @@ def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> Invento
     Args:
         pptx_path: Path to the PowerPoint file
         issues_only: If True, only include shapes that have overflow or overlap issues
+        workers: Number of processes used to estimate text overflow
+            (python-pptx engine only)
+        cache_dir: Optional directory for caching text measurements across runs
+        engine: "pptx" to read the presentation with python-pptx, or "xml" to
+            read its XML parts directly (see extract_text_inventory_xml)
+        passes: Analysis passes to run (see INVENTORY_PASSES), or None for all
 
     Returns:
         Nested dictionary with all data serialized for JSON
     """
-    inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
+    if engine == "xml":
+        inventory = extract_text_inventory_xml(
+            pptx_path, issues_only=issues_only, cache_dir=cache_dir, passes=passes
+        )
+    else:
+        inventory = extract_text_inventory(
+            pptx_path,
+            issues_only=issues_only,
+            workers=workers,
+            cache_dir=cache_dir,
+            passes=passes,
+        )
 
     # Convert ShapeData objects to dictionaries
     dict_inventory: InventoryDict = {}
@@ -1006,20 +2641,91 @@ def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> Invento
     return dict_inventory
 
 
-def save_inventory(inventory: InventoryData, output_path: Path) -> None:
+def save_inventory(
+    inventory: InventoryData,
+    output_path: Path,
+    output_format: str = "json",
+    compact: bool = False,
+) -> Tuple[int, int]:
     """Save inventory to JSON file with proper formatting.
 
     Converts ShapeData objects to dictionaries for JSON serialization.
-    """
-    # Convert ShapeData objects to dictionaries
-    json_inventory: InventoryDict = {}
-    for slide_key, shapes in inventory.items():
-        json_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
-        }
 
+    Args:
+        inventory: Inventory, or an iterable of (slide key, shapes) pairs such
+            as iter_text_inventory(), which is written slide by slide
+        output_path: Path of the file to write
+        output_format: "json" or "jsonl" (see write_inventory)
+        compact: Write without indentation and omit default values
+
+    Returns:
+        Number of slides and shapes written
+    """
+    slides = inventory.items() if isinstance(inventory, dict) else inventory
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(json_inventory, f, indent=2, ensure_ascii=False)
+        return write_inventory(slides, f, output_format, compact)
+
+
+def write_inventory(
+    slides: Iterable[Tuple[str, Dict[str, ShapeData]]],
+    output: TextIO,
+    output_format: str = "json",
+    compact: bool = False,
+) -> Tuple[int, int]:
+    """Write an inventory as it is produced, one slide at a time.
+
+    Only the current slide is converted to dictionaries, so memory use does not
+    grow with the number of slides. The "json" format is identical to dumping
+    the whole inventory with json.dump(indent=2). The "jsonl" format writes
+    one object per shape with its "slide" and "shape" keys, for tools that
+    process shapes as a stream.
+
+    Args:
+        slides: (slide key, {shape key: ShapeData}) pairs in output order
+        output: Text file to write to
+        output_format: "json" or "jsonl"
+        compact: Write without indentation and omit default values
+            (see ShapeData.to_dict)
+
+    Returns:
+        Number of slides and shapes written
+    """
+    if output_format not in ("json", "jsonl"):
+        raise ValueError(f"Unknown inventory format: {output_format}")
+    indent = None if compact else 2
+    separators = (",", ":") if compact or output_format == "jsonl" else None
+
+    total_slides = total_shapes = 0
+    for slide_key, shapes in slides:
+        json_shapes = {
+            shape_key: shape_data.to_dict(compact)
+            for shape_key, shape_data in shapes.items()
+        }
+        if output_format == "jsonl":
+            for shape_key, shape in json_shapes.items():
+                record = {"slide": slide_key, "shape": shape_key, **shape}
+                output.write(
+                    json.dumps(record, separators=separators, ensure_ascii=False)
+                )
+                output.write("\n")
+        else:
+            # Dump the slide as a single-entry object, without its braces
+            entry = json.dumps(
+                {slide_key: json_shapes},
+                indent=indent,
+                separators=separators,
+                ensure_ascii=False,
+            )[1:-1]
+            if indent:
+                entry = entry[1:-1]  # Newlines around the entry
+            output.write(("{" if not total_slides else ",") + ("\n" if indent else ""))
+            output.write(entry)
+        total_slides += 1
+        total_shapes += len(shapes)
+
+    if output_format == "json":
+        output.write(("\n}" if indent else "}") if total_slides else "{}")
+    return total_slides, total_shapes
 
 
 if __name__ == "__main__":
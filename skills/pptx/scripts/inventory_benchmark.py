@@ -0,0 +1,82 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+"""Benchmark inventory.py hot paths against their original implementations.
+
+Usage:
+    python inventory_benchmark.py
+
+Each benchmark checks that both implementations produce identical results
+before reporting timings.
+"""
+
+import random
+import time
+
+from inventory import TextMeasurer, detect_overlaps, get_font_index, load_font
+from inventory_test import random_shapes, reference_detect_overlaps, reference_wrap
+
+WORDS = (
+    "the quarterly report shows revenue growth across all regions while "
+    "operating costs remained flat and the board approved a new budget for "
+    "district technology staff training and student support programs"
+).split()
+
+
+def timed(func, *args):
+    """Run func(*args) and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_wrap():
+    """Wrap long paragraphs with the per-word re-measuring and cached versions."""
+    font_path = get_font_index().find("Arial") or get_font_index().find("DejaVu Sans")
+    font = load_font(font_path, 14)
+    rng = random.Random(0)
+
+    print(f"Text wrapping ({font_path or 'default font'}, 14px, 300px wide)")
+    for words in (100, 1000, 10000):
+        paragraphs = [" ".join(rng.choices(WORDS, k=words)) for _ in range(5)]
+        old, old_time = timed(
+            lambda: [reference_wrap(p, 300, font) for p in paragraphs]
+        )
+        measurer = TextMeasurer(font)
+        new, new_time = timed(lambda: [measurer.wrap(p, 300) for p in paragraphs])
+        assert old == new, "wrap output differs from the reference"
+        print(
+            f"  {words:>5} words: reference {old_time * 1000:8.1f} ms, "
+            f"cached {new_time * 1000:8.1f} ms ({old_time / new_time:5.1f}x)"
+        )
+
+
+def benchmark_overlaps():
+    """Detect overlaps on dense synthetic slides, pairwise and with the sweep line."""
+    rng = random.Random(0)
+
+    print("Overlap detection (random shapes on a 13.33 x 7.5 in slide)")
+    for count in (50, 500, 2000):
+        shapes = random_shapes(rng, count)
+        copies = [
+            [type(s)(**{**vars(s), "overlapping_shapes": {}}) for s in shapes]
+            for _ in range(2)
+        ]
+        _, old_time = timed(reference_detect_overlaps, copies[0])
+        _, new_time = timed(detect_overlaps, copies[1])
+        assert [s.overlapping_shapes for s in copies[0]] == [
+            s.overlapping_shapes for s in copies[1]
+        ], "overlaps differ from the reference"
+        print(
+            f"  {count:>5} shapes: pairwise {old_time * 1000:8.1f} ms, "
+            f"sweep line {new_time * 1000:8.1f} ms ({old_time / new_time:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_wrap()
+    benchmark_overlaps()
@@ -0,0 +1,357 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+
+import io
+import json
+import random
+import string
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from inventory import (
+    InventoryProfile,
+    ShapeData,
+    TextMeasurer,
+    calculate_overlap,
+    detect_overlaps,
+    extract_text_inventory,
+    get_font_index,
+    get_inventory_as_dict,
+    iter_text_inventory_xml,
+    load_font,
+    write_inventory,
+)
+from lxml import etree
+from PIL import Image, ImageDraw
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.enum.text import MSO_UNDERLINE, PP_ALIGN
+from pptx.util import Inches, Pt
+
+
+def reference_wrap(line, max_width_px, font):
+    """The original wrap algorithm, which re-measures the whole line per word."""
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    if not line:
+        return [""]
+    if draw.textlength(line, font=font) <= max_width_px:
+        return [line]
+    wrapped = []
+    current_line = ""
+    for word in line.split(" "):
+        test_line = current_line + (" " if current_line else "") + word
+        if draw.textlength(test_line, font=font) <= max_width_px:
+            current_line = test_line
+        else:
+            if current_line:
+                wrapped.append(current_line)
+            current_line = word
+    if current_line:
+        wrapped.append(current_line)
+    return wrapped
+
+
+def reference_detect_overlaps(shapes):
+    """The original overlap detection, which compares every pair of shapes."""
+    for i in range(len(shapes)):
+        for j in range(i + 1, len(shapes)):
+            rect1 = (shapes[i].left, shapes[i].top, shapes[i].width, shapes[i].height)
+            rect2 = (shapes[j].left, shapes[j].top, shapes[j].width, shapes[j].height)
+            overlaps, overlap_area = calculate_overlap(rect1, rect2)
+            if overlaps:
+                shapes[i].overlapping_shapes[shapes[j].shape_id] = overlap_area
+                shapes[j].overlapping_shapes[shapes[i].shape_id] = overlap_area
+
+
+def random_shapes(rng, count, slide_width=13.33, slide_height=7.5):
+    """Build stand-ins for ShapeData with random rounded positions in inches."""
+    return [
+        SimpleNamespace(
+            shape_id=f"shape-{k}",
+            left=round(rng.uniform(0, slide_width), 2),
+            top=round(rng.uniform(0, slide_height), 2),
+            width=round(rng.choice([0.0, 0.05, 0.06]) or rng.uniform(0, 3), 2),
+            height=round(rng.uniform(0, 1.5), 2),
+            overlapping_shapes={},
+        )
+        for k in range(count)
+    ]
+
+
+def random_line(rng, max_words):
+    alphabet = string.ascii_letters + "AVWTyf.,'-"
+    words = [
+        "".join(rng.choices(alphabet, k=rng.randint(0, 12)))
+        for _ in range(rng.randint(1, max_words))
+    ]
+    return " ".join(words)
+
+
+def build_formatted_deck(path, rng, slides=11):
+    """Save a deck with placeholders, groups and varied paragraph formatting."""
+    prs = Presentation()
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[i % len(prs.slide_layouts)])
+        for placeholder in slide.placeholders:
+            if placeholder.has_text_frame:
+                placeholder.text_frame.text = random_line(rng, 30)
+        for _ in range(4):
+            box = slide.shapes.add_textbox(
+                Inches(rng.uniform(0, 9)),
+                Inches(rng.uniform(0, 7)),
+                Inches(rng.uniform(0.5, 4)),
+                Inches(rng.uniform(0.3, 3)),
+            )
+            for k in range(rng.randint(1, 3)):
+                paragraph = (
+                    box.text_frame.paragraphs[0]
+                    if k == 0
+                    else box.text_frame.add_paragraph()
+                )
+                run = paragraph.add_run()
+                run.text = random_line(rng, 20)
+                if rng.random() < 0.3:
+                    paragraph.add_line_break()
+                    paragraph.add_run().text = "• after a break"
+                if rng.random() < 0.3:
+                    run.font.color.rgb = RGBColor(rng.randrange(256), 0x40, 0xAB)
+                elif rng.random() < 0.3:
+                    run.font.color.theme_color = MSO_THEME_COLOR.ACCENT_2
+                run.font.underline = rng.choice(
+                    [None, True, False, MSO_UNDERLINE.DOUBLE_LINE]
+                )
+                run.font.bold = rng.choice([None, True, False])
+                run.font.size = rng.choice([None, Pt(10.5), Pt(28)])
+                paragraph.alignment = rng.choice([None, PP_ALIGN.CENTER, PP_ALIGN.LEFT])
+                paragraph.space_before = rng.choice([None, Pt(0), Pt(6.5)])
+                paragraph.line_spacing = rng.choice([None, Pt(20.5), 1.5])
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1)).text = (
+            "grouped text"
+        )
+    prs.save(path)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestTextMeasurer(unittest.TestCase):
+    def fonts(self):
+        fonts = [load_font(None, 14)]
+        for name in ("Arial", "DejaVu Sans", "Liberation Serif"):
+            path = get_font_index().find(name)
+            if path:
+                fonts.extend(load_font(path, size) for size in (9, 18, 40))
+        return fonts
+
+    def test_wrap_matches_reference(self):
+        rng = random.Random(0)
+        for font in self.fonts():
+            measurer = TextMeasurer(font)
+            for _ in range(100):
+                line = random_line(rng, 40)
+                width = rng.randint(20, 600)
+                self.assertEqual(
+                    measurer.wrap(line, width), reference_wrap(line, width, font)
+                )
+
+    def test_wrap_edge_cases(self):
+        font = load_font(None, 14)
+        measurer = TextMeasurer(font)
+        for line in ["", " ", "  a  b  ", "word", "a" * 200, "x " * 50]:
+            for width in (1, 10, 100):
+                self.assertEqual(
+                    measurer.wrap(line, width), reference_wrap(line, width, font)
+                )
+
+    def test_word_widths_are_cached(self):
+        measurer = TextMeasurer(load_font(None, 14))
+        measurer.wrap("repeat " * 100, 50)
+        self.assertEqual(set(measurer._widths), {"repeat", ""})
+        self.assertEqual(set(measurer._gaps), {("t", "r"), ("t", "")})
+
+
+class TestDetectOverlaps(unittest.TestCase):
+    def assert_same_overlaps(self, shapes):
+        expected = [
+            SimpleNamespace(**{**vars(s), "overlapping_shapes": {}}) for s in shapes
+        ]
+        reference_detect_overlaps(expected)
+        detect_overlaps(shapes)
+        for actual, wanted in zip(shapes, expected):
+            # Compare as lists so that dictionary order is checked too
+            self.assertEqual(
+                list(actual.overlapping_shapes.items()),
+                list(wanted.overlapping_shapes.items()),
+            )
+
+    def test_matches_pairwise_comparison(self):
+        rng = random.Random(0)
+        for count in (0, 1, 2, 10, 200):
+            self.assert_same_overlaps(random_shapes(rng, count))
+
+    def test_tolerance_boundaries(self):
+        # Edges 0.05" apart sit right at the tolerance, where float rounding decides
+        shapes = []
+        for k, (left, top) in enumerate([(0, 0), (0.95, 0), (0.94, 0.94), (0, 0.95)]):
+            shapes.append(
+                SimpleNamespace(
+                    shape_id=f"shape-{k}",
+                    left=left,
+                    top=top,
+                    width=1.0,
+                    height=1.0,
+                    overlapping_shapes={},
+                )
+            )
+        self.assert_same_overlaps(shapes)
+
+
+class TestXmlEngine(unittest.TestCase):
+    def test_matches_pptx_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "deck.pptx"
+            build_formatted_deck(path, random.Random(0))
+            original = path.read_bytes()
+            for issues_only in (False, True):
+                self.assertEqual(
+                    get_inventory_as_dict(path, issues_only, engine="xml"),
+                    get_inventory_as_dict(path, issues_only, engine="pptx"),
+                )
+            self.assertEqual(path.read_bytes(), original)
+
+
+class TestReadersHaveNoSideEffects(unittest.TestCase):
+    def test_inventory_does_not_modify_presentation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "deck.pptx"
+            build_formatted_deck(path, random.Random(4), slides=4)
+            prs = Presentation(str(path))
+            before = [etree.tostring(slide._element) for slide in prs.slides]
+            extract_text_inventory(path, prs)
+            self.assertEqual(
+                [etree.tostring(slide._element) for slide in prs.slides], before
+            )
+
+
+GEOMETRY_KEYS = {"left", "top", "width", "height", "placeholder_type"}
+
+
+class TestInventoryPasses(unittest.TestCase):
+    def test_geometry_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "deck.pptx"
+            build_formatted_deck(path, random.Random(1), slides=4)
+            full = get_inventory_as_dict(path)
+            for engine in ("pptx", "xml"):
+                geometry = get_inventory_as_dict(
+                    path, engine=engine, passes=["geometry"]
+                )
+                self.assertEqual(
+                    geometry,
+                    {
+                        slide_key: {
+                            shape_key: {
+                                key: value
+                                for key, value in shape.items()
+                                if key in GEOMETRY_KEYS
+                            }
+                            for shape_key, shape in shapes.items()
+                        }
+                        for slide_key, shapes in full.items()
+                    },
+                )
+
+    def test_profile_and_unknown_pass(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "deck.pptx"
+            build_formatted_deck(path, random.Random(2), slides=2)
+            profile = InventoryProfile()
+            extract_text_inventory(path, passes=["text", "bullets"], profile=profile)
+            self.assertGreater(profile.seconds["text"], 0)
+            self.assertEqual(profile.seconds["frame-overflow"], 0)
+            with self.assertRaises(ValueError):
+                extract_text_inventory(path, passes=["spelling"])
+
+
+class TestFitFontSize(unittest.TestCase):
+    def overflow_at(self, box, slide, font_size):
+        for paragraph in box.text_frame.paragraphs:
+            for run in paragraph.runs:
+                run.font.size = Pt(font_size)
+        return ShapeData(box, slide=slide).frame_overflow_bottom
+
+    def test_largest_fitting_size(self):
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        rng = random.Random(5)
+        for width, height in [(2, 1), (4, 3), (1.5, 4)]:
+            box = slide.shapes.add_textbox(0, 0, Inches(width), Inches(height))
+            box.text_frame.text = random_line(rng, 25)
+            box.text_frame.add_paragraph().text = random_line(rng, 15)
+            box.text_frame.paragraphs[1].line_spacing = 1.5
+            self.assertIsNotNone(self.overflow_at(box, slide, 40))
+
+            font_size = ShapeData(box, slide=slide).fit_font_size()
+            self.assertIsNotNone(font_size)
+            self.assertIsNotNone(self.overflow_at(box, slide, font_size + 1))
+            self.assertIsNone(self.overflow_at(box, slide, font_size))
+            # Fitting text needs no change
+            self.assertIsNone(ShapeData(box, slide=slide).fit_font_size())
+
+    def test_nothing_fits(self):
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        box = slide.shapes.add_textbox(0, 0, Inches(1), Inches(0.3))
+        box.text_frame.text = "word " * 200
+        self.assertIsNone(ShapeData(box, slide=slide).fit_font_size())
+
+
+class TestWriteInventory(unittest.TestCase):
+    def test_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "deck.pptx"
+            build_formatted_deck(path, random.Random(3), slides=3)
+            expected = get_inventory_as_dict(path)
+
+            output = io.StringIO()
+            counts = write_inventory(iter_text_inventory_xml(path), output)
+            self.assertEqual(
+                output.getvalue(), json.dumps(expected, indent=2, ensure_ascii=False)
+            )
+            self.assertEqual(
+                counts, (len(expected), sum(map(len, expected.values())))
+            )
+
+            output = io.StringIO()
+            write_inventory(iter_text_inventory_xml(path), output, "jsonl")
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+            self.assertEqual(
+                records,
+                [
+                    {"slide": slide_key, "shape": shape_key, **shape}
+                    for slide_key, shapes in expected.items()
+                    for shape_key, shape in shapes.items()
+                ],
+            )
+
+            output = io.StringIO()
+            write_inventory(iter_text_inventory_xml(path), output, compact=True)
+            compact = json.loads(output.getvalue())
+            self.assertEqual(compact.keys(), expected.keys())
+            self.assertNotIn("\n", output.getvalue())
+
+    def test_empty(self):
+        output = io.StringIO()
+        self.assertEqual(write_inventory([], output), (0, 0))
+        self.assertEqual(output.getvalue(), "{}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,7 @@
 #!/usr/bin/env -S uv run
 # /// script
 # dependencies = [
-#   "python-pptx>=0.6.21",
-#   "six>=1.16.0",
+#   "lxml>=4.9.0",
 # ]
 # ///
 """
@@ -16,13 +15,24 @@ Slides can be repeated (e.g., 34 appears twice).
 """
 
 import argparse
-import shutil
+import posixpath
+import re
 import sys
-from copy import deepcopy
+import zipfile
+from collections import Counter
 from pathlib import Path
+from typing import Dict, List, Optional, Set
 
-import six
-from pptx import Presentation
+import lxml.etree
+
+P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+CT_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+SLIDE_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+)
+CONTENT_TYPES = "[Content_Types].xml"
 
 
 def main():
@@ -78,159 +88,392 @@ Note: Slide indices are 0-based (first slide is 0, second is 1, etc.)
         sys.exit(1)
 
 
-def duplicate_slide(pres, index):
-    """Duplicate a slide in the presentation."""
-    source = pres.slides[index]
-
-    # Use source's layout to preserve formatting
-    new_slide = pres.slides.add_slide(source.slide_layout)
-
-    # Collect all image and media relationships from the source slide
-    image_rels = {}
-    for rel_id, rel in six.iteritems(source.part.rels):
-        if "image" in rel.reltype or "media" in rel.reltype:
-            image_rels[rel_id] = rel
-
-    # CRITICAL: Clear placeholder shapes to avoid duplicates
-    for shape in new_slide.shapes:
-        sp = shape.element
-        sp.getparent().remove(sp)
-
-    # Copy all shapes from source
-    for shape in source.shapes:
-        el = shape.element
-        new_el = deepcopy(el)
-        new_slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
-
-        # Handle picture shapes - need to update the blip reference
-        # Look for all blip elements (they can be in pic or other contexts)
-        # Using the element's own xpath method without namespaces argument
-        blips = new_el.xpath(".//a:blip[@r:embed]")
-        for blip in blips:
-            old_rId = blip.get(
-                "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+def get_rels_name(partname: str) -> str:
+    """Get the name of a part's relationships part ("" for the package)."""
+    directory, name = posixpath.split(partname)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+class PackageParts:
+    """The parts of a .pptx file held in memory, edited at the XML level.
+
+    Parts are kept as bytes and only parsed when requested with element() or
+    relationships(); parsed parts are serialized again on save. Saving writes
+    only the parts still reachable through relationships, so parts of
+    dropped slides are removed in one sweep.
+    """
+
+    def __init__(self, path: Path):
+        """Read all parts of a package.
+
+        Args:
+            path: Path to the .pptx file
+        """
+        with zipfile.ZipFile(path) as zf:
+            self.blobs: Dict[str, bytes] = {
+                name: zf.read(name) for name in zf.namelist()
+            }
+        self._elements: Dict[str, lxml.etree._Element] = {}
+        self._next_numbers: Dict[str, int] = {}
+        self._next_rids: Dict[str, int] = {}
+        self._overrides: Optional[Dict[str, Optional[str]]] = None
+        self._defaults: Dict[str, Optional[str]] = {}
+
+    def element(self, name: str) -> lxml.etree._Element:
+        """Get the parsed root element of an XML part, to be edited in place."""
+        if name not in self._elements:
+            self._elements[name] = lxml.etree.fromstring(self.blobs[name])
+        return self._elements[name]
+
+    def relationships(self, partname: str) -> lxml.etree._Element:
+        """Get the Relationships element of a part, creating it if needed."""
+        rels_name = get_rels_name(partname)
+        if not self.has_relationships(partname):
+            self._elements[rels_name] = lxml.etree.Element(
+                f"{RELS_NS}Relationships", nsmap={None: RELS_NS[1:-1]}
             )
-            if old_rId in image_rels:
-                # Create a new relationship in the destination slide for this image
-                old_rel = image_rels[old_rId]
-                # get_or_add returns the rId directly, or adds and returns new rId
-                new_rId = new_slide.part.rels.get_or_add(
-                    old_rel.reltype, old_rel._target
-                )
-                # Update the blip's embed reference to use the new relationship ID
-                blip.set(
-                    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed",
-                    new_rId,
+        return self.element(rels_name)
+
+    def has_relationships(self, partname: str) -> bool:
+        """Whether a part has a relationships part."""
+        rels_name = get_rels_name(partname)
+        return rels_name in self.blobs or rels_name in self._elements
+
+    def related_parts(self, partname: str) -> Dict[str, str]:
+        """Get rId -> target part name of a part's internal relationships."""
+        if not self.has_relationships(partname):
+            return {}
+        directory = posixpath.dirname(partname)
+        related = {}
+        for rel in self.relationships(partname):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                related[rel.get("Id")] = target[1:]
+            else:
+                related[rel.get("Id")] = posixpath.normpath(
+                    posixpath.join(directory, target)
                 )
+        return related
+
+    @property
+    def presentation_partname(self) -> str:
+        """Part name of the main presentation part."""
+        for rel in self.relationships(""):
+            if rel.get("Type", "").endswith("/officeDocument"):
+                return rel.get("Target", "").lstrip("/")
+        raise ValueError("Package has no presentation part")
+
+    def slide_ids(self) -> List[lxml.etree._Element]:
+        """Get the p:sldId elements of the presentation's slides, in order."""
+        presentation = self.element(self.presentation_partname)
+        sldIdLst = presentation.find(f"{P_NS}sldIdLst")
+        return list(sldIdLst) if sldIdLst is not None else []
+
+    def add_relationship(self, partname: str, rel_type: str, target: str) -> str:
+        """Relate partname to the part named target and return the new rId.
+
+        New rIds are numbered past the largest existing one, so adding many
+        relationships to one part takes linear time.
+        """
+        relationships = self.relationships(partname)
+        if partname not in self._next_rids:
+            numbers = [
+                int(match.group(1))
+                for rel in relationships
+                if (match := re.fullmatch(r"rId(\d+)", rel.get("Id", "")))
+            ]
+            self._next_rids[partname] = max(numbers, default=0) + 1
+        rId = f"rId{self._next_rids[partname]}"
+        self._next_rids[partname] += 1
+
+        lxml.etree.SubElement(
+            relationships,
+            f"{RELS_NS}Relationship",
+            Id=rId,
+            Type=rel_type,
+            Target=posixpath.relpath(target, posixpath.dirname(partname)),
+        )
+        return rId
+
+    def next_partname(self, template: str) -> str:
+        """Get an unused part name like template % n, e.g. "ppt/slides/slide%d.xml"."""
+        if template not in self._next_numbers:
+            pattern = re.escape(template).replace("%d", r"(\d+)")
+            numbers = [
+                int(match.group(1))
+                for name in self.blobs
+                if (match := re.fullmatch(pattern, name))
+            ]
+            self._next_numbers[template] = max(numbers, default=0) + 1
+        partname = template % self._next_numbers[template]
+        while partname in self.blobs:
+            self._next_numbers[template] += 1
+            partname = template % self._next_numbers[template]
+        self._next_numbers[template] += 1
+        return partname
+
+    def _load_content_types(self) -> None:
+        content_types = self.element(CONTENT_TYPES)
+        self._overrides = {
+            override.get("PartName", "").lstrip("/"): override.get("ContentType")
+            for override in content_types.iter(f"{CT_NS}Override")
+        }
+        self._defaults = {
+            default.get("Extension", "").lower(): default.get("ContentType")
+            for default in content_types.iter(f"{CT_NS}Default")
+        }
+
+    def content_type(self, partname: str) -> Optional[str]:
+        """Get the content type of a part from its override or its extension."""
+        if self._overrides is None:
+            self._load_content_types()
+        if partname in self._overrides:
+            return self._overrides[partname]
+        extension = posixpath.splitext(partname)[1][1:].lower()
+        return self._defaults.get(extension)
+
+    def add_part(
+        self, partname: str, blob: bytes, content_type: Optional[str] = None
+    ) -> None:
+        """Add a part, with a content type override if its extension needs one."""
+        self.blobs[partname] = blob
+        if content_type and self.content_type(partname) != content_type:
+            self._overrides[partname] = content_type
+            lxml.etree.SubElement(
+                self.element(CONTENT_TYPES),
+                f"{CT_NS}Override",
+                PartName=f"/{partname}",
+                ContentType=content_type,
+            )
 
-    # Copy any additional image/media relationships that might be referenced elsewhere
-    for rel_id, rel in image_rels.items():
-        try:
-            new_slide.part.rels.get_or_add(rel.reltype, rel._target)
-        except Exception:
-            pass  # Relationship might already exist
+    def reachable_parts(self) -> Set[str]:
+        """Get the names of all parts reachable from the package relationships."""
+        reachable: Set[str] = set()
+        pending = [""]
+        while pending:
+            partname = pending.pop()
+            for target in self.related_parts(partname).values():
+                if target not in reachable and target in self.blobs:
+                    reachable.add(target)
+                    pending.append(target)
+        return reachable
+
+    def save(self, path: Path) -> None:
+        """Write the reachable parts, their relationships and content types."""
+        reachable = self.reachable_parts()
+        keep = {CONTENT_TYPES, get_rels_name("")} | reachable
+        keep |= {get_rels_name(name) for name in reachable}
+
+        content_types = self.element(CONTENT_TYPES)
+        for override in list(content_types.iter(f"{CT_NS}Override")):
+            if override.get("PartName", "").lstrip("/") not in keep:
+                content_types.remove(override)
+
+        for name, element in self._elements.items():
+            self.blobs[name] = lxml.etree.tostring(
+                element, xml_declaration=True, encoding="UTF-8", standalone=True
+            )
+
+        # [Content_Types].xml goes first, as Office writes it
+        names = [CONTENT_TYPES] + [name for name in self.blobs if name != CONTENT_TYPES]
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                if name in keep:
+                    zf.writestr(name, self.blobs[name])
+
+
+# Relationship types whose targets a duplicated slide shares with the original
+# (including slides it links to); everything else (charts, embedded objects,
+# comments, ...) is copied, so editing one slide never changes the other
+DUPLICATE_SHARED_RELATIONSHIPS = {
+    "slideLayout",
+    "image",
+    "media",
+    "audio",
+    "video",
+    "slide",
+}
 
-    return new_slide
 
+def numbered_partname(partname: str) -> str:
+    """Get the numbering template of a part name, e.g. ppt/media/image%d.png."""
+    return re.sub(r"\d*(\.[^./]+)?$", r"%d\1", partname.replace("%", "%%"), count=1)
 
-def delete_slide(pres, index):
-    """Delete a slide from the presentation."""
-    rId = pres.slides._sldIdLst[index].rId
-    pres.part.drop_rel(rId)
-    del pres.slides._sldIdLst[index]
 
+def duplicate_slide(
+    package: PackageParts, slide_partname: str, sld_id: int
+) -> lxml.etree._Element:
+    """Add a copy of a slide part and return the p:sldId element to list it with.
 
-def reorder_slides(pres, slide_index, target_index):
-    """Move a slide from one position to another."""
-    slides = pres.slides._sldIdLst
+    The copy has the same XML and relationship IDs as the original, so
+    relationship IDs in the XML stay valid. Its layout, images and media are
+    shared with the original, as are the slides it links to; charts, embedded
+    objects, comments and other parts are copied along with the parts they
+    refer to. The copy has no notes, like a slide added in PowerPoint.
 
-    # Remove slide element from current position
-    slide_element = slides[slide_index]
-    slides.remove(slide_element)
+    Args:
+        package: Package containing the slide
+        slide_partname: Part name of the slide to copy
+        sld_id: Unique slide ID for the new p:sldId element
+    """
+    partname = package.next_partname("ppt/slides/slide%d.xml")
+    package.add_part(
+        partname,
+        package.blobs[slide_partname],
+        package.content_type(slide_partname),
+    )
+    _copy_relationships(package, slide_partname, partname, {slide_partname: partname})
+    return new_slide_id(package, partname, sld_id)
 
-    # Insert at target position
-    slides.insert(target_index, slide_element)
+
+def _copy_relationships(
+    package: PackageParts, partname: str, new_partname: str, copies: Dict[str, str]
+) -> None:
+    """Give new_partname the relationships of partname, copying unshared targets.
+
+    Args:
+        copies: Original -> copied part names so far, so parts reached twice
+            are copied once
+    """
+    if not package.has_relationships(partname):
+        return
+    related = package.related_parts(partname)
+    relationships = package.relationships(new_partname)
+    for rel in list(package.relationships(partname)):
+        rel_type = rel.get("Type", "").rsplit("/", 1)[-1]
+        if rel_type == "notesSlide":
+            continue
+        rel = lxml.etree.fromstring(lxml.etree.tostring(rel))
+        target = related.get(rel.get("Id"))
+        if target in package.blobs and rel_type not in DUPLICATE_SHARED_RELATIONSHIPS:
+            if target not in copies:
+                copies[target] = package.next_partname(numbered_partname(target))
+                package.add_part(
+                    copies[target], package.blobs[target], package.content_type(target)
+                )
+                _copy_relationships(package, target, copies[target], copies)
+            target = copies[target]
+        if target in package.blobs:
+            rel.set("Target", posixpath.relpath(target, posixpath.dirname(new_partname)))
+        relationships.append(rel)
+
+
+def new_slide_id(
+    package: PackageParts, slide_partname: str, sld_id: int
+) -> lxml.etree._Element:
+    """Relate a new slide part to the presentation and return its p:sldId element."""
+    rId = package.add_relationship(
+        package.presentation_partname, SLIDE_RELATIONSHIP, slide_partname
+    )
+    sldId = lxml.etree.Element(f"{P_NS}sldId", nsmap={"r": R_NS[1:-1]})
+    sldId.set("id", str(sld_id))
+    sldId.set(f"{R_NS}id", rId)
+    return sldId
+
+
+def set_slide_list(package: PackageParts, slides: List[lxml.etree._Element]) -> None:
+    """Replace the presentation's slide list with the given p:sldId elements.
+
+    Relationships to slides that are no longer listed are dropped unless
+    something else in the presentation (e.g. a custom show) refers to them;
+    parts nothing refers to any more are left out when the package is saved.
+    """
+    presentation_partname = package.presentation_partname
+    presentation = package.element(presentation_partname)
+    sldIdLst = presentation.find(f"{P_NS}sldIdLst")
+    if sldIdLst is None:
+        sldIdLst = lxml.etree.Element(f"{P_NS}sldIdLst")
+        # p:sldIdLst follows p:sldMasterIdLst and p:notesMasterIdLst
+        masters = [
+            presentation.find(f"{P_NS}{tag}")
+            for tag in ("sldMasterIdLst", "notesMasterIdLst", "handoutMasterIdLst")
+        ]
+        previous = [element for element in masters if element is not None]
+        if previous:
+            previous[-1].addnext(sldIdLst)
+        else:
+            presentation.insert(0, sldIdLst)
+
+    kept = {id(sldId) for sldId in slides}
+    removed = [sldId for sldId in sldIdLst if id(sldId) not in kept]
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+    sldIdLst.extend(slides)
+
+    referenced = {
+        value
+        for element in presentation.iter()
+        for name, value in element.attrib.items()
+        if name.startswith(R_NS)
+    }
+    unused_rids = {sldId.get(f"{R_NS}id") for sldId in removed} - referenced
+    presentation_rels = package.relationships(presentation_partname)
+    for rel in list(presentation_rels):
+        if rel.get("Id") in unused_rids:
+            presentation_rels.remove(rel)
 
 
 def rearrange_presentation(template_path, output_path, slide_sequence):
     """
     Create a new presentation with slides from template in specified order.
 
+    The final slide list is computed in one pass over the sequence: the first
+    use of a slide keeps the original, later uses get copies, and slides that
+    are not used are dropped together with the parts only they referenced.
+
     Args:
         template_path: Path to template PPTX file
         output_path: Path for output PPTX file
         slide_sequence: List of slide indices (0-based) to include
     """
-    # Copy template to preserve dimensions and theme
-    if template_path != output_path:
-        shutil.copy2(template_path, output_path)
-        prs = Presentation(output_path)
-    else:
-        prs = Presentation(template_path)
+    package = PackageParts(template_path)
+    originals = package.slide_ids()
+    slide_partnames = package.related_parts(package.presentation_partname)
 
-    total_slides = len(prs.slides)
+    total_slides = len(originals)
 
     # Validate indices
     for idx in slide_sequence:
         if idx < 0 or idx >= total_slides:
             raise ValueError(f"Slide index {idx} out of range (0-{total_slides - 1})")
 
-    # Track original slides and their duplicates
-    slide_map = []  # List of actual slide indices for final presentation
-    duplicated = {}  # Track duplicates: original_idx -> [duplicate_indices]
+    # Count uses once instead of scanning the sequence for every entry
+    uses = Counter(slide_sequence)
+    next_sld_id = max((int(sldId.get("id")) for sldId in originals), default=255) + 1
 
-    # Step 1: DUPLICATE repeated slides
+    # Step 1: Pick originals and DUPLICATE repeated slides
     print(f"Processing {len(slide_sequence)} slides from template...")
+    final: List[lxml.etree._Element] = []
+    used: Set[int] = set()
     for i, template_idx in enumerate(slide_sequence):
-        if template_idx in duplicated and duplicated[template_idx]:
-            # Already duplicated this slide, use the duplicate
-            slide_map.append(duplicated[template_idx].pop(0))
-            print(f"  [{i}] Using duplicate of slide {template_idx}")
-        elif slide_sequence.count(template_idx) > 1 and template_idx not in duplicated:
-            # First occurrence of a repeated slide - create duplicates
-            slide_map.append(template_idx)
-            duplicates = []
-            count = slide_sequence.count(template_idx) - 1
-            print(
-                f"  [{i}] Using original slide {template_idx}, creating {count} duplicate(s)"
-            )
-            for _ in range(count):
-                duplicate_slide(prs, template_idx)
-                duplicates.append(len(prs.slides) - 1)
-            duplicated[template_idx] = duplicates
+        if template_idx not in used:
+            used.add(template_idx)
+            final.append(originals[template_idx])
+            if uses[template_idx] > 1:
+                print(
+                    f"  [{i}] Using original slide {template_idx}, "
+                    f"creating {uses[template_idx] - 1} duplicate(s)"
+                )
+            else:
+                print(f"  [{i}] Using original slide {template_idx}")
         else:
-            # Unique slide or first occurrence already handled, use original
-            slide_map.append(template_idx)
-            print(f"  [{i}] Using original slide {template_idx}")
-
-    # Step 2: DELETE unwanted slides (work backwards)
-    slides_to_keep = set(slide_map)
-    print(f"\nDeleting {len(prs.slides) - len(slides_to_keep)} unused slides...")
-    for i in range(len(prs.slides) - 1, -1, -1):
-        if i not in slides_to_keep:
-            delete_slide(prs, i)
-            # Update slide_map indices after deletion
-            slide_map = [idx - 1 if idx > i else idx for idx in slide_map]
-
-    # Step 3: REORDER to final sequence
-    print(f"Reordering {len(slide_map)} slides to final sequence...")
-    for target_pos in range(len(slide_map)):
-        # Find which slide should be at target_pos
-        current_pos = slide_map[target_pos]
-        if current_pos != target_pos:
-            reorder_slides(prs, current_pos, target_pos)
-            # Update slide_map: the move shifts other slides
-            for i in range(len(slide_map)):
-                if slide_map[i] > current_pos and slide_map[i] <= target_pos:
-                    slide_map[i] -= 1
-                elif slide_map[i] < current_pos and slide_map[i] >= target_pos:
-                    slide_map[i] += 1
-            slide_map[target_pos] = target_pos
+            rId = originals[template_idx].get(f"{R_NS}id")
+            final.append(duplicate_slide(package, slide_partnames[rId], next_sld_id))
+            next_sld_id += 1
+            print(f"  [{i}] Using duplicate of slide {template_idx}")
+
+    # Step 2: Write the final slide list, which also REORDERS the slides and
+    # DELETES unused ones
+    print(f"Reordering {len(final)} slides to final sequence...")
+    print(f"\nDeleting {total_slides - len(used)} unused slides...")
+    set_slide_list(package, final)
 
     # Save the presentation
-    prs.save(output_path)
+    package.save(output_path)
     print(f"\nSaved rearranged presentation to: {output_path}")
-    print(f"Final presentation has {len(prs.slides)} slides")
+    print(f"Final presentation has {len(final)} slides")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+# ]
+# ///
+
+import contextlib
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from assemble_test import make_logo
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+from rearrange import rearrange_presentation
+
+
+def chart_values(slide):
+    """The values of the first series of a slide's chart."""
+    chart = next(shape for shape in slide.shapes if shape.has_chart).chart
+    return list(chart.plots[0].series[0].values)
+
+
+class TestDuplicateSlide(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.template = Path(self.tmpdir.name) / "template.pptx"
+        self.output = Path(self.tmpdir.name) / "out.pptx"
+
+        prs = Presentation()
+        for i in range(2):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            slide.shapes.add_picture(io.BytesIO(make_logo()), Inches(8), Inches(6))
+            chart_data = CategoryChartData()
+            chart_data.categories = ["Q1", "Q2"]
+            chart_data.add_series("Sales", (i + 1, i + 2))
+            slide.shapes.add_chart(
+                XL_CHART_TYPE.COLUMN_CLUSTERED,
+                Inches(1),
+                Inches(1),
+                Inches(4),
+                Inches(3),
+                chart_data,
+            )
+        prs.save(self.template)
+
+    def rearrange(self, sequence):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rearrange_presentation(self.template, self.output, sequence)
+        return Presentation(self.output)
+
+    def test_duplicate_gets_its_own_chart(self):
+        prs = self.rearrange([0, 0, 1])
+        charts = [
+            next(shape for shape in slide.shapes if shape.has_chart).chart
+            for slide in prs.slides
+        ]
+        self.assertEqual(len({chart.part.partname for chart in charts}), 3)
+        workbooks = {chart.part.chart_workbook.xlsx_part.partname for chart in charts}
+        self.assertEqual(len(workbooks), 3)
+        self.assertEqual(
+            [chart_values(slide) for slide in prs.slides], [[1, 2], [1, 2], [2, 3]]
+        )
+
+        # Editing the duplicate's chart leaves the original's unchanged
+        chart_data = CategoryChartData()
+        chart_data.categories = ["Q1", "Q2"]
+        chart_data.add_series("Sales", (7, 8))
+        charts[1].replace_data(chart_data)
+        prs.save(self.output)
+        self.assertEqual(
+            [chart_values(slide) for slide in Presentation(self.output).slides],
+            [[1, 2], [7, 8], [2, 3]],
+        )
+
+    def test_duplicate_shares_layout_and_images(self):
+        prs = self.rearrange([1, 1])
+        self.assertIs(prs.slides[0].slide_layout, prs.slides[1].slide_layout)
+        names = zipfile.ZipFile(self.output).namelist()
+        self.assertEqual(sum(1 for name in names if name.startswith("ppt/media/")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
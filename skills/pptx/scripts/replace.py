@@ -8,25 +8,40 @@
 """Apply text replacements to PowerPoint presentation.
 
 Usage:
-    skills/pptx/scripts/replace.py <input.pptx> <replacements.json> <output.pptx>
+    skills/pptx/scripts/replace.py <input.pptx> <replacements.json> <output.pptx> [--workers N] [--cache-dir DIR]
+    skills/pptx/scripts/replace.py --batch <template.pptx> <sets-dir|sets.jsonl> <output-dir> [--workers N]
 
 The replacements JSON should have the structure output by inventory.py.
 ALL text shapes identified by inventory.py will have their text cleared
 unless "paragraphs" is specified in the replacements for that shape.
 """
 
+import argparse
+import io
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
-
-from inventory import InventoryData, extract_text_inventory
+from typing import Any, Dict, List, Optional, Tuple
+
+from inventory import (
+    InventoryData,
+    ShapeData,
+    collect_slide_shapes,
+    extract_text_inventory,
+)
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.enum.text import PP_ALIGN
 from pptx.oxml.xmlchemy import OxmlElement
-from pptx.util import Pt
+from pptx.util import Length, Pt
+
+# A text shape to replace: (shape, absolute left, absolute top) in EMUs
+Target = Tuple[Any, int, int]
+
+# Overflow increase in inches tolerated for rounding
+OVERFLOW_TOLERANCE = 0.01
 
 
 def clear_paragraph_bullets(paragraph):
@@ -217,42 +232,40 @@ def check_duplicate_keys(pairs):
     return result
 
 
-def apply_replacements(pptx_file: str, json_file: str, output_file: str):
-    """Apply text replacements from JSON to PowerPoint presentation."""
-
-    # Load presentation
-    prs = Presentation(pptx_file)
-
-    # Get inventory of all text shapes (returns ShapeData objects)
-    # Pass prs to use same Presentation instance
-    inventory = extract_text_inventory(Path(pptx_file), prs)
+def get_replacement_targets(inventory: InventoryData) -> Dict[str, Dict[str, Target]]:
+    """Get (shape, absolute left, absolute top) per inventory shape."""
+    return {
+        slide_key: {
+            shape_key: (shape_data.shape, shape_data.left_emu, shape_data.top_emu)
+            for shape_key, shape_data in shapes_dict.items()
+        }
+        for slide_key, shapes_dict in inventory.items()
+    }
 
-    # Detect text overflow in original presentation
-    original_overflow = detect_frame_overflow(inventory)
 
-    # Load replacement data with duplicate key detection
-    with open(json_file, "r") as f:
-        replacements = json.load(f, object_pairs_hook=check_duplicate_keys)
+def replace_shape_text(
+    prs: Any, targets: Dict[str, Dict[str, Target]], replacements: Dict
+) -> Tuple[Dict[str, int], InventoryData]:
+    """Clear every target shape and add the replacement paragraphs.
 
-    # Validate replacements
-    errors = validate_replacements(inventory, replacements)
-    if errors:
-        print("ERROR: Invalid shapes in replacement JSON:")
-        for error in errors:
-            print(f"  - {error}")
-        print("\nPlease check the inventory and update your replacement JSON.")
-        print(
-            "You can regenerate the inventory with: python inventory.py <input.pptx> <output.json>"
-        )
-        raise ValueError(f"Found {len(errors)} validation error(s)")
+    Args:
+        prs: Presentation containing the target shapes
+        targets: slide_key -> shape_key -> (shape, absolute left, absolute top)
+        replacements: Validated replacements JSON
 
+    Returns:
+        Counts of shapes processed, cleared and replaced, and the inventory of
+        the replaced shapes, measured after their text was replaced
+    """
     # Track statistics
-    shapes_processed = 0
-    shapes_cleared = 0
-    shapes_replaced = 0
+    counts = {"processed": 0, "cleared": 0, "replaced": 0}
+
+    # Replaced shapes, measured again after their text is replaced. Cleared
+    # shapes have no text, so they can neither overflow nor carry warnings.
+    updated_inventory: InventoryData = {}
 
     # Process each slide from inventory
-    for slide_key, shapes_dict in inventory.items():
+    for slide_key, shapes_dict in targets.items():
         if not slide_key.startswith("slide-"):
             continue
 
@@ -261,13 +274,12 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
         if slide_index >= len(prs.slides):
             print(f"Warning: Slide {slide_index} not found")
             continue
+        slide = prs.slides[slide_index]
 
         # Process each shape from inventory
-        for shape_key, shape_data in shapes_dict.items():
-            shapes_processed += 1
+        for shape_key, (shape, left_emu, top_emu) in shapes_dict.items():
+            counts["processed"] += 1
 
-            # Get the shape directly from ShapeData
-            shape = shape_data.shape
             if not shape:
                 print(f"Warning: {shape_key} has no shape reference")
                 continue
@@ -276,14 +288,14 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
             text_frame = shape.text_frame  # type: ignore
 
             text_frame.clear()  # type: ignore
-            shapes_cleared += 1
+            counts["cleared"] += 1
 
             # Check for replacement paragraphs
             replacement_shape_data = replacements.get(slide_key, {}).get(shape_key, {})
             if "paragraphs" not in replacement_shape_data:
                 continue
 
-            shapes_replaced += 1
+            counts["replaced"] += 1
 
             # Add replacement paragraphs
             for i, para_data in enumerate(replacement_shape_data["paragraphs"]):
@@ -294,20 +306,84 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
 
                 apply_paragraph_properties(p, para_data)
 
-    # Check for issues after replacements
-    # Save to a temporary file and reload to avoid modifying the presentation during inventory
-    # (extract_text_inventory accesses font.color which adds empty <a:solidFill/> elements)
-    import tempfile
+            # Measure the new text in place; the inventory readers do not
+            # modify the presentation. Positions are unchanged by the
+            # replacement, so the shape keeps its key and absolute position.
+            updated_inventory.setdefault(slide_key, {})[shape_key] = ShapeData(
+                shape,
+                left_emu,
+                top_emu,
+                slide,
+                passes=["frame-overflow", "bullets"],
+            )
 
-    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-        prs.save(str(tmp_path))
+    return counts, updated_inventory
 
-    try:
-        updated_inventory = extract_text_inventory(tmp_path)
-        updated_overflow = detect_frame_overflow(updated_inventory)
-    finally:
-        tmp_path.unlink()  # Clean up temp file
+
+def apply_font_size(shape: Any, font_size: int) -> None:
+    """Set every run of a shape to font_size, scaling line spacing set in points.
+
+    Line spacing is scaled like ShapeData.fit_font_size measures it: only in
+    paragraphs whose first run has an explicit size.
+    """
+    for paragraph in shape.text_frame.paragraphs:
+        runs = paragraph.runs
+        if not runs:
+            continue
+        old_size = runs[0].font.size
+        if old_size and isinstance(paragraph.line_spacing, Length):
+            paragraph.line_spacing = Pt(
+                round(paragraph.line_spacing.pt * font_size / old_size.pt, 2)
+            )
+        for run in runs:
+            run.font.size = Pt(font_size)
+
+
+def fit_replaced_text(
+    original_overflow: Dict[str, Dict[str, float]], updated_inventory: InventoryData
+) -> Dict[str, int]:
+    """Shrink the text of replaced shapes whose overflow got worse until it fits.
+
+    Each shape gets the largest font size found by ShapeData.fit_font_size
+    and is measured again; updated_inventory is updated in place.
+
+    Returns:
+        "slide-N/shape-N" -> applied font size in points
+    """
+    fitted = {}
+    for slide_key, shapes_dict in updated_inventory.items():
+        for shape_key, shape_data in shapes_dict.items():
+            original = original_overflow.get(slide_key, {}).get(shape_key, 0.0)
+            overflow = shape_data.frame_overflow_bottom
+            if overflow is None or overflow <= original + OVERFLOW_TOLERANCE:
+                continue
+
+            font_size = shape_data.fit_font_size(original + OVERFLOW_TOLERANCE)
+            if font_size is None:
+                continue
+            apply_font_size(shape_data.shape, font_size)
+            fitted[f"{slide_key}/{shape_key}"] = font_size
+            shapes_dict[shape_key] = ShapeData(
+                shape_data.shape,
+                shape_data.left_emu,
+                shape_data.top_emu,
+                shape_data.shape.part.slide,
+                passes=["frame-overflow", "bullets"],
+            )
+    return fitted
+
+
+def find_replacement_issues(
+    original_overflow: Dict[str, Dict[str, float]], updated_inventory: InventoryData
+) -> Tuple[List[str], List[str]]:
+    """Compare replaced shapes against the original overflow.
+
+    Returns:
+        Overflow errors for shapes whose overflow got worse, each with the
+        largest font size at which the text would fit, and formatting
+        warnings of the replaced shapes
+    """
+    updated_overflow = detect_frame_overflow(updated_inventory)
 
     # Check if any text overflow got worse
     overflow_errors = []
@@ -317,12 +393,17 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
             original = original_overflow.get(slide_key, {}).get(shape_key, 0.0)
 
             # Error if overflow increased
-            if new_overflow > original + 0.01:  # Small tolerance for rounding
+            if new_overflow > original + OVERFLOW_TOLERANCE:
                 increase = new_overflow - original
-                overflow_errors.append(
+                error = (
                     f'{slide_key}/{shape_key}: overflow worsened by {increase:.2f}" '
                     f'(was {original:.2f}", now {new_overflow:.2f}")'
                 )
+                shape_data = updated_inventory[slide_key][shape_key]
+                font_size = shape_data.fit_font_size(original + OVERFLOW_TOLERANCE)
+                if font_size is not None:
+                    error += f"; fits at {font_size}pt"
+                overflow_errors.append(error)
 
     # Collect warnings from updated shapes
     warnings = []
@@ -332,6 +413,71 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
                 for warning in shape_data.warnings:
                     warnings.append(f"{slide_key}/{shape_key}: {warning}")
 
+    return overflow_errors, warnings
+
+
+def apply_replacements(
+    pptx_file: str,
+    json_file: str,
+    output_file: str,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    auto_fit: bool = False,
+):
+    """Apply text replacements from JSON to PowerPoint presentation.
+
+    workers and cache_dir are passed on to extract_text_inventory for the
+    inventory of the input presentation. With auto_fit, text that overflows
+    more than before is shrunk to fit (see fit_replaced_text).
+    """
+
+    # Load presentation
+    prs = Presentation(pptx_file)
+
+    # Get inventory of all text shapes (returns ShapeData objects)
+    # Pass prs to use same Presentation instance
+    # Only frame overflow is compared, so skip the other analysis passes
+    inventory = extract_text_inventory(
+        Path(pptx_file),
+        prs,
+        workers=workers,
+        cache_dir=cache_dir,
+        passes=["frame-overflow"],
+    )
+
+    # Detect text overflow in original presentation
+    original_overflow = detect_frame_overflow(inventory)
+
+    # Load replacement data with duplicate key detection
+    with open(json_file, "r") as f:
+        replacements = json.load(f, object_pairs_hook=check_duplicate_keys)
+
+    # Validate replacements
+    errors = validate_replacements(inventory, replacements)
+    if errors:
+        print("ERROR: Invalid shapes in replacement JSON:")
+        for error in errors:
+            print(f"  - {error}")
+        print("\nPlease check the inventory and update your replacement JSON.")
+        print(
+            "You can regenerate the inventory with: python inventory.py <input.pptx> <output.json>"
+        )
+        raise ValueError(f"Found {len(errors)} validation error(s)")
+
+    counts, updated_inventory = replace_shape_text(
+        prs, get_replacement_targets(inventory), replacements
+    )
+    if auto_fit:
+        for shape, font_size in fit_replaced_text(
+            original_overflow, updated_inventory
+        ).items():
+            print(f"Auto-fit: {shape} set to {font_size}pt")
+
+    # Check for issues after replacements
+    overflow_errors, warnings = find_replacement_issues(
+        original_overflow, updated_inventory
+    )
+
     # Fail if there are any issues
     if overflow_errors or warnings:
         print("\nERROR: Issues detected in replacement output:")
@@ -354,20 +500,255 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
     # Report results
     print(f"Saved updated presentation to: {output_file}")
     print(f"Processed {len(prs.slides)} slides")
-    print(f"  - Shapes processed: {shapes_processed}")
-    print(f"  - Shapes cleared: {shapes_cleared}")
-    print(f"  - Shapes replaced: {shapes_replaced}")
+    print(f"  - Shapes processed: {counts['processed']}")
+    print(f"  - Shapes cleared: {counts['cleared']}")
+    print(f"  - Shapes replaced: {counts['replaced']}")
+
+
+def load_replacement_sets(source: Path) -> List[Tuple[str, Dict]]:
+    """Load the replacement sets of a batch.
+
+    Args:
+        source: Directory of replacement JSON files, each named after its
+            output, or a JSONL file with one replacements object per line.
+            A line's optional "name" key names its output (default: the
+            line number).
+
+    Returns:
+        (output name, replacements) per set, in order
+    """
+    sets = []
+    if source.is_dir():
+        for json_file in sorted(source.glob("*.json")):
+            with open(json_file, "r") as f:
+                replacements = json.load(f, object_pairs_hook=check_duplicate_keys)
+            sets.append((json_file.stem, replacements))
+    else:
+        with open(source, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                replacements = json.loads(line, object_pairs_hook=check_duplicate_keys)
+                name = str(replacements.pop("name", line_number))
+                sets.append((name, replacements))
+
+    names = [name for name, _ in sets]
+    for name in names:
+        if not name or Path(name).name != name:
+            raise ValueError(f"Invalid output name: '{name}'")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate output names: {', '.join(duplicates)}")
+    return sets
+
+
+# Template shared by each worker process of a batch: its bytes, the position of
+# each inventory shape among collect_slide_shapes() of its slide, and the
+# original frame overflow
+_batch_template: Optional[bytes] = None
+_batch_shapes: Dict[str, Dict[str, int]] = {}
+_batch_overflow: Dict[str, Dict[str, float]] = {}
+_batch_auto_fit = False
+
+
+def _init_batch_worker(
+    template: bytes,
+    shapes: Dict[str, Dict[str, int]],
+    original_overflow: Dict[str, Dict[str, float]],
+    auto_fit: bool,
+) -> None:
+    """Keep the template and its inventory in a worker process."""
+    global _batch_template, _batch_shapes, _batch_overflow, _batch_auto_fit
+    _batch_template = template
+    _batch_shapes = shapes
+    _batch_overflow = original_overflow
+    _batch_auto_fit = auto_fit
+
+
+def _apply_replacement_set(job: Tuple[str, Dict, str]) -> Dict[str, Any]:
+    """Apply one replacement set to a fresh copy of the template (in a worker).
+
+    Returns a result with the set's name, output path, status ("ok" or
+    "failed"), shape counts, font sizes applied by auto-fit and any errors.
+    Failed outputs are not written.
+    """
+    name, replacements, output_file = job
+    result: Dict[str, Any] = {"name": name, "output": output_file}
+    try:
+        # Parsing the in-memory template is much cheaper than its inventory
+        prs = Presentation(io.BytesIO(_batch_template))  # type: ignore
+        targets: Dict[str, Dict[str, Target]] = {}
+        for slide_key, shape_indices in _batch_shapes.items():
+            slide_index = int(slide_key.split("-")[1])
+            collected = collect_slide_shapes(prs.slides[slide_index])
+            targets[slide_key] = {
+                shape_key: (
+                    collected[i].shape,
+                    collected[i].absolute_left,
+                    collected[i].absolute_top,
+                )
+                for shape_key, i in shape_indices.items()
+            }
+
+        counts, updated_inventory = replace_shape_text(prs, targets, replacements)
+        if _batch_auto_fit:
+            result["fitted"] = fit_replaced_text(_batch_overflow, updated_inventory)
+        overflow_errors, warnings = find_replacement_issues(
+            _batch_overflow, updated_inventory
+        )
+        result["counts"] = counts
+        result["errors"] = overflow_errors + warnings
+        if not result["errors"]:
+            prs.save(output_file)
+    except Exception as e:
+        result["errors"] = [f"{type(e).__name__}: {e}"]
+    result["status"] = "failed" if result["errors"] else "ok"
+    return result
+
+
+def apply_replacement_batch(
+    pptx_file: str,
+    source: Path,
+    output_dir: Path,
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    auto_fit: bool = False,
+) -> List[Dict[str, Any]]:
+    """Apply many replacement sets to one template, e.g. for a mail merge.
+
+    The template is parsed and inventoried once. Each set is then validated
+    against that inventory, applied to a fresh copy of the template parsed
+    from memory, checked for worsened overflow and formatting warnings like
+    apply_replacements, and saved as output_dir/<name>.pptx if it passes.
+
+    Args:
+        pptx_file: Path to the template presentation
+        source: Directory or JSONL file of replacement sets (see
+            load_replacement_sets)
+        output_dir: Directory for the output presentations
+        workers: Number of processes for the inventory and for applying sets
+        cache_dir: Optional directory for caching the template's text
+            measurements across runs
+        auto_fit: Shrink text that overflows more than in the template
+            (see fit_replaced_text)
+
+    Returns:
+        One result per set (see _apply_replacement_set), in order
+    """
+    template = Path(pptx_file).read_bytes()
+    prs = Presentation(io.BytesIO(template))
+    inventory = extract_text_inventory(
+        Path(pptx_file),
+        prs,
+        workers=workers,
+        cache_dir=cache_dir,
+        passes=["frame-overflow"],
+    )
+    original_overflow = detect_frame_overflow(inventory)
+
+    # Locate the inventory shapes so that workers can find them in their copies
+    shapes: Dict[str, Dict[str, int]] = {}
+    for slide_key, shapes_dict in inventory.items():
+        slide = prs.slides[int(slide_key.split("-")[1])]
+        positions = {
+            swp.shape._element: i for i, swp in enumerate(collect_slide_shapes(slide))
+        }
+        shapes[slide_key] = {
+            shape_key: positions[shape_data.shape._element]
+            for shape_key, shape_data in shapes_dict.items()
+        }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results: List[Optional[Dict[str, Any]]] = []
+    jobs = []
+    for name, replacements in load_replacement_sets(source):
+        output_file = str(output_dir / f"{name}.pptx")
+        errors = validate_replacements(inventory, replacements)
+        if errors:
+            results.append(
+                {
+                    "name": name,
+                    "output": output_file,
+                    "status": "failed",
+                    "errors": errors,
+                }
+            )
+        else:
+            results.append(None)
+            jobs.append((name, replacements, output_file))
+
+    initargs = (template, shapes, original_overflow, auto_fit)
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            initializer=_init_batch_worker,
+            initargs=initargs,
+        ) as executor:
+            applied = list(executor.map(_apply_replacement_set, jobs))
+    else:
+        _init_batch_worker(*initargs)
+        applied = [_apply_replacement_set(job) for job in jobs]
+
+    # Fill in the applied sets between the ones that failed validation
+    applied_iter = iter(applied)
+    return [result or next(applied_iter) for result in results]
+
+
+def print_batch_summary(results: List[Dict[str, Any]]) -> None:
+    """Print the outcome of each failed set and the totals of a batch."""
+    failed = [result for result in results if result["status"] != "ok"]
+    for result in failed:
+        print(f"FAILED {result['name']}:")
+        for error in result["errors"]:
+            print(f"  - {error}")
+    fitted = sum(len(result.get("fitted", {})) for result in results)
+    if fitted:
+        print(f"Auto-fit shrank the text of {fitted} shapes")
+    print(
+        f"Batch complete: {len(results) - len(failed)} of {len(results)} "
+        f"presentations saved, {len(failed)} failed"
+    )
 
 
 def main():
     """Main entry point for command-line usage."""
-    if len(sys.argv) != 4:
-        print(__doc__)
-        sys.exit(1)
-
-    input_pptx = Path(sys.argv[1])
-    replacements_json = Path(sys.argv[2])
-    output_pptx = Path(sys.argv[3])
+    parser = argparse.ArgumentParser(
+        description="Apply text replacements to PowerPoint presentation.",
+        epilog="The replacements JSON should have the structure output by inventory.py.",
+    )
+    parser.add_argument("input", help="Input PowerPoint file (.pptx)")
+    parser.add_argument("replacements", help="Replacements JSON file")
+    parser.add_argument("output", help="Output PowerPoint file (.pptx)")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Treat replacements as a directory of JSON files or a JSONL file of "
+        "replacement sets and output as a directory, writing one presentation "
+        "per set",
+    )
+    parser.add_argument(
+        "--auto-fit",
+        action="store_true",
+        help="Shrink the font of replaced text that overflows more than before "
+        "to the largest size that fits",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for measuring text on large decks, and for "
+        "applying replacement sets in batch mode (default: 1)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Directory for caching text measurements between runs",
+    )
+    args = parser.parse_args()
+
+    input_pptx = Path(args.input)
+    replacements_json = Path(args.replacements)
+    output_pptx = Path(args.output)
 
     if not input_pptx.exists():
         print(f"Error: Input file '{input_pptx}' not found")
@@ -377,8 +758,33 @@ def main():
         print(f"Error: Replacements JSON file '{replacements_json}' not found")
         sys.exit(1)
 
+    if args.batch:
+        try:
+            results = apply_replacement_batch(
+                str(input_pptx),
+                replacements_json,
+                output_pptx,
+                workers=args.workers,
+                cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+                auto_fit=args.auto_fit,
+            )
+        except Exception as e:
+            print(f"Error applying replacements: {e}")
+            sys.exit(1)
+        print_batch_summary(results)
+        if any(result["status"] != "ok" for result in results):
+            sys.exit(1)
+        return
+
     try:
-        apply_replacements(str(input_pptx), str(replacements_json), str(output_pptx))
+        apply_replacements(
+            str(input_pptx),
+            str(replacements_json),
+            str(output_pptx),
+            workers=args.workers,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+            auto_fit=args.auto_fit,
+        )
     except Exception as e:
         print(f"Error applying replacements: {e}")
         import traceback
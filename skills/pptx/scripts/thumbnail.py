@@ -25,7 +25,7 @@ Grid limits by column count:
 - 6 cols: max 42 slides per grid (6×7)
 
 Usage:
-    skills/pptx/scripts/thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders]
+    skills/pptx/scripts/thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders] [--cache-dir DIR]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -44,21 +44,32 @@ Examples:
 
     python thumbnail.py template.pptx analysis --outline-placeholders
     # Creates thumbnail grids with red outlines around text placeholders
+
+    python thumbnail.py working.pptx preview --cache-dir .thumbnail-cache
+    # Re-renders only the slides that changed since the last run
 """
 
 import argparse
+import hashlib
+import os
+import re
+import shutil
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from inventory import extract_text_inventory
+from inventory import XmlPackage, extract_text_inventory_xml
 from PIL import Image, ImageDraw, ImageFont
-from pptx import Presentation
+
+# Conversions run on the shared LibreOffice pool when one is started
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "scripts"))
+from libreoffice import ConversionError, convert_document
 
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
-CONVERSION_DPI = 100  # DPI for PDF to image conversion
+DEFAULT_SLIDE_WIDTH = 10  # Slide width in inches assumed when none is given
 MAX_COLS = 6  # Maximum number of columns
 DEFAULT_COLS = 5  # Default number of columns
 JPEG_QUALITY = 95  # JPEG compression quality
@@ -66,6 +77,7 @@ JPEG_QUALITY = 95  # JPEG compression quality
 # Grid layout constants
 GRID_PADDING = 20  # Padding between thumbnails
 BORDER_WIDTH = 2  # Border width around thumbnails
+OUTLINE_MIN_WIDTH = 2  # Minimum placeholder outline width in pixels
 FONT_SIZE_RATIO = 0.12  # Font size as fraction of thumbnail width
 LABEL_PADDING_RATIO = 0.4  # Label padding as fraction of font size
 
@@ -92,6 +104,19 @@ def main():
         action="store_true",
         help="Outline text placeholders with a colored border",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of pdftoppm processes rasterizing page ranges in parallel "
+        "(default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Directory for caching slide images across runs; only slides "
+        "that changed since a previous run are rendered again",
+    )
 
     args = parser.parse_args()
 
@@ -125,7 +150,13 @@ def main():
                     print(f"Found placeholders on {len(placeholder_regions)} slides")
 
             # Convert slides to images
-            slide_images = convert_to_images(input_path, Path(temp_dir), CONVERSION_DPI)
+            slide_images = convert_to_images(
+                input_path,
+                Path(temp_dir),
+                THUMBNAIL_WIDTH,
+                args.cache_dir,
+                args.workers,
+            )
             if not slide_images:
                 print("Error: No slides found")
                 sys.exit(1)
@@ -165,18 +196,21 @@ def create_hidden_slide_placeholder(size):
 def get_placeholder_regions(pptx_path):
     """Extract ALL text regions from the presentation.
 
+    Only the geometry pass of the inventory runs, on the XML engine, since
+    text formatting and issue checks are not needed for outlines.
     Returns a tuple of (placeholder_regions, slide_dimensions).
     text_regions is a dict mapping slide indices to lists of text regions.
     Each region is a dict with 'left', 'top', 'width', 'height' in inches.
     slide_dimensions is a tuple of (width_inches, height_inches).
     """
-    prs = Presentation(str(pptx_path))
-    inventory = extract_text_inventory(pptx_path, prs)
+    inventory = extract_text_inventory_xml(pptx_path, passes=["geometry"])
     placeholder_regions = {}
 
     # Get actual slide dimensions in inches (EMU to inches conversion)
-    slide_width_inches = (prs.slide_width or 9144000) / 914400.0
-    slide_height_inches = (prs.slide_height or 5143500) / 914400.0
+    with XmlPackage(pptx_path) as package:
+        slide_width, slide_height = package.slide_size()
+    slide_width_inches = (slide_width or 9144000) / 914400.0
+    slide_height_inches = (slide_height or 5143500) / 914400.0
 
     for slide_key, shapes in inventory.items():
         # Extract slide index from "slide-N" format
@@ -200,63 +234,296 @@ def get_placeholder_regions(pptx_path):
     return placeholder_regions, (slide_width_inches, slide_height_inches)
 
 
-def convert_to_images(pptx_path, temp_dir, dpi):
-    """Convert PowerPoint to images via PDF, handling hidden slides."""
+class ThumbnailCache:
+    """On-disk cache of rendered slide images, keyed by content hash.
+
+    Rendering goes through a full LibreOffice conversion, which dominates the
+    run time when a deck is previewed again after a small edit. Each slide
+    image is stored under a hash of the slide XML and every part it draws
+    from (layout, master, theme, images and other media), so only slides that
+    changed, or whose layout, master or media changed, are rendered again.
+    Deck-wide settings (presentation.xml without its slide list, and table
+    styles) are part of every key, and the slide number is part of the key
+    of slides with a slide number field.
+    """
+
+    VERSION = 3
+
+    # Presentation relationships that don't affect how a slide looks; slide
+    # masters are followed from the slides that use them
+    DECK_SKIPPED_RELATIONSHIPS = {
+        "slide",
+        "slideMaster",
+        "notesMaster",
+        "handoutMaster",
+        "viewProps",
+        "commentAuthors",
+    }
+
+    def __init__(self, cache_dir, width):
+        """Initialize with the directory holding cache entries (created if needed)."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._digests = {}
+        self._deck_digest = None
+        self._environment = f"{self.VERSION}:{width}"
+
+    def _digest(self, package, partname):
+        """Hash a part's bytes, once per part for shared layouts and media."""
+        digest = self._digests.get(partname)
+        if digest is None:
+            digest = self._digests[partname] = hashlib.sha256(
+                package.blob(partname)
+            ).hexdigest()
+        return digest
+
+    def _deck(self, package):
+        """Hash the presentation part and the deck-wide parts it relates to.
+
+        The slide list is left out, so adding, removing or reordering slides
+        only changes the keys of slides that show their number.
+        """
+        if self._deck_digest is None:
+            presentation = package.presentation_partname
+            blob = re.sub(
+                rb"<(\w+:)?sldIdLst\b.*?</(\w+:)?sldIdLst>",
+                b"",
+                package.blob(presentation),
+                flags=re.DOTALL,
+            )
+            digests = [hashlib.sha256(blob).hexdigest()]
+            for rel_type, target in package.relationships(presentation).values():
+                if rel_type.rsplit("/", 1)[-1] in self.DECK_SKIPPED_RELATIONSHIPS:
+                    continue
+                if package.has_part(target):
+                    digests.append(f"{target}={self._digest(package, target)}")
+            self._deck_digest = hashlib.sha256("|".join(digests).encode()).hexdigest()
+        return self._deck_digest
+
+    def key(self, slide, number):
+        """Compute the cache key of a slide read by XmlPackage.
+
+        The slide's parts are followed through relationships, except links to
+        other slides and notes, and a master's links to its other layouts.
+
+        Args:
+            slide: The slide
+            number: The slide's 1-based position in the deck, counting
+                hidden slides, which is shown by slide number fields
+        """
+        package = slide.package
+        digests = [
+            self._environment,
+            f"{slide.slide_width_emu}x{slide.slide_height_emu}",
+            self._deck(package),
+        ]
+        seen = {slide.partname}
+        pending = [slide.partname]
+        while pending:
+            partname = pending.pop(0)
+            digests.append(self._digest(package, partname))
+            for rId, (rel_type, target) in package.relationships(partname).items():
+                rel_type = rel_type.rsplit("/", 1)[-1]
+                if rel_type in ("slide", "notesSlide"):
+                    continue
+                if rel_type == "slideLayout" and partname != slide.partname:
+                    continue
+                if not package.has_part(target):
+                    continue
+                digests.append(f"{rId}={self._digest(package, target)}")
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        # Layout and master number placeholders only show on slides that
+        # have one of their own, with its own field
+        if b'type="slidenum"' in package.blob(slide.partname):
+            digests.append(f"#{number}")
+        return hashlib.sha256("|".join(digests).encode()).hexdigest()
+
+    def get(self, key):
+        """Get the cached image of a slide, or None on a miss."""
+        path = self.cache_dir / f"{key}.png"
+        return path if path.exists() else None
+
+    def put(self, key, image_path):
+        """Store the rendered image of a slide."""
+        path = self.cache_dir / f"{key}.png"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(image_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # The cache is an optimization only
+
+
+def format_page_range(slide_nums):
+    """Format sorted 1-based slide numbers as a page range, e.g. "2-4,7"."""
+    ranges = []
+    for num in slide_nums:
+        if ranges and ranges[-1][1] == num - 1:
+            ranges[-1][1] = num
+        else:
+            ranges.append([num, num])
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}" for first, last in ranges
+    )
+
+
+def convert_to_pdf(pptx_path, output_dir, page_range=None):
+    """Convert PowerPoint to PDF with LibreOffice, optionally only some slides.
+
+    The page range counts hidden slides too, so hidden slides are exported
+    when a range is given; the range itself should only name visible slides.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    convert_to = "pdf"
+    if page_range:
+        convert_to = (
+            'pdf:impress_pdf_Export:{"PageRange":{"type":"string","value":"'
+            + page_range
+            + '"},"ExportHiddenSlides":{"type":"boolean","value":"true"}}'
+        )
+    try:
+        return convert_document(pptx_path, output_dir, convert_to)
+    except (ConversionError, FileNotFoundError) as e:
+        raise RuntimeError("PDF conversion failed") from e
+
+
+def count_pdf_pages(pdf_path):
+    """Get the number of pages of a PDF with pdfinfo, or None if unknown."""
+    try:
+        result = subprocess.run(
+            ["pdfinfo", str(pdf_path)], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    match = re.search(r"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+    return int(match.group(1)) if result.returncode == 0 and match else None
+
+
+def rasterize_pdf(pdf_path, width, workers=1):
+    """Convert each PDF page to a PNG next to the PDF, in page order.
+
+    Pages are rendered directly at the given width, so the work depends on
+    the thumbnail size rather than the slide resolution, and are written
+    losslessly since they are only scaled down into the grid afterwards.
+    With several workers, each pdftoppm process renders a range of pages.
+    """
+    pages = count_pdf_pages(pdf_path) if workers > 1 else None
+    if pages:
+        shard = -(-pages // min(workers, pages))
+        ranges = [
+            (first, min(first + shard - 1, pages))
+            for first in range(1, pages + 1, shard)
+        ]
+    else:
+        ranges = [None]
+
+    def rasterize(page_range):
+        command = ["pdftoppm", "-png", "-scale-to-x", str(width), "-scale-to-y", "-1"]
+        if page_range:
+            command += ["-f", str(page_range[0]), "-l", str(page_range[1])]
+        command += [str(pdf_path), str(pdf_path.parent / "slide")]
+        return subprocess.run(command, capture_output=True, text=True).returncode
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        if any(returncode != 0 for returncode in executor.map(rasterize, ranges)):
+            raise RuntimeError("Image conversion failed")
+
+    # Sort by the page number at the end of each name
+    return sorted(
+        pdf_path.parent.glob("slide-*.png"),
+        key=lambda path: int(path.stem.rsplit("-", 1)[1]),
+    )
+
+
+def render_slides(pptx_path, temp_dir, width, slide_nums, visible_slides, workers=1):
+    """Render visible slides to images, returning {slide number: image path}.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        temp_dir: Directory for the PDF and images
+        width: Width of the images in pixels
+        slide_nums: Sorted 1-based numbers of the slides to render
+        visible_slides: Sorted 1-based numbers of all visible slides
+        workers: Number of pdftoppm processes
+    """
+    if not slide_nums:
+        return {}
+
+    if slide_nums == visible_slides:
+        print("Converting to PDF...")
+        pdf_path = convert_to_pdf(pptx_path, temp_dir / "all")
+        print(f"Converting to images {width} px wide...")
+        return dict(zip(visible_slides, rasterize_pdf(pdf_path, width, workers)))
+
+    page_range = format_page_range(slide_nums)
+    print(f"Converting slides {page_range} to PDF...")
+    pdf_path = convert_to_pdf(pptx_path, temp_dir / "changed", page_range)
+    print(f"Converting to images {width} px wide...")
+    images = rasterize_pdf(pdf_path, width, workers)
+    if len(images) == len(slide_nums):
+        return dict(zip(slide_nums, images))
+
+    # LibreOffice before 7.4 ignores the page range and exports all visible
+    # slides; fall back to that when the page count does not match the range
+    if len(images) != len(visible_slides):
+        print("Converting to PDF...")
+        pdf_path = convert_to_pdf(pptx_path, temp_dir / "all")
+        images = rasterize_pdf(pdf_path, width, workers)
+    rendered = dict(zip(visible_slides, images))
+    return {num: rendered[num] for num in slide_nums if num in rendered}
+
+
+def convert_to_images(pptx_path, temp_dir, width, cache_dir=None, workers=1):
+    """Convert PowerPoint to images via PDF, handling hidden slides.
+
+    With a cache directory, only slides without a cached image are rendered
+    and newly rendered images are added to the cache.
+    """
     # Detect hidden slides
     print("Analyzing presentation...")
-    prs = Presentation(str(pptx_path))
-    total_slides = len(prs.slides)
-
-    # Find hidden slides (1-based indexing for display)
-    hidden_slides = {
-        idx + 1
-        for idx, slide in enumerate(prs.slides)
-        if slide.element.get("show") == "0"
-    }
+    cache = ThumbnailCache(cache_dir, width) if cache_dir else None
+    cache_keys = {}
+    hidden_slides = set()
+    with XmlPackage(pptx_path) as package:
+        total_slides = 0
+        for idx, slide in enumerate(package.slides()):
+            total_slides += 1
+            # Find hidden slides (1-based indexing for display)
+            if slide.element.get("show") == "0":
+                hidden_slides.add(idx + 1)
+            elif cache:
+                cache_keys[idx + 1] = cache.key(slide, idx + 1)
 
     print(f"Total slides: {total_slides}")
     if hidden_slides:
         print(f"Hidden slides: {sorted(hidden_slides)}")
 
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
-
-    # Convert to PDF
-    print("Converting to PDF...")
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
-
-    # Convert PDF to images
-    print(f"Converting to images at {dpi} DPI...")
-    result = subprocess.run(
-        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
-        capture_output=True,
-        text=True,
+    visible_slides = [n for n in range(1, total_slides + 1) if n not in hidden_slides]
+    slide_images = {}
+    if cache:
+        for slide_num, key in cache_keys.items():
+            cached = cache.get(key)
+            if cached is not None:
+                slide_images[slide_num] = cached
+        print(f"Cached slides: {len(slide_images)} of {len(visible_slides)}")
+
+    pending = [n for n in visible_slides if n not in slide_images]
+    rendered = render_slides(
+        pptx_path, temp_dir, width, pending, visible_slides, workers
     )
-    if result.returncode != 0:
-        raise RuntimeError("Image conversion failed")
-
-    visible_images = sorted(temp_dir.glob("slide-*.jpg"))
+    if cache:
+        for slide_num, image_path in rendered.items():
+            cache.put(cache_keys[slide_num], image_path)
+    slide_images.update(rendered)
 
     # Create full list with placeholders for hidden slides
     all_images = []
-    visible_idx = 0
 
     # Get placeholder dimensions from first visible slide
-    if visible_images:
-        with Image.open(visible_images[0]) as img:
+    if slide_images:
+        with Image.open(next(iter(slide_images.values()))) as img:
             placeholder_size = img.size
     else:
         placeholder_size = (1920, 1080)
@@ -268,11 +535,9 @@ def convert_to_images(pptx_path, temp_dir, dpi):
             placeholder_img = create_hidden_slide_placeholder(placeholder_size)
             placeholder_img.save(placeholder_path, "JPEG")
             all_images.append(placeholder_path)
-        else:
+        elif slide_num in slide_images:
             # Use the actual visible slide image
-            if visible_idx < len(visible_images):
-                all_images.append(visible_images[visible_idx])
-                visible_idx += 1
+            all_images.append(slide_images[slide_num])
 
     return all_images
 
@@ -339,7 +604,7 @@ def create_grid(
     # Get dimensions
     with Image.open(image_paths[0]) as img:
         aspect = img.height / img.width
-    height = int(width * aspect)
+    height = round(width * aspect)
 
     # Calculate grid size
     rows = (len(image_paths) + cols - 1) // cols
@@ -380,75 +645,62 @@ def create_grid(
         # Add thumbnail below label with proportional spacing
         y_thumbnail = y_base + label_padding + font_size + label_padding
 
+        # Tiles are loaded one at a time; JPEGs are decoded at the reduced
+        # scale closest to the tile size instead of at full size
         with Image.open(img_path) as img:
-            # Get original dimensions before thumbnail
-            orig_w, orig_h = img.size
-
-            # Apply placeholder outlines if enabled
-            if placeholder_regions and (start_slide_num + i) in placeholder_regions:
-                # Convert to RGBA for transparency support
-                if img.mode != "RGBA":
-                    img = img.convert("RGBA")
-
-                # Get the regions for this slide
-                regions = placeholder_regions[start_slide_num + i]
-
-                # Calculate scale factors using actual slide dimensions
-                if slide_dimensions:
-                    slide_width_inches, slide_height_inches = slide_dimensions
-                else:
-                    # Fallback: estimate from image size at CONVERSION_DPI
-                    slide_width_inches = orig_w / CONVERSION_DPI
-                    slide_height_inches = orig_h / CONVERSION_DPI
-
-                x_scale = orig_w / slide_width_inches
-                y_scale = orig_h / slide_height_inches
-
-                # Create a highlight overlay
-                overlay = Image.new("RGBA", img.size, (255, 255, 255, 0))
-                overlay_draw = ImageDraw.Draw(overlay)
-
-                # Highlight each placeholder region
-                for region in regions:
-                    # Convert from inches to pixels in the original image
-                    px_left = int(region["left"] * x_scale)
-                    px_top = int(region["top"] * y_scale)
-                    px_width = int(region["width"] * x_scale)
-                    px_height = int(region["height"] * y_scale)
-
-                    # Draw highlight outline with red color and thick stroke
-                    # Using a bright red outline instead of fill
-                    stroke_width = max(
-                        5, min(orig_w, orig_h) // 150
-                    )  # Thicker proportional stroke width
-                    overlay_draw.rectangle(
-                        [(px_left, px_top), (px_left + px_width, px_top + px_height)],
-                        outline=(255, 0, 0, 255),  # Bright red, fully opaque
-                        width=stroke_width,
-                    )
-
-                # Composite the overlay onto the image using alpha blending
-                img = Image.alpha_composite(img, overlay)
-                # Convert back to RGB for JPEG saving
-                img = img.convert("RGB")
-
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
-            w, h = img.size
-            tx = x + (width - w) // 2
-            ty = y_thumbnail + (height - h) // 2
-            grid.paste(img, (tx, ty))
-
-            # Add border
-            if BORDER_WIDTH > 0:
+            img.draft("RGB", (width, height))
+            tile = img.convert("RGB")
+        tile.thumbnail((width, height), Image.Resampling.LANCZOS)
+        w, h = tile.size
+        tx = x + (width - w) // 2
+        ty = y_thumbnail + (height - h) // 2
+        grid.paste(tile, (tx, ty))
+        del tile
+
+        # Outline placeholders on the grid, in scaled coordinates
+        if placeholder_regions and (start_slide_num + i) in placeholder_regions:
+            # Calculate scale factors using actual slide dimensions
+            if slide_dimensions:
+                slide_width_inches, slide_height_inches = slide_dimensions
+            else:
+                # Fallback: assume the default slide width
+                slide_width_inches = DEFAULT_SLIDE_WIDTH
+                slide_height_inches = DEFAULT_SLIDE_WIDTH * h / w
+
+            x_scale = w / slide_width_inches
+            y_scale = h / slide_height_inches
+            stroke_width = max(OUTLINE_MIN_WIDTH, min(w, h) // 150)
+
+            for region in placeholder_regions[start_slide_num + i]:
+                # Convert from inches to pixels in the tile, clipped to the tile
+                left = tx + max(0, int(region["left"] * x_scale))
+                top = ty + max(0, int(region["top"] * y_scale))
+                right = tx + min(
+                    w - 1, int((region["left"] + region["width"]) * x_scale)
+                )
+                bottom = ty + min(
+                    h - 1, int((region["top"] + region["height"]) * y_scale)
+                )
+                if right < left or bottom < top:
+                    continue
+                # Bright red outline instead of fill
                 draw.rectangle(
-                    [
-                        (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
-                        (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
-                    ],
-                    outline="gray",
-                    width=BORDER_WIDTH,
+                    [(left, top), (right, bottom)],
+                    outline=(255, 0, 0),
+                    width=stroke_width,
                 )
 
+        # Add border
+        if BORDER_WIDTH > 0:
+            draw.rectangle(
+                [
+                    (tx - BORDER_WIDTH, ty - BORDER_WIDTH),
+                    (tx + w + BORDER_WIDTH - 1, ty + h + BORDER_WIDTH - 1),
+                ],
+                outline="gray",
+                width=BORDER_WIDTH,
+            )
+
     return grid
 
 
@@ -0,0 +1,78 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "python-pptx>=0.6.21",
+#   "Pillow>=10.0.0",
+#   "lxml>=4.9.0",
+# ]
+# ///
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from inventory import XmlPackage
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+from thumbnail import ThumbnailCache
+
+
+class TestThumbnailCacheKey(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name) / "deck.pptx"
+
+        prs = Presentation()
+        for text in ("first", "numbered", "third"):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            paragraph = slide.shapes.add_textbox(
+                Inches(1), Inches(1), Inches(4), Inches(1)
+            ).text_frame.paragraphs[0]
+            paragraph.add_run().text = text
+            if text == "numbered":
+                field = etree.SubElement(paragraph._p, qn("a:fld"))
+                field.set("id", "{B6F15528-21DE-4FAA-801E-634DDDAF4B2B}")
+                field.set("type", "slidenum")
+                etree.SubElement(field, qn("a:t")).text = "2"
+        prs.save(self.path)
+
+    def keys(self):
+        """Cache keys by slide text, as a new run of thumbnail.py computes them."""
+        cache = ThumbnailCache(Path(self.tmpdir.name) / "cache", 300)
+        with XmlPackage(self.path) as package:
+            return {
+                "".join(slide.element.itertext()).rstrip("0123456789"): cache.key(
+                    slide, number
+                )
+                for number, slide in enumerate(package.slides(), 1)
+            }
+
+    def test_reorder_changes_only_numbered_slides(self):
+        before = self.keys()
+        prs = Presentation(self.path)
+        slide_ids = prs.slides._sldIdLst
+        slide_ids.insert(0, slide_ids[2])
+        prs.save(self.path)
+
+        after = self.keys()
+        self.assertEqual(after["first"], before["first"])
+        self.assertEqual(after["third"], before["third"])
+        self.assertNotEqual(after["numbered"], before["numbered"])
+
+    def test_deck_text_defaults_change_every_key(self):
+        before = self.keys()
+        prs = Presentation(self.path)
+        level = prs.part._element.find(qn("p:defaultTextStyle")).find(qn("a:lvl1pPr"))
+        level.set("algn", "ctr")
+        prs.save(self.path)
+
+        after = self.keys()
+        for text, key in before.items():
+            self.assertNotEqual(after[text], key)
+
+
+if __name__ == "__main__":
+    unittest.main()
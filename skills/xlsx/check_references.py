@@ -0,0 +1,572 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "lxml>=4.9.0",
+# ]
+# ///
+"""
+Find broken references and circular dependencies without recalculating.
+
+recalc.py only sees a broken reference once LibreOffice has recalculated the
+workbook and the resulting error values are scanned. Most of them can be
+found from the formulas alone: this script tokenizes every formula and
+resolves its sheet names, defined names, functions, table references and
+ranges against the structure of the workbook, which takes milliseconds.
+
+Reported as #REF!:
+    - References to sheets that do not exist
+    - #REF! left in a formula or defined name by deleted cells
+    - Columns that a table does not have
+Reported as #NAME?:
+    - Unknown functions, defined names and tables
+Also reported:
+    - Circular references between formula cells
+
+A formula that only refers to valid cells can still evaluate to an error,
+e.g. on a division by zero; run recalc.py for those.
+
+Usage:
+    python check_references.py workbook.xlsx
+
+Returns JSON in the format of recalc.py, with an issues list giving the
+reason for each error and the circular references found.
+"""
+
+import json
+import posixpath
+import sys
+import zipfile
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Optional
+
+from formulas import (
+    CELL_RE,
+    MAX_COLUMN,
+    MAX_ROW,
+    PKG_REL_NS,
+    REL_NS,
+    SHEET_NS,
+    UnsupportedFormula,
+    column_index,
+    column_letter,
+    parse_area,
+    relative_form,
+    tokenize,
+)
+from lxml import etree
+
+TABLE_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/table"
+)
+
+# Functions Excel knows by their plain name
+KNOWN_FUNCTIONS = frozenset(
+    """
+    ABS ACCRINT ACCRINTM ACOS ACOSH ADDRESS AMORDEGRC AMORLINC AND AREAS ASC
+    ASIN ASINH ATAN ATAN2 ATANH AVEDEV AVERAGE AVERAGEA AVERAGEIF AVERAGEIFS
+    BAHTTEXT BESSELI BESSELJ BESSELK BESSELY BETADIST BETAINV BIN2DEC BIN2HEX
+    BIN2OCT BINOMDIST CALL CEILING CELL CHAR CHIDIST CHIINV CHITEST CHOOSE
+    CLEAN CODE COLUMN COLUMNS COMBIN COMPLEX CONCATENATE CONFIDENCE CONVERT
+    CORREL COS COSH COUNT COUNTA COUNTBLANK COUNTIF COUNTIFS COUPDAYBS
+    COUPDAYS COUPDAYSNC COUPNCD COUPNUM COUPPCD COVAR CRITBINOM CUBEKPIMEMBER
+    CUBEMEMBER CUBEMEMBERPROPERTY CUBERANKEDMEMBER CUBESET CUBESETCOUNT
+    CUBEVALUE CUMIPMT CUMPRINC DATE DATEDIF DATEVALUE DAVERAGE DAY DAYS360 DB
+    DBCS DCOUNT DCOUNTA DDB DEC2BIN DEC2HEX DEC2OCT DEGREES DELTA DEVSQ DGET
+    DISC DMAX DMIN DOLLAR DOLLARDE DOLLARFR DPRODUCT DSTDEV DSTDEVP DSUM
+    DURATION DVAR DVARP EDATE EFFECT EOMONTH ERF ERFC ERROR.TYPE EUROCONVERT
+    EVEN EXACT EXP EXPONDIST FACT FACTDOUBLE FALSE FDIST FIND FINDB FINV
+    FISHER FISHERINV FIXED FLOOR FORECAST FREQUENCY FTEST FV FVSCHEDULE
+    GAMMADIST GAMMAINV GAMMALN GCD GEOMEAN GESTEP GETPIVOTDATA GROWTH HARMEAN
+    HEX2BIN HEX2DEC HEX2OCT HLOOKUP HOUR HYPERLINK HYPGEOMDIST IF IFERROR
+    IMABS IMAGINARY IMARGUMENT IMCONJUGATE IMCOS IMDIV IMEXP IMLN IMLOG10
+    IMLOG2 IMPOWER IMPRODUCT IMREAL IMSIN IMSQRT IMSUB IMSUM INDEX INDIRECT
+    INFO INT INTERCEPT INTRATE IPMT IRR ISBLANK ISERR ISERROR ISEVEN ISLOGICAL
+    ISNA ISNONTEXT ISNUMBER ISODD ISPMT ISREF ISTEXT JIS KURT LARGE LCM LEFT
+    LEFTB LEN LENB LINEST LN LOG LOG10 LOGEST LOGINV LOGNORMDIST LOOKUP LOWER
+    MATCH MAX MAXA MDETERM MDURATION MEDIAN MID MIDB MIN MINA MINUTE MINVERSE
+    MIRR MMULT MOD MODE MONTH MROUND MULTINOMIAL N NA NEGBINOMDIST NETWORKDAYS
+    NOMINAL NORMDIST NORMINV NORMSDIST NORMSINV NOT NOW NPER NPV OCT2BIN
+    OCT2DEC OCT2HEX ODD ODDFPRICE ODDFYIELD ODDLPRICE ODDLYIELD OFFSET OR
+    PEARSON PERCENTILE PERCENTRANK PERMUT PHONETIC PI PMT POISSON POWER PPMT
+    PRICE PRICEDISC PRICEMAT PROB PRODUCT PROPER PV QUARTILE QUOTIENT RADIANS
+    RAND RANDBETWEEN RANK RATE RECEIVED REGISTER.ID REPLACE REPLACEB REPT
+    RIGHT RIGHTB ROMAN ROUND ROUNDDOWN ROUNDUP ROW ROWS RSQ RTD SEARCH
+    SEARCHB SECOND SERIESSUM SIGN SIN SINH SKEW SLN SLOPE SMALL SQRT SQRTPI
+    STANDARDIZE STDEV STDEVA STDEVP STDEVPA STEYX SUBSTITUTE SUBTOTAL SUM
+    SUMIF SUMIFS SUMPRODUCT SUMSQ SUMX2MY2 SUMX2PY2 SUMXMY2 SYD T TAN TANH
+    TBILLEQ TBILLPRICE TBILLYIELD TDIST TEXT TIME TIMEVALUE TINV TODAY
+    TRANSPOSE TREND TRIM TRIMMEAN TRUE TRUNC TTEST TYPE UPPER USDOLLAR VALUE
+    VAR VARA VARP VARPA VDB VLOOKUP WEEKDAY WEEKNUM WEIBULL WORKDAY XIRR XNPV
+    YEAR YEARFRAC YIELD YIELDDISC YIELDMAT ZTEST
+    """.split()
+)
+# Functions added since Excel 2010, which files must store as _xlfn.NAME:
+# Excel shows #NAME? for them otherwise
+PREFIXED_FUNCTIONS = frozenset(
+    """
+    ACOT ACOTH AGGREGATE ARABIC ARRAYTOTEXT BASE BETA.DIST BETA.INV
+    BINOM.DIST BINOM.DIST.RANGE BINOM.INV BITAND BITLSHIFT BITOR BITRSHIFT
+    BITXOR BYCOL BYROW CEILING.MATH CEILING.PRECISE CHISQ.DIST CHISQ.DIST.RT
+    CHISQ.INV CHISQ.INV.RT CHISQ.TEST CHOOSECOLS CHOOSEROWS COMBINA CONCAT
+    CONFIDENCE.NORM CONFIDENCE.T COT COTH COVARIANCE.P COVARIANCE.S CSC CSCH
+    DAYS DECIMAL DROP ENCODEURL ERF.PRECISE ERFC.PRECISE EXPAND EXPON.DIST
+    F.DIST F.DIST.RT F.INV F.INV.RT F.TEST FILTER FILTERXML FLOOR.MATH
+    FLOOR.PRECISE FORECAST.ETS FORECAST.ETS.CONFINT FORECAST.ETS.SEASONALITY
+    FORECAST.ETS.STAT FORECAST.LINEAR FORMULATEXT GAMMA GAMMA.DIST GAMMA.INV
+    GAMMALN.PRECISE GAUSS HSTACK HYPGEOM.DIST IFNA IFS IMAGE IMCOSH IMCOT
+    IMCSC IMCSCH IMSEC IMSECH IMSINH IMTAN ISFORMULA ISOMITTED ISOWEEKNUM
+    LAMBDA LET LOGNORM.DIST LOGNORM.INV MAKEARRAY MAP MAXIFS MINIFS MODE.MULT
+    MODE.SNGL MUNIT NEGBINOM.DIST NETWORKDAYS.INTL NORM.DIST NORM.INV
+    NORM.S.DIST NORM.S.INV NUMBERVALUE PDURATION PERCENTILE.EXC
+    PERCENTILE.INC PERCENTRANK.EXC PERCENTRANK.INC PERMUTATIONA PHI
+    POISSON.DIST QUARTILE.EXC QUARTILE.INC RANDARRAY RANK.AVG RANK.EQ REDUCE
+    RRI SCAN SEC SECH SEQUENCE SHEET SHEETS SINGLE SKEW.P SORT SORTBY STDEV.P
+    STDEV.S SWITCH T.DIST T.DIST.2T T.DIST.RT T.INV T.INV.2T T.TEST TAKE
+    TEXTAFTER TEXTBEFORE TEXTJOIN TEXTSPLIT TOCOL TOROW UNICHAR UNICODE UNIQUE
+    VALUETOTEXT VAR.P VAR.S VSTACK WEBSERVICE WEIBULL.DIST WORKDAY.INTL
+    WRAPCOLS WRAPROWS XLOOKUP XMATCH XOR Z.TEST
+    """.split()
+)
+# Prefixes of new, add-in and user-defined functions, and of LAMBDA
+# parameters, which are not checked
+UNCHECKED_PREFIXES = ("_XLFN.", "_XLWS.", "_XLL.", "_XLUDF.", "_XLPM.")
+
+
+class Table:
+    """A table of a worksheet, for structured references."""
+
+    def __init__(self, sheet: int, area: str, columns: list[str]):
+        self.sheet = sheet
+        self.bounds, _ = parse_area(area)
+        self.columns = {column.casefold() for column in columns}
+
+    def contains(self, sheet: int, row: int, column: int) -> bool:
+        r1, c1, r2, c2 = self.bounds
+        return sheet == self.sheet and r1 <= row <= r2 and c1 <= column <= c2
+
+
+def structured_columns(reference: str) -> tuple[str, list[str]]:
+    """Split Table1[[#This Row],[Amount]:[Tax]] into its table and columns.
+
+    Special items such as [#Totals] are left out; [@Amount] gives Amount.
+    """
+    table, _, items = reference.partition("[")
+    items = "[" + items
+    names = []
+    current = None
+    special = False
+    i = 0
+    while i < len(items):
+        char = items[i]
+        if char == "'":
+            # ' escapes the next character of a column name
+            i += 1
+            if current is not None and i < len(items):
+                current += items[i]
+        elif char == "[":
+            current = ""
+            special = False
+        elif char == "]":
+            column = (current or "").strip()
+            if column.startswith("@"):
+                column = column[1:].strip()
+            if column and not special:
+                names.append(column)
+            current = None
+        elif current is not None:
+            if char == "#" and not current.strip(" @"):
+                special = True
+            current += char
+        i += 1
+    return table, names
+
+
+class ReferenceChecker:
+    """The structure of a workbook, and the references of its formulas."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.sheet_names: list[str] = []
+        self.worksheets: list[tuple[int, str]] = []  # (sheet index, part name)
+        self.defined_names: dict[tuple[Optional[int], str], str] = {}
+        self.tables: dict[str, Table] = {}
+        # (sheet, row, column) -> references to cells (sheet, bounds)
+        self.formula_refs: dict[tuple[int, int, int], list] = {}
+        # (error, reason) -> cells
+        self.issues: dict[tuple[str, str], list[tuple[int, int, int]]] = {}
+        self.unparsed = 0
+        # (sheet, relative form) -> (row, column, issues, refs) of a first copy
+        self._analyzed: dict[tuple[int, str], tuple] = {}
+        self._names: dict[tuple[Optional[int], str], tuple] = {}
+
+    def check(self) -> dict:
+        """Analyze all formulas and report the problems found."""
+        with zipfile.ZipFile(self.path) as archive:
+            self._read_workbook(archive)
+            for sheet, part in self.worksheets:
+                self._read_tables(archive, sheet, part)
+            for sheet, part in self.worksheets:
+                with archive.open(part) as stream:
+                    self._read_formulas(sheet, stream)
+        return self._report(self._find_cycles())
+
+    def _read_workbook(self, archive: zipfile.ZipFile) -> None:
+        workbook = etree.fromstring(archive.read("xl/workbook.xml"))
+        rels = etree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {
+            rel.get("Id"): resolve_target("xl/workbook.xml", rel.get("Target"))
+            for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship")
+        }
+        for index, sheet in enumerate(workbook.iter(f"{{{SHEET_NS}}}sheet")):
+            self.sheet_names.append(sheet.get("name"))
+            target = targets.get(sheet.get(f"{{{REL_NS}}}id"))
+            if target and target.startswith("xl/worksheets/"):
+                self.worksheets.append((index, target))
+        self.sheet_indices = {
+            name.casefold(): i for i, name in enumerate(self.sheet_names)
+        }
+        for name in workbook.iter(f"{{{SHEET_NS}}}definedName"):
+            local = name.get("localSheetId")
+            scope = int(local) if local is not None else None
+            self.defined_names[(scope, name.get("name").upper())] = name.text or ""
+
+    def _read_tables(self, archive: zipfile.ZipFile, sheet: int, part: str) -> None:
+        directory, filename = posixpath.split(part)
+        rels_part = f"{directory}/_rels/{filename}.rels"
+        if rels_part not in archive.namelist():
+            return
+        rels = etree.fromstring(archive.read(rels_part))
+        for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+            if rel.get("Type") != TABLE_RELATIONSHIP:
+                continue
+            table_part = resolve_target(part, rel.get("Target"))
+            table = etree.fromstring(archive.read(table_part))
+            columns = [
+                column.get("name")
+                for column in table.iter(f"{{{SHEET_NS}}}tableColumn")
+            ]
+            entry = Table(sheet, table.get("ref"), columns)
+            for name in (table.get("name"), table.get("displayName")):
+                if name:
+                    self.tables[name.casefold()] = entry
+
+    def _read_formulas(self, sheet: int, stream) -> None:
+        cell_tag, formula_tag = f"{{{SHEET_NS}}}c", f"{{{SHEET_NS}}}f"
+        # Shared formula index -> (row, column, issues, refs) of its master cell
+        shared: dict[str, tuple] = {}
+        row = column = 0
+        current_row = None
+        for _, elem in etree.iterparse(stream, tag=cell_tag):
+            parent = elem.getparent()
+            if parent is not current_row:
+                # Drop finished rows so memory stays flat
+                while parent.getprevious() is not None:
+                    del parent.getparent()[0]
+                current_row = parent
+                # The r attributes are optional; rows and cells then follow on
+                row = int(parent.get("r") or row + 1)
+                column = 0
+
+            reference = elem.get("r")
+            if reference:
+                column = column_index(CELL_RE.fullmatch(reference).group(2))
+            else:
+                column += 1
+            formula = elem.find(formula_tag)
+            if formula is None:
+                continue
+            kind = formula.get("t", "normal")
+            if kind == "shared" and not formula.text:
+                if formula.get("si") not in shared:
+                    self.unparsed += 1
+                    continue
+                master_row, master_column, issues, refs = shared[formula.get("si")]
+                refs = shift_refs(refs, row - master_row, column - master_column)
+            else:
+                try:
+                    issues, refs = self._analyze(formula.text or "", sheet, row, column)
+                except UnsupportedFormula:
+                    self.unparsed += 1
+                    continue
+                if kind == "shared":
+                    shared[formula.get("si")] = (row, column, issues, refs)
+            key = (sheet, row, column)
+            self.formula_refs[key] = refs
+            for issue in issues:
+                self.issues.setdefault(issue, []).append(key)
+            # Formulas without a table name refer to the table they are in
+            if "[" in (formula.text or ""):
+                for issue in self._check_local_table(formula.text, key):
+                    self.issues.setdefault(issue, []).append(key)
+
+    def _analyze(self, formula: str, sheet: int, row: int, column: int) -> tuple:
+        """The (error, reason) issues and cell references of a formula.
+
+        Copies of a formula share one analysis, shifted to their cell.
+        """
+        template = (sheet, relative_form(formula, row, column))
+        analyzed = self._analyzed.get(template)
+        if analyzed is not None:
+            first_row, first_column, issues, refs = analyzed
+            return issues, shift_refs(refs, row - first_row, column - first_column)
+
+        issues = []
+        refs = []
+        for kind, value in tokenize(formula.lstrip("=")):
+            if kind == "ref":
+                issue = self._resolve_ref(value, sheet, refs)
+            elif kind == "error" and value == "#REF!":
+                issue = ("#REF!", "Reference to deleted cells (#REF!)")
+            elif kind == "function":
+                issue = self._check_function(value, sheet)
+            elif kind == "name":
+                issue = self._resolve_name(value, sheet, refs)
+            elif kind == "structured":
+                issue = self._check_table(value)
+            else:
+                issue = None
+            if issue and issue not in issues:
+                issues.append(issue)
+        self._analyzed[template] = (row, column, issues, refs)
+        return issues, refs
+
+    def _resolve_ref(self, value: tuple, sheet: int, refs: list) -> Optional[tuple]:
+        sheet_name, area = value
+        if sheet_name and sheet_name.startswith("["):
+            return None  # In another workbook
+        if sheet_name is None:
+            target = sheet
+        else:
+            target = self.sheet_indices.get(sheet_name.casefold())
+            if target is None:
+                return ("#REF!", f"Sheet '{sheet_name}' does not exist")
+        (r1, c1, r2, c2), absolute = parse_area(area)
+        if r2 > MAX_ROW or c2 > MAX_COLUMN:
+            # Beyond the grid, Excel reads it as a name
+            return ("#NAME?", f"Unknown name {area.upper()}")
+        refs.append((target, (r1, c1, r2, c2), absolute))
+        return None
+
+    def _check_function(self, name: str, sheet: int) -> Optional[tuple]:
+        if name in KNOWN_FUNCTIONS or name.startswith(UNCHECKED_PREFIXES):
+            return None
+        # A defined name can hold a LAMBDA
+        if (sheet, name) in self.defined_names or (None, name) in self.defined_names:
+            return None
+        if name in PREFIXED_FUNCTIONS:
+            return ("#NAME?", f"{name} must be written as _xlfn.{name}")
+        return ("#NAME?", f"Unknown function {name}")
+
+    def _resolve_name(self, value: str, sheet: int, refs: list) -> Optional[tuple]:
+        name = value.upper()
+        if name in ("TRUE", "FALSE") or name.startswith(UNCHECKED_PREFIXES):
+            return None
+        scope = sheet if (sheet, name) in self.defined_names else None
+        if (scope, name) not in self.defined_names:
+            return ("#NAME?", f"Unknown name {value}")
+        if (scope, name) not in self._names:
+            self._names[(scope, name)] = ([], [])  # Names that refer to each other
+            try:
+                # Names refer to fixed cells, so their sheet is arbitrary
+                issues, name_refs = self._analyze(
+                    self.defined_names[(scope, name)], scope or 0, 1, 1
+                )
+            except UnsupportedFormula:
+                issues, name_refs = [], []
+            self._names[(scope, name)] = (issues, name_refs)
+        issues, name_refs = self._names[(scope, name)]
+        refs.extend(name_refs)
+        if issues:
+            error, reason = issues[0]
+            return (error, f"Name {value}: {reason}")
+        return None
+
+    def _check_table(self, reference: str) -> Optional[tuple]:
+        table_name, columns = structured_columns(reference)
+        if not table_name:
+            return None  # Checked against the table the cell is in
+        table = self.tables.get(table_name.casefold())
+        if table is None:
+            return ("#NAME?", f"Table {table_name} does not exist")
+        return self._check_columns(table_name, table, columns)
+
+    def _check_columns(
+        self, table_name: str, table: Table, columns: list[str]
+    ) -> Optional[tuple]:
+        for column in columns:
+            if column.casefold() not in table.columns:
+                return ("#REF!", f"Table {table_name} has no column {column}")
+        return None
+
+    def _check_local_table(self, formula: str, key: tuple[int, int, int]):
+        try:
+            tokens = tokenize(formula.lstrip("="))
+        except UnsupportedFormula:
+            return
+        for kind, value in tokens:
+            if kind != "structured":
+                continue
+            table_name, columns = structured_columns(value)
+            if table_name:
+                continue
+            table = next(
+                (
+                    (name, table)
+                    for name, table in self.tables.items()
+                    if table.contains(*key)
+                ),
+                None,
+            )
+            if table is None:
+                yield ("#REF!", f"{value} is not inside a table")
+            else:
+                issue = self._check_columns(table[0], table[1], columns)
+                if issue:
+                    yield issue
+
+    def _find_cycles(self) -> list[list[tuple[int, int, int]]]:
+        """Strongly connected groups of formula cells that refer to each other."""
+        columns: dict[tuple[int, int], list[int]] = {}
+        for sheet, row, column in self.formula_refs:
+            columns.setdefault((sheet, column), []).append(row)
+        for rows in columns.values():
+            rows.sort()
+
+        def dependencies(key):
+            for sheet, (r1, c1, r2, c2), _ in self.formula_refs[key]:
+                for column in range(c1, min(c2, MAX_COLUMN) + 1):
+                    rows = columns.get((sheet, column))
+                    if rows:
+                        for row in rows[bisect_left(rows, r1) : bisect_right(rows, r2)]:
+                            yield (sheet, row, column)
+
+        # Tarjan's algorithm, without recursion
+        index: dict[tuple, int] = {}
+        lowlink: dict[tuple, int] = {}
+        on_stack: set[tuple] = set()
+        self_references: set[tuple] = set()
+        stack: list[tuple] = []
+        cycles = []
+        for start in self.formula_refs:
+            if start in index:
+                continue
+            index[start] = lowlink[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            work = [(start, dependencies(start))]
+            while work:
+                key, pending = work[-1]
+                for dependency in pending:
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = len(index)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, dependencies(dependency)))
+                        break
+                    if dependency in on_stack:
+                        lowlink[key] = min(lowlink[key], index[dependency])
+                        if dependency == key:
+                            self_references.add(key)
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[key])
+                    if lowlink[key] == index[key]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == key:
+                                break
+                        if len(component) > 1 or key in self_references:
+                            cycles.append(sorted(component))
+        return cycles
+
+    def location(self, key: tuple[int, int, int]) -> str:
+        sheet, row, column = key
+        return f"{self.sheet_names[sheet]}!{column_letter(column)}{row}"
+
+    def _report(self, cycles: list[list[tuple[int, int, int]]]) -> dict:
+        error_cells: dict[str, set] = {}
+        issues = []
+        for (error, reason), cells in self.issues.items():
+            error_cells.setdefault(error, set()).update(cells)
+            issues.append(
+                {
+                    "error": error,
+                    "reason": reason,
+                    "count": len(cells),
+                    "locations": [self.location(cell) for cell in cells[:20]],
+                }
+            )
+        total_errors = sum(len(cells) for cells in error_cells.values())
+        result = {
+            "status": "success" if not total_errors and not cycles else "errors_found",
+            "total_errors": total_errors,
+            "total_formulas": len(self.formula_refs) + self.unparsed,
+            "error_summary": {
+                error: {
+                    "count": len(cells),
+                    "locations": [self.location(cell) for cell in sorted(cells)[:20]],
+                }
+                for error, cells in error_cells.items()
+            },
+            "issues": issues,
+            "circular_references": [
+                {
+                    "count": len(cycle),
+                    "locations": [self.location(cell) for cell in cycle[:20]],
+                }
+                for cycle in cycles
+            ],
+        }
+        if self.unparsed:
+            result["unchecked_formulas"] = self.unparsed
+        return result
+
+
+def resolve_target(source: str, target: str) -> str:
+    """The part name a relationship of a part points to."""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
+
+
+def shift_refs(refs: list, rows: int, columns: int) -> list:
+    """Move relative references as copying their formula would."""
+    if not rows and not columns:
+        return refs
+    shifted = []
+    for sheet, (r1, c1, r2, c2), absolute in refs:
+        bounds = (
+            r1 if absolute[0] else r1 + rows,
+            c1 if absolute[1] else c1 + columns,
+            r2 if absolute[2] else r2 + rows,
+            c2 if absolute[3] else c2 + columns,
+        )
+        shifted.append((sheet, bounds, absolute))
+    return shifted
+
+
+def check_references(path: Path | str) -> dict:
+    """Report broken references and circular references in a workbook."""
+    return ReferenceChecker(path).check()
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python check_references.py <excel_file>")
+        print("\nFinds references that are guaranteed to fail (#REF!, #NAME?) and")
+        print("circular references, without recalculating the workbook")
+        sys.exit(1)
+    if not Path(sys.argv[1]).exists():
+        print(json.dumps({"error": f"File {sys.argv[1]} does not exist"}, indent=2))
+        sys.exit(1)
+    print(json.dumps(check_references(sys.argv[1]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
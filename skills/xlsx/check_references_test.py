@@ -0,0 +1,113 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "openpyxl>=3.1.0",
+#   "lxml>=4.9.0",
+# ]
+# ///
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from check_references import check_references, structured_columns
+from openpyxl import Workbook
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.table import Table
+
+
+class TestStructuredColumns(unittest.TestCase):
+    def test_columns(self):
+        self.assertEqual(
+            structured_columns("Sales[[#This Row],[Unit Price]:[Tax]]"),
+            ("Sales", ["Unit Price", "Tax"]),
+        )
+        self.assertEqual(structured_columns("[@Qty]"), ("", ["Qty"]))
+        self.assertEqual(structured_columns("T['#Count]"), ("T", ["#Count"]))
+
+
+class TestCheckReferences(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name) / "book.xlsx"
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(["Item", "Price", "Qty", "Total"])
+        for i in range(3):
+            ws.append([f"item {i}", i + 1, 2, "=[@Price]*[@Qty]"])
+        ws.add_table(Table(displayName="Sales", ref="A1:D4"))
+        wb.create_sheet("Summary")
+        wb.defined_names["Rate"] = DefinedName("Rate", attr_text="Data!$B$2")
+        wb.defined_names["Gone"] = DefinedName("Gone", attr_text="Data!#REF!")
+        self.wb = wb
+
+    def check(self, formulas):
+        ws = self.wb["Summary"]
+        for coordinate, formula in formulas.items():
+            ws[coordinate] = formula
+        self.wb.save(self.path)
+        return check_references(self.path)
+
+    def reasons(self, result):
+        return {
+            location: issue["reason"]
+            for issue in result["issues"]
+            for location in issue["locations"]
+        }
+
+    def test_valid_references(self):
+        result = self.check(
+            {
+                "A1": "=SUM(Sales[Total])*Rate",
+                "A2": "=Data!B2+'Data'!C3",
+                "A3": "=_xlfn.XLOOKUP(1,Data!B2:B4,Data!C2:C4)",
+                "A4": "=IF(TRUE,SUM(Data!D:D),0)",
+            }
+        )
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["total_formulas"], 7)
+
+    def test_broken_references(self):
+        result = self.check(
+            {
+                "A1": "=Missing!A1",
+                "A2": "=#REF!+1",
+                "A3": "=Gone*2",
+                "A4": "=SUM(Sales[Discount])",
+                "B1": "=SUMM(Data!B2:B4)",
+                "B2": "=XLOOKUP(1,Data!B2:B4,Data!C2:C4)",
+                "B3": "=Unknown+1",
+                "B4": "=SUM(Other[Col])",
+            }
+        )
+        self.assertEqual(
+            result["error_summary"]["#REF!"]["locations"],
+            ["Summary!A1", "Summary!A2", "Summary!A3", "Summary!A4"],
+        )
+        self.assertEqual(
+            result["error_summary"]["#NAME?"]["locations"],
+            ["Summary!B1", "Summary!B2", "Summary!B3", "Summary!B4"],
+        )
+        reasons = self.reasons(result)
+        self.assertEqual(reasons["Summary!A1"], "Sheet 'Missing' does not exist")
+        self.assertEqual(reasons["Summary!A4"], "Table Sales has no column Discount")
+        self.assertEqual(
+            reasons["Summary!B2"], "XLOOKUP must be written as _xlfn.XLOOKUP"
+        )
+
+    def test_circular_references(self):
+        result = self.check(
+            {"A1": "=B1+1", "B1": "=A1*2", "C1": "=C1", "D1": "=SUM(A2:A9)"}
+        )
+        self.assertEqual(result["status"], "errors_found")
+        self.assertEqual(
+            [cycle["locations"] for cycle in result["circular_references"]],
+            [["Summary!A1", "Summary!B1"], ["Summary!C1"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
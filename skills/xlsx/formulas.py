@@ -0,0 +1,1265 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "lxml>=4.9.0",
+# ]
+# ///
+"""
+Evaluate the formulas of an xlsx workbook in Python, without LibreOffice.
+
+Most generated workbooks only use arithmetic and a handful of functions, and
+recalculating them needs no office suite. This module parses every formula,
+orders the formula cells by their dependencies and evaluates them, then
+stores the results as the cells' cached values, as a recalculation by Excel
+or LibreOffice would.
+
+Supported:
+    - Numbers, strings, booleans and error literals
+    - Operators: + - * / ^ & % and the comparisons = <> < > <= >=
+    - Cell and range references, absolute or relative, on any sheet
+      (Sheet1!A1, 'My Sheet'!$A$1:$B$9, A:A, 1:1), and defined names that
+      refer to one
+    - Shared formulas
+    - The functions in FUNCTIONS
+
+Anything else (other functions, array formulas, table references, external
+links, circular references, ...) raises UnsupportedFormula before the
+workbook is touched, so callers can fall back to LibreOffice.
+
+Usage:
+    python formulas.py workbook.xlsx   # Evaluate and store the values in place
+"""
+
+import decimal
+import math
+import os
+import posixpath
+import re
+import sys
+import tempfile
+import zipfile
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from lxml import etree
+
+SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS = {"s": SHEET_NS}
+
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+
+ERROR_CODES = ("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A")
+
+# Binary operators and their precedence, all left-associative. Negation and
+# % bind tighter than all of them, so -2^2 is 4 as in Excel.
+BINARY_OPERATORS = {
+    "=": 1,
+    "<>": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+
+# A sheet name, optionally after the [n] index of an external workbook
+_SHEET = r"(?:'(?:[^']|'')+'|(?:\[\d+\])?[A-Za-z_][\w.]*)"
+TOKEN_RE = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<string>"(?:[^"]|"")*")
+    | (?P<error>(?:"""
+    + _SHEET
+    + r"""!)?(?P<code>\#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A)))
+    | (?P<ref>(?:(?P<sheet>"""
+    + _SHEET
+    + r""")!)?(?P<area>
+          \$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?
+          | \$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+          | \$?\d+:\$?\d+
+        ))(?![\w.(\[!])
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<structured>(?:[A-Za-z_\\][\w.]*)?\[(?:[^\[\]']|'.|\[(?:[^\[\]']|'.)*\])*\])
+    | (?P<array>\{[^{}]*\})
+    | (?P<function>[A-Za-z_][\w.]*)\s*\(
+    | (?P<name>[A-Za-z_\\][\w.]*)
+    | (?P<operator><>|<=|>=|[-+*/^&=<>%(),])
+    """,
+    re.VERBOSE,
+)
+CELL_RE = re.compile(r"(\$?)([A-Za-z]{1,3})(\$?)(\d+)")
+COLUMN_RE = re.compile(r"(\$?)([A-Za-z]{1,3})")
+ROW_RE = re.compile(r"(\$?)(\d+)")
+# The parts of a formula that change when it is copied to another cell;
+# quoted text and sheet names are matched to be skipped
+RELATIVE_RE = re.compile(
+    r"""
+    "(?:[^"]|"")*" | '(?:[^']|'')*'
+    | (?<![\w.$])(?:
+        (?P<cell>\$?[A-Za-z]{1,3}\$?\d+)
+        | (?P<columns>\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3})
+        | (?P<rows>\$?\d+:\$?\d+)
+    )(?![\w.(\[!])
+    """,
+    re.VERBOSE,
+)
+
+
+class UnsupportedFormula(Exception):
+    """The workbook uses something the evaluator does not implement."""
+
+
+class ExcelError(Exception):
+    """An Excel error value such as #DIV/0!.
+
+    Errors are raised while evaluating, so they propagate through operators
+    and functions, and stored as cell values once caught.
+    """
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+
+class Range:
+    """The values of a rectangular cell range, row by row."""
+
+    def __init__(self, rows: list[list[Any]]):
+        self.rows = rows
+
+    @property
+    def height(self) -> int:
+        return len(self.rows)
+
+    @property
+    def width(self) -> int:
+        return len(self.rows[0]) if self.rows else 0
+
+    def values(self):
+        """Iterate over all values, empty cells as None."""
+        for row in self.rows:
+            yield from row
+
+    def vector(self) -> list[Any]:
+        """The values of a one-row or one-column range."""
+        if self.height == 1:
+            return self.rows[0]
+        if self.width == 1:
+            return [row[0] for row in self.rows]
+        raise ExcelError("#N/A")
+
+
+def column_index(letters: str) -> int:
+    """Convert column letters to a 1-based index (A -> 1, AA -> 27)."""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def column_letter(index: int) -> str:
+    """Convert a 1-based column index to its letters (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+# Formula parsing
+
+
+def parse_area(area: str) -> tuple[tuple[int, int, int, int], tuple[bool, ...]]:
+    """Parse "A1", "$A$1:B2", "A:C" or "1:3".
+
+    Returns:
+        ((row1, col1, row2, col2), (abs_row1, abs_col1, abs_row2, abs_col2)),
+        with whole columns and rows spanning the full sheet
+    """
+    first, _, second = area.partition(":")
+    second = second or first
+    cells = [CELL_RE.fullmatch(part) for part in (first, second)]
+    if all(cells):
+        (c1, r1), (c2, r2) = [(m.group(2), m.group(4)) for m in cells]
+        bounds = (int(r1), column_index(c1), int(r2), column_index(c2))
+        absolute = (
+            bool(cells[0].group(3)),
+            bool(cells[0].group(1)),
+            bool(cells[1].group(3)),
+            bool(cells[1].group(1)),
+        )
+    elif all(COLUMN_RE.fullmatch(part) for part in (first, second)):
+        (a1, c1), (a2, c2) = [COLUMN_RE.fullmatch(p).groups() for p in (first, second)]
+        bounds = (1, column_index(c1), MAX_ROW, column_index(c2))
+        absolute = (True, bool(a1), True, bool(a2))
+    else:
+        (a1, r1), (a2, r2) = [ROW_RE.fullmatch(p).groups() for p in (first, second)]
+        bounds = (int(r1), 1, int(r2), MAX_COLUMN)
+        absolute = (bool(a1), True, bool(a2), True)
+    r1, c1, r2, c2 = bounds
+    # Normalize B2:A1 to A1:B2
+    if r1 > r2:
+        r1, r2 = r2, r1
+        absolute = (absolute[2], absolute[1], absolute[0], absolute[3])
+    if c1 > c2:
+        c1, c2 = c2, c1
+        absolute = (absolute[0], absolute[3], absolute[2], absolute[1])
+    return (r1, c1, r2, c2), absolute
+
+
+def tokenize(formula: str) -> list[tuple[str, Any]]:
+    """Split a formula (without its leading "=") into (kind, value) tokens."""
+    tokens = []
+    position = 0
+    while position < len(formula):
+        match = TOKEN_RE.match(formula, position)
+        if not match:
+            raise UnsupportedFormula(f"Cannot parse {formula[position:]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        if kind in ("sheet", "area"):
+            kind = "ref"
+        if kind == "ref":
+            sheet = match.group("sheet")
+            if sheet and sheet.startswith("'"):
+                sheet = sheet[1:-1].replace("''", "'")
+            tokens.append(("ref", (sheet, match.group("area"))))
+        elif kind == "string":
+            tokens.append(("string", match.group()[1:-1].replace('""', '"')))
+        elif kind == "function":
+            tokens.append(("function", match.group("function").upper()))
+        elif kind == "error":
+            # Sheet1!#REF! is what remains of a reference to deleted cells
+            tokens.append(("error", match.group("code")))
+        else:
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+class Parser:
+    """Parse formula tokens into a tree of tuples.
+
+    Nodes:
+        ("value", v): a number, string or boolean
+        ("error", code): an error literal
+        ("ref", sheet, bounds, absolute): a cell or range reference
+        ("name", NAME): a defined name, resolved by the workbook
+        ("neg", node), ("percent", node), (operator, left, right)
+        ("call", NAME, [nodes]), ("missing",): an omitted argument
+    """
+
+    def __init__(self, tokens: list[tuple[str, Any]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple[Optional[str], Any]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def take(self) -> tuple[Optional[str], Any]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        node = self.expression(0)
+        if self.position < len(self.tokens):
+            raise UnsupportedFormula(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self, min_precedence: int) -> tuple:
+        left = self.unary()
+        while True:
+            kind, value = self.peek()
+            precedence = BINARY_OPERATORS.get(value) if kind == "operator" else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.take()
+            left = (value, left, self.expression(precedence + 1))
+
+    def unary(self) -> tuple:
+        kind, value = self.peek()
+        if kind == "operator" and value in "+-":
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if value == "-" else ("plus", operand)
+        node = self.primary()
+        while self.peek() == ("operator", "%"):
+            self.take()
+            node = ("percent", node)
+        return node
+
+    def primary(self) -> tuple:
+        kind, value = self.take()
+        if kind == "number":
+            return ("value", float(value))
+        if kind == "string":
+            return ("value", value)
+        if kind == "error":
+            return ("error", value)
+        if kind == "ref":
+            sheet, area = value
+            return ("ref", sheet) + parse_area(area)
+        if kind == "name":
+            if value.upper() in ("TRUE", "FALSE"):
+                return ("value", value.upper() == "TRUE")
+            return ("name", value.upper())
+        if kind == "function":
+            return ("call", value, self.arguments())
+        if kind in ("structured", "array"):
+            raise UnsupportedFormula(f"{value} is not supported")
+        if (kind, value) == ("operator", "("):
+            node = self.expression(0)
+            if self.take() != ("operator", ")"):
+                raise UnsupportedFormula("Unbalanced parentheses")
+            return node
+        raise UnsupportedFormula(f"Unexpected {value!r}")
+
+    def arguments(self) -> list[tuple]:
+        args = []
+        if self.peek() == ("operator", ")"):
+            self.take()
+            return args
+        while True:
+            if self.peek() in (("operator", ","), ("operator", ")")):
+                args.append(("missing",))
+            else:
+                args.append(self.expression(0))
+            kind, value = self.take()
+            if value == ")":
+                return args
+            if value != ",":
+                raise UnsupportedFormula("Unbalanced parentheses")
+
+
+def parse_formula(formula: str) -> tuple:
+    """Parse a formula, with or without its leading "=", into a node tree."""
+    return Parser(tokenize(formula.lstrip("="))).parse()
+
+
+def shift_node(node: tuple, rows: int, columns: int) -> tuple:
+    """Move the relative references of a formula, as copying it would."""
+    if node[0] == "ref":
+        _, sheet, (r1, c1, r2, c2), absolute = node
+        bounds = (
+            r1 if absolute[0] else r1 + rows,
+            c1 if absolute[1] else c1 + columns,
+            r2 if absolute[2] else r2 + rows,
+            c2 if absolute[3] else c2 + columns,
+        )
+        if min(bounds) < 1 or max(bounds[0], bounds[2]) > MAX_ROW or max(
+            bounds[1], bounds[3]
+        ) > MAX_COLUMN:
+            return ("error", "#REF!")
+        return ("ref", sheet, bounds, absolute)
+    kind = node[0]
+    if kind == "call":
+        return ("call", node[1], [shift_node(arg, rows, columns) for arg in node[2]])
+    if kind in ("neg", "plus", "percent"):
+        return (kind, shift_node(node[1], rows, columns))
+    if kind in BINARY_OPERATORS:
+        return (
+            kind,
+            shift_node(node[1], rows, columns),
+            shift_node(node[2], rows, columns),
+        )
+    return node
+
+
+def relative_form(formula: str, row: int, column: int) -> str:
+    """Rewrite a formula's relative references as offsets from its cell.
+
+    Copies of a formula down a column or across a row have the same relative
+    form, so one parse serves them all through shift_node.
+    """
+
+    def offset(match: re.Match) -> str:
+        if match.lastgroup is None:
+            return match.group()
+        if match.lastgroup == "cell":
+            # The common case, without parse_area's normalization
+            column_fixed, letters, row_fixed, digits = CELL_RE.fullmatch(
+                match.group()
+            ).groups()
+            if not row_fixed:
+                digits = f"[{int(digits) - row}]"
+            if not column_fixed:
+                letters = f"[{column_index(letters) - column}]"
+            return f"\0{digits},{letters}\0"
+        (r1, c1, r2, c2), absolute = parse_area(match.group())
+        parts = [
+            str(value) if fixed else f"[{value - base}]"
+            for value, fixed, base in zip(
+                (r1, c1, r2, c2), absolute, (row, column, row, column)
+            )
+        ]
+        return "\0" + ",".join(parts) + "\0"
+
+    return RELATIVE_RE.sub(offset, formula)
+
+
+def references(node: tuple):
+    """Iterate over the ("ref", ...) and ("name", ...) nodes of a formula."""
+    if node[0] in ("ref", "name"):
+        yield node
+    elif node[0] == "call":
+        for arg in node[2]:
+            yield from references(arg)
+    else:
+        for part in node[1:]:
+            if isinstance(part, tuple):
+                yield from references(part)
+
+
+# Value coercion, as Excel does it
+
+
+class Missing:
+    """An argument left empty, as in VLOOKUP(x,A1:B9,2,), which reads as 0 or FALSE.
+
+    Omitted trailing arguments are not passed at all, so functions still
+    apply their defaults to them.
+    """
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = Missing()
+
+# Text Excel converts to a number: digits with optional thousands
+# separators, a fraction, an exponent and a percent sign
+NUMERIC_TEXT_RE = re.compile(
+    r"\s*([+-]?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)(%?)\s*"
+)
+
+
+def to_number(value: Any) -> float:
+    if isinstance(value, ExcelError):
+        raise value
+    if value is None or value is MISSING:
+        return 0.0
+    if isinstance(value, (bool, int)):
+        return float(value)
+    if isinstance(value, float):
+        return value
+    if isinstance(value, str):
+        match = NUMERIC_TEXT_RE.fullmatch(value)
+        if not match:
+            raise ExcelError("#VALUE!")
+        number = float(match.group(1).replace(",", ""))
+        if match.group(2):
+            number /= 100
+        if math.isinf(number):
+            raise ExcelError("#VALUE!")
+        return number
+    raise ExcelError("#VALUE!")
+
+
+def to_bool(value: Any) -> bool:
+    if isinstance(value, ExcelError):
+        raise value
+    if value is MISSING:
+        return False
+    if isinstance(value, str):
+        if value.upper() in ("TRUE", "FALSE"):
+            return value.upper() == "TRUE"
+        raise ExcelError("#VALUE!")
+    return bool(value)
+
+
+def to_text(value: Any) -> str:
+    if isinstance(value, ExcelError):
+        raise value
+    if value is None or value is MISSING:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return format_number(value, 15)
+    return value
+
+
+def format_number(value: float, digits: int = 17) -> str:
+    """Format a number as Excel writes it: integers without a decimal point."""
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.{digits}g}".upper()
+
+
+def checked(value: float) -> float:
+    if math.isnan(value) or math.isinf(value):
+        raise ExcelError("#NUM!")
+    return value
+
+
+def compare(left: Any, right: Any) -> int:
+    """Compare like Excel: numbers < text < booleans, text ignoring case."""
+    if isinstance(left, ExcelError):
+        raise left
+    if isinstance(right, ExcelError):
+        raise right
+    # An empty cell compares as the empty value of the other side's type
+    if left is None:
+        left = type(right)() if right is not None else 0.0
+    if right is None:
+        right = type(left)()
+    ranks = [
+        2 if isinstance(value, bool) else 1 if isinstance(value, str) else 0
+        for value in (left, right)
+    ]
+    if ranks[0] != ranks[1]:
+        return -1 if ranks[0] < ranks[1] else 1
+    if ranks[0] == 1:
+        left, right = left.casefold(), right.casefold()
+    return (left > right) - (left < right)
+
+
+def round_half_away(value: float, digits: float, rounding: str) -> float:
+    """Round to a number of decimal digits; negative digits round left of the point."""
+    # Beyond 340 digits either way every float rounds to itself or to 0, and
+    # the precision holds the up to 309 + 340 digits of the rounded value
+    digits = max(min(int(digits), 340), -340)
+    context = decimal.Context(prec=700)
+    quantum = decimal.Decimal(1).scaleb(-digits, context)
+    rounded = decimal.Decimal(repr(value)).quantize(quantum, rounding, context)
+    return checked(float(rounded))
+
+
+# Functions
+
+
+def numbers(args: list[Any]):
+    """The numbers SUM, AVERAGE, MIN and MAX use.
+
+    Ranges contribute only their numbers; direct arguments are converted.
+    """
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg.values():
+                if isinstance(value, ExcelError):
+                    raise value
+                if isinstance(value, float):
+                    yield value
+        elif arg is not None:
+            yield to_number(arg)
+
+
+def function_sum(args):
+    return math.fsum(numbers(args))
+
+
+def function_average(args):
+    values = list(numbers(args))
+    if not values:
+        raise ExcelError("#DIV/0!")
+    return math.fsum(values) / len(values)
+
+
+def function_min(args):
+    return min(numbers(args), default=0.0)
+
+
+def function_max(args):
+    return max(numbers(args), default=0.0)
+
+
+def function_count(args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg.values() if isinstance(value, float))
+        elif arg is not None:
+            try:
+                to_number(arg)
+                count += 1
+            except ExcelError:
+                pass
+    return float(count)
+
+
+def function_counta(args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg.values() if value is not None)
+        elif arg is not None:
+            count += 1
+    return float(count)
+
+
+def function_and(args, combine=all):
+    values = []
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg.values():
+                if isinstance(value, ExcelError):
+                    raise value
+                if isinstance(value, (bool, float)):
+                    values.append(bool(value))
+        elif arg is not None:
+            values.append(to_bool(arg))
+    if not values:
+        raise ExcelError("#VALUE!")
+    return combine(values)
+
+
+def function_or(args):
+    return function_and(args, any)
+
+
+def function_not(value):
+    return not to_bool(value)
+
+
+def function_abs(value):
+    return abs(to_number(value))
+
+
+def function_round(value, digits, rounding=decimal.ROUND_HALF_UP):
+    return round_half_away(to_number(value), to_number(digits), rounding)
+
+
+def function_roundup(value, digits):
+    return function_round(value, digits, decimal.ROUND_UP)
+
+
+def function_rounddown(value, digits):
+    return function_round(value, digits, decimal.ROUND_DOWN)
+
+
+def wildcard_pattern(text: str) -> re.Pattern:
+    """Convert an Excel lookup pattern with * ? and ~ escapes to a regex."""
+    pattern = ""
+    escaped = False
+    for char in text:
+        if escaped:
+            pattern += re.escape(char)
+            escaped = False
+        elif char == "~":
+            escaped = True
+        elif char == "*":
+            pattern += ".*"
+        elif char == "?":
+            pattern += "."
+        else:
+            pattern += re.escape(char)
+    return re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+
+def lookup_position(value: Any, candidates: list[Any], match_type: float) -> int:
+    """The 0-based position MATCH, VLOOKUP and HLOOKUP find.
+
+    match_type 0 finds the first equal value (with wildcards for text), 1
+    the last value not greater than value in ascending data, and -1 the last
+    value not smaller than it in descending data.
+
+    Raises:
+        ExcelError: #N/A if nothing matches
+    """
+    if isinstance(value, ExcelError):
+        raise value
+    if value is None or value is MISSING:
+        value = 0.0
+    kind = type(value)
+    found = None
+    if match_type == 0:
+        pattern = wildcard_pattern(value) if isinstance(value, str) else None
+        for i, candidate in enumerate(candidates):
+            if pattern is not None:
+                if isinstance(candidate, str) and pattern.fullmatch(candidate):
+                    return i
+            elif type(candidate) is kind and compare(candidate, value) == 0:
+                return i
+    else:
+        for i, candidate in enumerate(candidates):
+            if type(candidate) is not kind:
+                continue
+            order = compare(candidate, value)
+            if order == 0 or (order < 0) == (match_type > 0):
+                found = i
+            else:
+                break
+    if found is None:
+        raise ExcelError("#N/A")
+    return found
+
+
+def lookup_result(value: Any) -> Any:
+    # Lookups return empty cells as 0, not as empty
+    return 0.0 if value is None else value
+
+
+def function_match(value, lookup_range, match_type=1.0):
+    if not isinstance(lookup_range, Range):
+        raise UnsupportedFormula("MATCH needs a range")
+    match_type = to_number(match_type)
+    return float(lookup_position(value, lookup_range.vector(), match_type) + 1)
+
+
+def function_vlookup(value, table, index, approximate=True, transpose=False):
+    if not isinstance(table, Range):
+        raise UnsupportedFormula("VLOOKUP and HLOOKUP need a range")
+    rows = [list(column) for column in zip(*table.rows)] if transpose else table.rows
+    index = int(to_number(index))
+    if index < 1:
+        raise ExcelError("#VALUE!")
+    if not rows or index > len(rows[0]):
+        raise ExcelError("#REF!")
+    match_type = 1.0 if to_bool(approximate) else 0.0
+    position = lookup_position(value, [row[0] for row in rows], match_type)
+    return lookup_result(rows[position][index - 1])
+
+
+def function_hlookup(value, table, index, approximate=True):
+    return function_vlookup(value, table, index, approximate, transpose=True)
+
+
+def function_index(table, row, column=None):
+    if not isinstance(table, Range):
+        raise UnsupportedFormula("INDEX needs a range")
+    row = int(to_number(row))
+    if column is None:
+        # INDEX(row_range, n) picks along the row
+        if table.height == 1:
+            row, column = 1, row
+        elif table.width == 1:
+            column = 1
+        else:
+            raise UnsupportedFormula("INDEX without a column returns an array")
+    column = int(to_number(column))
+    if row == 0 or column == 0:
+        raise UnsupportedFormula("INDEX with row or column 0 returns an array")
+    if row < 0 or column < 0:
+        raise ExcelError("#VALUE!")
+    if row > table.height or column > table.width:
+        raise ExcelError("#REF!")
+    return lookup_result(table.rows[row - 1][column - 1])
+
+
+# Name -> (function, minimum and maximum argument count, whether it takes the
+# argument list as one list). IF and IFERROR are evaluated lazily instead.
+FUNCTIONS: dict[str, tuple[Callable, int, int, bool]] = {
+    "SUM": (function_sum, 1, 255, True),
+    "AVERAGE": (function_average, 1, 255, True),
+    "MIN": (function_min, 1, 255, True),
+    "MAX": (function_max, 1, 255, True),
+    "COUNT": (function_count, 1, 255, True),
+    "COUNTA": (function_counta, 1, 255, True),
+    "AND": (function_and, 1, 255, True),
+    "OR": (function_or, 1, 255, True),
+    "NOT": (function_not, 1, 1, False),
+    "ABS": (function_abs, 1, 1, False),
+    "ROUND": (function_round, 2, 2, False),
+    "ROUNDUP": (function_roundup, 2, 2, False),
+    "ROUNDDOWN": (function_rounddown, 2, 2, False),
+    "VLOOKUP": (function_vlookup, 3, 4, False),
+    "HLOOKUP": (function_hlookup, 3, 4, False),
+    "INDEX": (function_index, 2, 3, False),
+    "MATCH": (function_match, 2, 3, False),
+}
+LAZY_FUNCTIONS = {"IF": (2, 3), "IFERROR": (2, 2)}
+# Positions of the arguments that are ranges rather than values
+RANGE_ARGUMENTS = {"VLOOKUP": (1,), "HLOOKUP": (1,), "INDEX": (0,), "MATCH": (1,)}
+
+
+# Workbooks
+
+
+def cell_value(cell: etree._Element, shared_strings: list[str]) -> Any:
+    """The cached value of a <c> element."""
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(cell.xpath("s:is//s:t/text()", namespaces=NS))
+    text = cell.findtext(f"{{{SHEET_NS}}}v")
+    if text is None:
+        return None
+    if kind == "s":
+        return shared_strings[int(text)]
+    if kind == "str":
+        return text
+    if kind == "b":
+        return text == "1"
+    if kind == "e":
+        return ExcelError(text)
+    if kind == "d":
+        raise UnsupportedFormula("ISO 8601 date cells are not supported")
+    # openpyxl writes formula cells with an empty value
+    return float(text) if text else None
+
+
+class FormulaWorkbook:
+    """The cells of an xlsx workbook, with its formulas parsed.
+
+    Cells are keyed by (sheet index, row, column). Constants hold their
+    values; formula cells hold their cached values until evaluate() replaces
+    them.
+    """
+
+    def __init__(self, path: Path | str):
+        """Read all sheets of the workbook.
+
+        Raises:
+            UnsupportedFormula: If a formula cannot be evaluated here
+        """
+        self.path = Path(path)
+        self.values: dict[tuple[int, int, int], Any] = {}
+        self.formulas: dict[tuple[int, int, int], tuple] = {}
+        self.sheet_names: list[str] = []
+        self.sheet_parts: list[str] = []
+        self.trees: list[etree._ElementTree] = []
+        self.formula_elements: dict[tuple[int, int, int], etree._Element] = {}
+        # (sheet index or None for global, NAME) -> reference node
+        self.names: dict[tuple[Optional[int], str], tuple] = {}
+        # Relative form -> (row, column, parsed formula) of its first cell
+        self._parsed: dict[str, tuple[int, int, tuple]] = {}
+
+        with zipfile.ZipFile(self.path) as archive:
+            self._read_workbook(archive)
+            shared_strings = self._read_shared_strings(archive)
+            for index, part in enumerate(self.sheet_parts):
+                tree = etree.parse(archive.open(part))
+                self.trees.append(tree)
+                self._read_sheet(index, tree, shared_strings)
+        self.sheet_indices = {
+            name.casefold(): i for i, name in enumerate(self.sheet_names)
+        }
+        self._index_formula_cells()
+
+    def _read_workbook(self, archive: zipfile.ZipFile) -> None:
+        workbook = etree.fromstring(archive.read("xl/workbook.xml"))
+        rels = etree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = target
+        for sheet in workbook.iter(f"{{{SHEET_NS}}}sheet"):
+            target = targets.get(sheet.get(f"{{{REL_NS}}}id"))
+            if not target or not target.startswith("xl/worksheets/"):
+                name = sheet.get("name")
+                raise UnsupportedFormula(f"Sheet {name} is not a worksheet")
+            self.sheet_names.append(sheet.get("name"))
+            self.sheet_parts.append(target)
+        self._defined_names = [
+            (name.get("name"), name.get("localSheetId"), name.text or "")
+            for name in workbook.iter(f"{{{SHEET_NS}}}definedName")
+        ]
+        if workbook.find(f"{{{SHEET_NS}}}externalReferences") is not None:
+            raise UnsupportedFormula("The workbook links to other workbooks")
+
+    def _read_shared_strings(self, archive: zipfile.ZipFile) -> list[str]:
+        if "xl/sharedStrings.xml" not in archive.namelist():
+            return []
+        root = etree.fromstring(archive.read("xl/sharedStrings.xml"))
+        return [
+            "".join(item.xpath(".//s:t[not(ancestor::s:rPh)]/text()", namespaces=NS))
+            for item in root.iterfind("s:si", NS)
+        ]
+
+    def _read_sheet(
+        self, index: int, tree: etree._ElementTree, shared_strings: list[str]
+    ) -> None:
+        # Shared formula index -> (master row, master column, parsed formula)
+        shared: dict[str, tuple[int, int, tuple]] = {}
+        for row, column, cell in iter_cells(tree):
+            key = (index, row, column)
+            value = cell_value(cell, shared_strings)
+            if value is not None:
+                self.values[key] = value
+            formula = cell.find(f"{{{SHEET_NS}}}f")
+            if formula is None:
+                continue
+            self.formula_elements[key] = formula
+            kind = formula.get("t", "normal")
+            try:
+                if kind == "normal":
+                    self.formulas[key] = self._parse(formula.text or "", row, column)
+                elif kind == "shared" and formula.text:
+                    node = self._parse(formula.text, row, column)
+                    shared[formula.get("si")] = (row, column, node)
+                    self.formulas[key] = node
+                elif kind == "shared" and formula.get("si") in shared:
+                    master_row, master_column, node = shared[formula.get("si")]
+                    self.formulas[key] = shift_node(
+                        node, row - master_row, column - master_column
+                    )
+                else:
+                    raise UnsupportedFormula(f"{kind} formulas are not supported")
+            except UnsupportedFormula as e:
+                raise UnsupportedFormula(f"{self.location(key)}: {e}") from None
+
+    def _parse(self, formula: str, row: int, column: int) -> tuple:
+        """Parse a formula, reusing the parse of an earlier copy of it."""
+        template = relative_form(formula, row, column)
+        parsed = self._parsed.get(template)
+        if parsed is None:
+            node = parse_formula(formula)
+            self._parsed[template] = (row, column, node)
+            return node
+        first_row, first_column, node = parsed
+        return shift_node(node, row - first_row, column - first_column)
+
+    def _index_formula_cells(self) -> None:
+        # Sheet, column -> sorted rows of formula cells, to find the ones in a range
+        columns: dict[tuple[int, int], list[int]] = {}
+        for sheet, row, column in self.formulas:
+            columns.setdefault((sheet, column), []).append(row)
+        for rows in columns.values():
+            rows.sort()
+        self.formula_columns = columns
+        # Used area per sheet, so whole-column references stay small
+        self.extent: dict[int, tuple[int, int]] = {}
+        for sheet, row, column in self.values.keys() | self.formulas.keys():
+            rows, columns_used = self.extent.get(sheet, (0, 0))
+            self.extent[sheet] = (max(rows, row), max(columns_used, column))
+
+    def sheet_index(self, name: Optional[str], current: int) -> int:
+        if name is None:
+            return current
+        index = self.sheet_indices.get(name.casefold())
+        if index is None:
+            raise ExcelError("#REF!")
+        return index
+
+    def resolve_name(self, name: str, sheet: int) -> tuple:
+        """The reference node a defined name stands for."""
+        if not self.names and self._defined_names:
+            for defined, local, text in self._defined_names:
+                try:
+                    node = parse_formula(text)
+                except UnsupportedFormula:
+                    node = None
+                scope = int(local) if local is not None else None
+                self.names[(scope, defined.upper())] = node
+        node = self.names.get((sheet, name), self.names.get((None, name), False))
+        if node is False:
+            raise ExcelError("#NAME?")
+        if node is None or node[0] != "ref":
+            raise UnsupportedFormula(f"Defined name {name} is not a plain reference")
+        return node
+
+    def dependencies(self, key: tuple[int, int, int]):
+        """The formula cells a formula cell refers to."""
+        sheet = key[0]
+        for node in references(self.formulas[key]):
+            if node[0] == "name":
+                try:
+                    node = self.resolve_name(node[1], sheet)
+                except ExcelError:
+                    continue
+            try:
+                target = self.sheet_index(node[1], sheet)
+            except ExcelError:
+                continue
+            r1, c1, r2, c2 = node[2]
+            for column in range(c1, min(c2, MAX_COLUMN) + 1):
+                rows = self.formula_columns.get((target, column))
+                if rows:
+                    for row in rows[bisect_left(rows, r1) : bisect_right(rows, r2)]:
+                        yield (target, row, column)
+
+    def evaluation_order(self) -> list[tuple[int, int, int]]:
+        """The formula cells, each after the formula cells it refers to.
+
+        Raises:
+            UnsupportedFormula: On a circular reference
+        """
+        order = []
+        state: dict[tuple[int, int, int], int] = {}  # 1 visiting, 2 done
+        for start in self.formulas:
+            if start in state:
+                continue
+            state[start] = 1
+            stack = [(start, self.dependencies(start))]
+            while stack:
+                key, pending = stack[-1]
+                for dependency in pending:
+                    if state.get(dependency) == 1:
+                        raise UnsupportedFormula(
+                            f"Circular reference at {self.location(dependency)}"
+                        )
+                    if dependency not in state:
+                        state[dependency] = 1
+                        stack.append((dependency, self.dependencies(dependency)))
+                        break
+                else:
+                    stack.pop()
+                    state[key] = 2
+                    order.append(key)
+        return order
+
+    def location(self, key: tuple[int, int, int]) -> str:
+        sheet, row, column = key
+        return f"{self.sheet_names[sheet]}!{column_letter(column)}{row}"
+
+    def evaluate(self) -> int:
+        """Evaluate every formula, replacing the cached values.
+
+        Returns:
+            The number of formulas evaluated
+
+        Raises:
+            UnsupportedFormula: If a formula cannot be evaluated here
+        """
+        for key in self.evaluation_order():
+            try:
+                value = self.evaluate_node(self.formulas[key], key[0])
+                if isinstance(value, Range):
+                    value = self.single_value(value)
+                if isinstance(value, float):
+                    # A cached value of inf or nan makes the file unreadable
+                    value = checked(value)
+            except ExcelError as e:
+                value = e
+            except UnsupportedFormula as e:
+                raise UnsupportedFormula(f"{self.location(key)}: {e}") from None
+            except ArithmeticError:
+                value = ExcelError("#NUM!")
+            self.values[key] = 0.0 if value is None else value
+        return len(self.formulas)
+
+    def range_values(self, node: tuple, sheet: int) -> Range:
+        target = self.sheet_index(node[1], sheet)
+        r1, c1, r2, c2 = node[2]
+        max_row, max_column = self.extent.get(target, (0, 0))
+        # Cells beyond the used area are empty; keep the range's shape
+        # unless it spans whole rows or columns
+        if r2 == MAX_ROW:
+            r2 = max(min(r2, max_row), r1)
+        if c2 == MAX_COLUMN:
+            c2 = max(min(c2, max_column), c1)
+        values = self.values
+        return Range(
+            [
+                [values.get((target, row, column)) for column in range(c1, c2 + 1)]
+                for row in range(r1, r2 + 1)
+            ]
+        )
+
+    def single_value(self, value: Range) -> Any:
+        if value.height == 1 and value.width == 1:
+            cell = value.rows[0][0]
+            if isinstance(cell, ExcelError):
+                raise cell
+            return cell
+        raise UnsupportedFormula("Implicit intersection of a range")
+
+    def evaluate_argument(self, node: tuple, sheet: int) -> Any:
+        """Evaluate a function argument, keeping references as ranges."""
+        if node[0] == "name":
+            node = self.resolve_name(node[1], sheet)
+        if node[0] == "ref":
+            return self.range_values(node, sheet)
+        if node[0] == "missing":
+            return MISSING
+        return self.evaluate_node(node, sheet)
+
+    def evaluate_node(self, node: tuple, sheet: int) -> Any:
+        """Evaluate a node to a single value.
+
+        Raises:
+            ExcelError: If the result is an error value
+        """
+        kind = node[0]
+        if kind == "value":
+            return node[1]
+        if kind == "error":
+            raise ExcelError(node[1])
+        if kind in ("ref", "name"):
+            return self.single_value(self.evaluate_argument(node, sheet))
+        if kind == "missing":
+            return None
+        if kind == "neg":
+            return -to_number(self.evaluate_node(node[1], sheet))
+        if kind == "plus":
+            return self.evaluate_node(node[1], sheet)
+        if kind == "percent":
+            return to_number(self.evaluate_node(node[1], sheet)) / 100
+        if kind == "call":
+            return self.call(node[1], node[2], sheet)
+
+        left = self.evaluate_node(node[1], sheet)
+        right = self.evaluate_node(node[2], sheet)
+        if kind == "&":
+            return to_text(left) + to_text(right)
+        if kind in ("=", "<>", "<", ">", "<=", ">="):
+            order = compare(left, right)
+            return {
+                "=": order == 0,
+                "<>": order != 0,
+                "<": order < 0,
+                ">": order > 0,
+                "<=": order <= 0,
+                ">=": order >= 0,
+            }[kind]
+        left, right = to_number(left), to_number(right)
+        if kind == "+":
+            return checked(left + right)
+        if kind == "-":
+            return checked(left - right)
+        if kind == "*":
+            return checked(left * right)
+        if kind == "/":
+            if right == 0:
+                raise ExcelError("#DIV/0!")
+            return checked(left / right)
+        if left == 0 and right <= 0:
+            raise ExcelError("#NUM!" if right == 0 else "#DIV/0!")
+        result = left**right
+        if isinstance(result, complex):
+            raise ExcelError("#NUM!")
+        return checked(result)
+
+    def call(self, name: str, args: list[tuple], sheet: int) -> Any:
+        if name in LAZY_FUNCTIONS:
+            low, high = LAZY_FUNCTIONS[name]
+            if not low <= len(args) <= high:
+                raise UnsupportedFormula(f"Wrong number of arguments to {name}")
+            if name == "IFERROR":
+                try:
+                    return self.evaluate_node(args[0], sheet)
+                except ExcelError:
+                    return self.evaluate_node(args[1], sheet)
+            if to_bool(self.evaluate_node(args[0], sheet)):
+                return self.evaluate_node(args[1], sheet)
+            if len(args) == 3:
+                return self.evaluate_node(args[2], sheet)
+            return False
+
+        if name not in FUNCTIONS:
+            raise UnsupportedFormula(f"Function {name} is not supported")
+        function, low, high, takes_list = FUNCTIONS[name]
+        if not low <= len(args) <= high:
+            raise UnsupportedFormula(f"Wrong number of arguments to {name}")
+        values = [self.evaluate_argument(arg, sheet) for arg in args]
+        if takes_list:
+            return function([None if value is MISSING else value for value in values])
+        # Other arguments than lookup tables take the value of a reference
+        tables = RANGE_ARGUMENTS.get(name, ())
+        values = [
+            self.single_value(value)
+            if isinstance(value, Range) and i not in tables
+            else value
+            for i, value in enumerate(values)
+        ]
+        return function(*values)
+
+    def save(self, path: Optional[Path | str] = None) -> None:
+        """Store the evaluated values as the formula cells' cached values."""
+        for key, formula in self.formula_elements.items():
+            set_cached_value(formula, self.values[key])
+
+        path = Path(path or self.path)
+        with zipfile.ZipFile(self.path) as source:
+            replaced = {
+                part: etree.tostring(
+                    tree, xml_declaration=True, encoding="UTF-8", standalone=True
+                )
+                for part, tree in zip(self.sheet_parts, self.trees)
+            }
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".xlsx")
+            os.close(fd)
+            try:
+                with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as target:
+                    for info in source.infolist():
+                        data = replaced.get(info.filename)
+                        if data is None:
+                            data = source.read(info)
+                        target.writestr(info, data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+
+def iter_cells(tree: etree._ElementTree):
+    """Iterate over (row, column, <c> element) of a worksheet."""
+    row_number = 0
+    for row in tree.getroot().iterfind("s:sheetData/s:row", NS):
+        # The r attributes are optional; rows and cells then follow on
+        row_number = int(row.get("r") or row_number + 1)
+        column = 0
+        for cell in row.iterfind("s:c", NS):
+            reference = cell.get("r")
+            if reference:
+                column = column_index(CELL_RE.fullmatch(reference).group(2))
+            else:
+                column += 1
+            yield row_number, column, cell
+
+
+def set_cached_value(formula: etree._Element, value: Any) -> None:
+    """Replace the cached value of the cell of an <f> element."""
+    cell = formula.getparent()
+    if isinstance(value, bool):
+        kind, text = "b", "1" if value else "0"
+    elif isinstance(value, float):
+        kind, text = None, format_number(value)
+    elif isinstance(value, ExcelError):
+        kind, text = "e", value.code
+    else:
+        kind, text = "str", value
+    if kind:
+        cell.set("t", kind)
+    elif "t" in cell.attrib:
+        del cell.attrib["t"]
+    v = formula.getnext()
+    if v is None or v.tag != f"{{{SHEET_NS}}}v":
+        v = etree.Element(f"{{{SHEET_NS}}}v")
+        formula.addnext(v)
+    v.text = text
+
+
+def evaluate_workbook(path: Path | str) -> int:
+    """Evaluate all formulas of a workbook and store the values in place.
+
+    Returns:
+        The number of formulas evaluated
+
+    Raises:
+        UnsupportedFormula: If a formula cannot be evaluated here; the file
+            is left unchanged
+    """
+    workbook = FormulaWorkbook(path)
+    count = workbook.evaluate()
+    workbook.save()
+    return count
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python formulas.py <excel_file>")
+        print("\nEvaluates all formulas in Python and stores their values in the file")
+        sys.exit(1)
+    try:
+        count = evaluate_workbook(sys.argv[1])
+    except UnsupportedFormula as e:
+        print(f"Unsupported: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(f"Evaluated {count} formulas")
+
+
+if __name__ == "__main__":
+    main()
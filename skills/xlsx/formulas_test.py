@@ -0,0 +1,214 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "openpyxl>=3.1.0",
+#   "lxml>=4.9.0",
+# ]
+# ///
+
+import re
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from formulas import UnsupportedFormula, evaluate_workbook, parse_formula
+from openpyxl import Workbook, load_workbook
+
+
+class TestParseFormula(unittest.TestCase):
+    def test_precedence(self):
+        # Negation binds tighter than ^, which binds tighter than * and +
+        self.assertEqual(
+            parse_formula("=-2^2+3*4"),
+            (
+                "+",
+                ("^", ("neg", ("value", 2.0)), ("value", 2.0)),
+                ("*", ("value", 3.0), ("value", 4.0)),
+            ),
+        )
+
+    def test_references(self):
+        self.assertEqual(
+            parse_formula("='My ''Q1'' Sheet'!$A$1:b2"),
+            ("ref", "My 'Q1' Sheet", (1, 1, 2, 2), (True, True, False, False)),
+        )
+        self.assertEqual(parse_formula("C:C")[2], (1, 3, 1048576, 3))
+
+    def test_unparseable(self):
+        with self.assertRaises(UnsupportedFormula):
+            parse_formula("=SUM(Table1[Amount])")
+
+
+class TestEvaluateWorkbook(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name) / "book.xlsx"
+
+    def evaluate(self, cells, sheets=None):
+        """Save cells {"A1": value} on sheet Data (and sheets {name: cells}),
+        evaluate the workbook and return its Data sheet with cached values."""
+        wb = Workbook()
+        wb.active.title = "Data"
+        for name, sheet_cells in [("Data", cells)] + list((sheets or {}).items()):
+            ws = wb[name] if name in wb.sheetnames else wb.create_sheet(name)
+            for coordinate, value in sheet_cells.items():
+                ws[coordinate] = value
+        wb.save(self.path)
+        evaluate_workbook(self.path)
+        return load_workbook(self.path, data_only=True)["Data"]
+
+    def test_arithmetic_and_text(self):
+        ws = self.evaluate(
+            {
+                "A1": 3,
+                "A2": "4",
+                "B1": "=A1+A2*2",
+                "B2": "=-2^2",
+                "B3": "=50%",
+                "B4": '=A1&" apples"',
+                "B5": "=A1/(A2-4)",
+                "B6": "=A9+1",
+                "B7": '=A1>"2"',
+            }
+        )
+        self.assertEqual(
+            [ws[f"B{row}"].value for row in range(1, 8)],
+            [11, 4, 0.5, "3 apples", "#DIV/0!", 1, False],
+        )
+
+    def test_functions(self):
+        ws = self.evaluate(
+            {
+                "A1": 1.5,
+                "A2": "text",
+                "A3": 2.5,
+                "B1": "=SUM(A1:A3)",
+                "B2": "=AVERAGE(A:A)",
+                "B3": "=ROUND(2.5,0)+ROUND(-2.5,0)+ROUNDDOWN(1.99,1)",
+                "B4": '=IF(B1>3,"big","small")',
+                "B5": "=IFERROR(1/0,-1)",
+                "B6": "=COUNT(A1:A3)+COUNTA(A1:A3)",
+                "B7": "=AND(A1>1,OR(A3<1,TRUE))",
+                "B8": "=MAX(A1:A3,7)-MIN(A1:A3)",
+            }
+        )
+        self.assertEqual(
+            [ws[f"B{row}"].value for row in range(1, 9)],
+            [4, 2, 1.9, "big", -1, 5, True, 5.5],
+        )
+
+    def test_overflow_and_numeric_text(self):
+        ws = self.evaluate(
+            {
+                "A1": "=1E308+1E308",
+                "A2": "=-1E308-1E308",
+                "A3": '="inf"+1',
+                "A4": '="nan"+1',
+                "A5": '="1_0"+1',
+                "A6": '="1E400"+1',
+                "A7": '=" 1,000.5 "+"50%"',
+                "A8": "=SUM(1E308,1E308)",
+                "A9": "=ROUND(1E30,2)",
+                "A10": "=ROUND(1.7976931348623157E308,-308)",
+            }
+        )
+        self.assertEqual(
+            [ws[f"A{row}"].value for row in range(1, 11)],
+            [
+                "#NUM!",
+                "#NUM!",
+                "#VALUE!",
+                "#VALUE!",
+                "#VALUE!",
+                "#VALUE!",
+                1001,
+                "#NUM!",
+                1e30,
+                "#NUM!",
+            ],
+        )
+
+    def test_empty_arguments(self):
+        ws = self.evaluate(
+            {
+                "A1": 1,
+                "A2": 2,
+                "A3": 3,
+                "B1": "x",
+                "B2": "y",
+                "B3": "z",
+                "C1": "=VLOOKUP(2.5,A1:B3,2,)",
+                "C2": "=VLOOKUP(2.5,A1:B3,2)",
+                "C3": "=VLOOKUP(2,A1:B3,2,)",
+                "C4": "=MATCH(2.5,A1:A3,)",
+                "C5": "=SUM(1,,2)",
+            }
+        )
+        self.assertEqual(
+            [ws[f"C{row}"].value for row in range(1, 6)], ["#N/A", "y", "y", "#N/A", 3]
+        )
+
+    def test_lookups_across_sheets(self):
+        prices = {"A1": "apple", "B1": 1.5, "A2": "Banana", "B2": 2.25}
+        prices.update({"A3": "cherry", "B3": 3})
+        ws = self.evaluate(
+            {
+                "A1": '=VLOOKUP("banana",Prices!A1:B3,2,FALSE)',
+                "A2": "=INDEX(Prices!B1:B3,MATCH(\"ch*\",Prices!A1:A3,0))",
+                "A3": "=MATCH(2.5,Prices!B1:B3)",
+                "A4": "=VLOOKUP(\"kiwi\",Prices!A1:B3,2,FALSE)",
+                "A5": "=HLOOKUP(1,Prices!B1:B3,2,FALSE)",
+            },
+            {"Prices": prices},
+        )
+        self.assertEqual(
+            [ws[f"A{row}"].value for row in range(1, 6)], [2.25, 3, 2, "#N/A", "#N/A"]
+        )
+
+    def test_dependency_order(self):
+        # Each formula refers to cells evaluated later in sheet order
+        ws = self.evaluate(
+            {"A1": "=Calc!A1*2", "A2": "=A3+1", "A3": 5}, {"Calc": {"A1": "=Data!A2"}}
+        )
+        self.assertEqual(ws["A1"].value, 12)
+
+    def test_shared_formulas(self):
+        wb = Workbook()
+        ws = wb.active
+        for row in range(1, 4):
+            ws[f"A{row}"] = row
+            ws[f"B{row}"] = f"=A{row}*$A$1*10"
+        wb.save(self.path)
+        with zipfile.ZipFile(self.path) as archive:
+            parts = {name: archive.read(name) for name in archive.namelist()}
+        sheet = parts["xl/worksheets/sheet1.xml"].decode()
+        sheet = sheet.replace(
+            "<f>A1*$A$1*10</f>", '<f t="shared" ref="B1:B3" si="0">A1*$A$1*10</f>'
+        )
+        sheet = re.sub(r"<f>A[23]\*\$A\$1\*10</f>", '<f t="shared" si="0"/>', sheet)
+        parts["xl/worksheets/sheet1.xml"] = sheet.encode()
+        with zipfile.ZipFile(self.path, "w") as archive:
+            for name, data in parts.items():
+                archive.writestr(name, data)
+
+        evaluate_workbook(self.path)
+        ws = load_workbook(self.path, data_only=True).active
+        self.assertEqual([ws[f"B{row}"].value for row in range(1, 4)], [10, 20, 30])
+
+    def test_unsupported_leaves_file_unchanged(self):
+        for formula in ("=OFFSET(A1,1,1)", "=B1+1"):
+            with self.subTest(formula=formula):
+                wb = Workbook()
+                wb.active["A1"] = "=B1"
+                wb.active["B1"] = formula
+                wb.save(self.path)
+                before = self.path.read_bytes()
+                with self.assertRaises(UnsupportedFormula):
+                    evaluate_workbook(self.path)
+                self.assertEqual(self.path.read_bytes(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,16 @@
 #!/usr/bin/env -S uv run
 # /// script
 # dependencies = [
-#   "openpyxl>=3.1.0",
+#   "lxml>=4.9.0",
 # ]
 # ///
 """
 Excel Formula Recalculation Script
-Recalculates all formulas in an Excel file using LibreOffice
+Recalculates all formulas in an Excel file, in Python when formulas.py
+supports all of them and otherwise using LibreOffice
+
+With --batch, recalculates every file of a list in one LibreOffice session
+and prints one JSON line per file
 """
 
 import json
@@ -14,9 +18,121 @@ import sys
 import subprocess
 import os
 import platform
+import posixpath
 import shutil
+import tempfile
+import time
+import zipfile
 from pathlib import Path
-from openpyxl import load_workbook
+from xml.etree import ElementTree
+
+# Recalculation runs on the shared LibreOffice pool when one is started
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+from libreoffice import ConversionError, pool_available, recalculate_document
+from formulas import UnsupportedFormula, evaluate_workbook
+
+
+SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+EXCEL_ERRORS = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
+
+LIBREOFFICE_MISSING = 'LibreOffice not installed. Install with: brew install libreoffice'
+
+MACRO_URL = 'vnd.sun.star.script:Standard.Module1.{}?language=Basic&location=application'
+
+
+def worksheet_parts(archive):
+    """Return (sheet name, part name) for each worksheet in workbook order"""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{{{PKG_REL_NS}}}Relationship'):
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join('xl', target))
+        targets[rel.get('Id')] = target
+    
+    parts = []
+    for sheet in workbook.iter(f'{{{SHEET_NS}}}sheet'):
+        target = targets.get(sheet.get(f'{{{REL_NS}}}id'))
+        # Chartsheets and dialog sheets have no cells to scan
+        if target and target.startswith('xl/worksheets/') and target in archive.namelist():
+            parts.append((sheet.get('name'), target))
+    return parts
+
+
+def column_letter(index):
+    """Convert a 1-based column index to its letters (1 -> A, 27 -> AA)"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_index(reference):
+    """Convert the column of a cell reference to its 1-based index (AA1 -> 27)"""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index
+
+
+def scan_workbook(filename):
+    """Find error values and count formulas in one streaming pass over the sheets
+    
+    Reads the sheet XML directly: cells with t="e" hold an error as their cached
+    value and every <f> element is a formula. Rows are discarded once read so
+    memory stays flat however large the workbook is.
+    
+    Returns:
+        (error_details, formula_count) where error_details maps each error value
+        to the "Sheet!A1" locations holding it
+    """
+    error_details = {err: [] for err in EXCEL_ERRORS}
+    formula_count = 0
+    cell_tag = f'{{{SHEET_NS}}}c'
+    row_tag = f'{{{SHEET_NS}}}row'
+    value_tag = f'{{{SHEET_NS}}}v'
+    formula_tag = f'{{{SHEET_NS}}}f'
+    sheet_data_tag = f'{{{SHEET_NS}}}sheetData'
+    
+    with zipfile.ZipFile(filename) as archive:
+        for sheet_name, part in worksheet_parts(archive):
+            sheet_data = None
+            row_number = column = 0
+            with archive.open(part) as stream:
+                for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+                    if event == 'start':
+                        if elem.tag == row_tag:
+                            # The r attribute is optional; rows then follow on
+                            row_number = int(elem.get('r') or row_number + 1)
+                            column = 0
+                        elif elem.tag == sheet_data_tag:
+                            sheet_data = elem
+                        continue
+                    
+                    if elem.tag == cell_tag:
+                        reference = elem.get('r')
+                        column = column_index(reference) if reference else column + 1
+                        if elem.find(formula_tag) is not None:
+                            formula_count += 1
+                        if elem.get('t') == 'e':
+                            value = elem.findtext(value_tag)
+                            if value:
+                                coordinate = reference or f"{column_letter(column)}{row_number}"
+                                location = f"{sheet_name}!{coordinate}"
+                                error_details.setdefault(value, []).append(location)
+                    elif elem.tag == row_tag and sheet_data is not None:
+                        sheet_data.remove(elem)
+    
+    return error_details, formula_count
 
 
 def setup_libreoffice_macro():
@@ -24,7 +140,7 @@ def setup_libreoffice_macro():
     # Check if LibreOffice is installed
     libreoffice = shutil.which('soffice')
     if not libreoffice:
-        print("ERROR: LibreOffice not installed. Install with: brew install libreoffice", file=sys.stderr)
+        print(f"ERROR: {LIBREOFFICE_MISSING}", file=sys.stderr)
         sys.exit(1)
 
     if platform.system() == 'Darwin':
@@ -36,8 +152,10 @@ def setup_libreoffice_macro():
     
     if os.path.exists(macro_file):
         with open(macro_file, 'r') as f:
-            if 'RecalculateAndSave' in f.read():
-                return True
+            content = f.read()
+        # Macros set up before batch mode existed lack RecalculateFiles
+        if 'RecalculateAndSave' in content and 'RecalculateFiles' in content:
+            return True
     
     if not os.path.exists(macro_dir):
         subprocess.run(['soffice', '--headless', '--terminate_after_init'], 
@@ -52,6 +170,48 @@ def setup_libreoffice_macro():
       ThisComponent.store()
       ThisComponent.close(True)
     End Sub
+
+    Rem Recalculates each file listed in $RECALC_BATCH_LIST and appends
+    Rem "milliseconds TAB status" per file to $RECALC_BATCH_RESULTS
+    Sub RecalculateFiles()
+      Dim listNum As Integer
+      Dim path As String
+      listNum = FreeFile()
+      Open Environ("RECALC_BATCH_LIST") For Input As #listNum
+      Do While Not EOF(listNum)
+        Line Input #listNum, path
+        If path &lt;&gt; "" Then RecalculateFile(path, Environ("RECALC_BATCH_RESULTS"))
+      Loop
+      Close #listNum
+      StarDesktop.terminate()
+    End Sub
+
+    Sub RecalculateFile(path As String, resultFile As String)
+      Dim doc As Object
+      Dim args(0) As New com.sun.star.beans.PropertyValue
+      Dim started As Long
+      Dim status As String
+      Dim resultNum As Integer
+      started = GetSystemTicks()
+      On Error GoTo Failed
+      args(0).Name = "Hidden"
+      args(0).Value = True
+      doc = StarDesktop.loadComponentFromURL(ConvertToURL(path), "_blank", 0, args())
+      doc.calculateAll()
+      doc.store()
+      status = "ok"
+    Done:
+      On Error Resume Next
+      If Not IsNull(doc) Then doc.close(True)
+      resultNum = FreeFile()
+      Open resultFile For Append As #resultNum
+      Print #resultNum, (GetSystemTicks() - started) &amp; Chr(9) &amp; status
+      Close #resultNum
+      Exit Sub
+    Failed:
+      status = "Could not recalculate: " &amp; Error$
+      Resume Done
+    End Sub
 </script:module>'''
     
     try:
@@ -62,28 +222,19 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
+def recalc_with_macro(abs_path, timeout):
     """
-    Recalculate formulas in Excel file and report any errors
-    
-    Args:
-        filename: Path to Excel file
-        timeout: Maximum time to wait for recalculation (seconds)
+    Recalculate in a one-shot soffice process through the RecalculateAndSave macro
     
     Returns:
-        dict with error locations and counts
+        dict with an error, or None on success
     """
-    if not Path(filename).exists():
-        return {'error': f'File {filename} does not exist'}
-    
-    abs_path = str(Path(filename).absolute())
-    
     if not setup_libreoffice_macro():
         return {'error': 'Failed to setup LibreOffice macro'}
     
     cmd = [
         'soffice', '--headless', '--norestore',
-        'vnd.sun.star.script:Standard.Module1.RecalculateAndSave?language=Basic&location=application',
+        MACRO_URL.format('RecalculateAndSave'),
         abs_path
     ]
     
@@ -110,28 +261,256 @@ def recalc(filename, timeout=30):
         else:
             return {'error': error_msg}
     
-    # Check for Excel errors in the recalculated file - scan ALL cells
+    return None
+
+
+def read_batch_results(result_file):
+    """Read the (milliseconds, status) lines the RecalculateFiles macro finished"""
     try:
-        wb = load_workbook(filename, data_only=True)
+        with open(result_file, 'r') as f:
+            lines = f.read().split('\n')
+    except FileNotFoundError:
+        return []
+    # The last entry is empty or a line still being written
+    results = []
+    for line in lines[:-1]:
+        milliseconds, _, status = line.rstrip('\r').partition('\t')
+        results.append((int(milliseconds) / 1000, status))
+    return results
+
+
+def recalc_batch_with_macro(abs_paths, timeout):
+    """
+    Recalculate files in one soffice process through the RecalculateFiles macro
+    
+    A file that takes longer than the timeout, or crashes LibreOffice, is
+    reported as failed and the session restarts with the files after it.
+    
+    Returns:
+        list of (seconds, error or None) in the order of abs_paths
+    """
+    if not abs_paths:
+        return []
+    if not shutil.which('soffice'):
+        # An error per file rather than setup_libreoffice_macro's exit, which
+        # would lose the results of the files evaluated in Python
+        return [(0.0, LIBREOFFICE_MISSING)] * len(abs_paths)
+    if not setup_libreoffice_macro():
+        return [(0.0, 'Failed to setup LibreOffice macro')] * len(abs_paths)
+    
+    results = []
+    stalled_sessions = 0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        list_file = os.path.join(tmpdir, 'files.txt')
+        result_file = os.path.join(tmpdir, 'results.txt')
+        env = dict(os.environ, RECALC_BATCH_LIST=list_file, RECALC_BATCH_RESULTS=result_file)
+        
+        while len(results) < len(abs_paths):
+            pending = abs_paths[len(results):]
+            with open(list_file, 'w') as f:
+                f.write('\n'.join(pending) + '\n')
+            if os.path.exists(result_file):
+                os.remove(result_file)
+            
+            process = subprocess.Popen(
+                ['soffice', '--headless', '--norestore', MACRO_URL.format('RecalculateFiles')],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            # The macro cannot time out a file itself, so watch its progress
+            finished = 0
+            last_progress = time.monotonic()
+            timed_out = False
+            while process.poll() is None:
+                done = len(read_batch_results(result_file))
+                if done > finished:
+                    finished = done
+                    last_progress = time.monotonic()
+                elif time.monotonic() - last_progress > timeout:
+                    process.kill()
+                    process.wait()
+                    timed_out = True
+                    break
+                time.sleep(0.1)
+            
+            session = read_batch_results(result_file)[:len(pending)]
+            for seconds, status in session:
+                results.append((seconds, None if status == 'ok' else status))
+            if len(results) == len(abs_paths):
+                break
+            
+            # The file after the last result hung or crashed the process. Only
+            # sessions that exited by themselves without any result count as
+            # stalled, not ones killed on a file that hung
+            stalled_sessions = 0 if session or timed_out else stalled_sessions + 1
+            if timed_out:
+                error = f'Recalculation timed out after {timeout} seconds'
+            elif stalled_sessions > 1:
+                # Two sessions in a row did nothing: the macro does not run at all
+                error = 'LibreOffice macro not configured properly'
+                results += [(0.0, error)] * (len(abs_paths) - len(results))
+                break
+            else:
+                error = 'LibreOffice exited during recalculation'
+            results.append((time.monotonic() - last_progress, error))
+    
+    return results
+
+
+def recalc_batch(filenames, timeout=30, engine='auto'):
+    """
+    Recalculate many Excel files and check each
+    
+    Files that formulas.py cannot evaluate are recalculated in one LibreOffice
+    session: on the shared pool when it is running, and otherwise in a single
+    soffice process that works through the list with the RecalculateFiles macro.
+    
+    Args:
+        filenames: Paths to Excel files
+        timeout: Maximum time to recalculate each file (seconds)
+        engine: 'auto' or 'libreoffice', as for recalc
+    
+    Yields:
+        dict per file, in order: its path, the seconds taken, and the error
+        details recalc returns for it
+    """
+    # Evaluate what formulas.py supports first; only the rest needs LibreOffice
+    native = {}
+    for filename in filenames:
+        if not Path(filename).exists() or filename in native:
+            continue
+        if engine == 'auto':
+            start = time.perf_counter()
+            native[filename] = (evaluate_natively(filename), time.perf_counter() - start)
+        else:
+            # No reason to report: LibreOffice was asked for
+            native[filename] = ('', 0.0)
+    
+    abs_paths = [
+        str(Path(name).absolute()) for name in filenames
+        if name in native and native[name][0] is not None
+    ]
+    if pool_available():
+        outcomes = None
+    else:
+        outcomes = iter(recalc_batch_with_macro(abs_paths, timeout))
+    
+    for filename in filenames:
+        if not Path(filename).exists():
+            yield {'file': filename, 'seconds': 0.0, 'error': f'File {filename} does not exist'}
+            continue
         
-        excel_errors = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
+        fallback_reason, seconds = native[filename]
+        start = time.perf_counter()
+        if fallback_reason is None:
+            result = with_engine(check_workbook(filename), 'python', seconds)
+            seconds += time.perf_counter() - start
+            yield {'file': filename, 'seconds': round(seconds, 3), **result}
+            continue
         
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Check ALL rows and columns - no limits
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
+        if outcomes is None:
+            try:
+                error = None
+                if not recalculate_document(filename, timeout):
+                    # No pool instance could be reached; run this file one-shot
+                    if shutil.which('soffice'):
+                        failure = recalc_with_macro(str(Path(filename).absolute()), timeout)
+                        error = failure['error'] if failure else None
+                    else:
+                        error = LIBREOFFICE_MISSING
+            except subprocess.TimeoutExpired:
+                error = f'Recalculation timed out after {timeout} seconds'
+            except ConversionError as e:
+                error = str(e)
+            recalc_seconds = time.perf_counter() - start
+        else:
+            recalc_seconds, error = next(outcomes)
+        seconds += recalc_seconds
         
-        wb.close()
+        start = time.perf_counter()
+        if error:
+            result = {'error': error}
+        else:
+            result = with_engine(check_workbook(filename), 'libreoffice', seconds, fallback_reason)
+        seconds += time.perf_counter() - start
+        yield {'file': filename, 'seconds': round(seconds, 3), **result}
+
+
+def evaluate_natively(filename):
+    """
+    Recalculate a file with formulas.py
+    
+    Returns:
+        None on success, or why the file needs LibreOffice
+    """
+    try:
+        evaluate_workbook(filename)
+        return None
+    except UnsupportedFormula as e:
+        return str(e)
+
+
+def with_engine(result, engine, seconds, fallback_reason=None):
+    """Add which engine recalculated the file, and how long it took, to a result"""
+    if 'error' not in result:
+        result['engine'] = engine
+        result['recalc_seconds'] = round(seconds, 3)
+        if fallback_reason:
+            result['fallback_reason'] = fallback_reason
+    return result
+
+
+def recalc(filename, timeout=30, engine='auto'):
+    """
+    Recalculate formulas in Excel file and report any errors
+    
+    Args:
+        filename: Path to Excel file
+        timeout: Maximum time to wait for recalculation (seconds)
+        engine: 'auto' to evaluate in Python when formulas.py supports every
+            formula and use LibreOffice otherwise, or 'libreoffice'
+    
+    Returns:
+        dict with error locations and counts, and which engine ran for how long
+    """
+    if not Path(filename).exists():
+        return {'error': f'File {filename} does not exist'}
+    
+    abs_path = str(Path(filename).absolute())
+    
+    start = time.perf_counter()
+    fallback_reason = None
+    if engine == 'auto':
+        fallback_reason = evaluate_natively(abs_path)
+        if fallback_reason is None:
+            return with_engine(check_workbook(filename), 'python', time.perf_counter() - start)
+    
+    try:
+        recalculated = recalculate_document(abs_path, timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': f'Recalculation timed out after {timeout} seconds'}
+    except ConversionError as e:
+        return {'error': str(e)}
+    
+    if not recalculated:
+        error = recalc_with_macro(abs_path, timeout)
+        if error:
+            return error
+    
+    seconds = time.perf_counter() - start
+    return with_engine(check_workbook(filename), 'libreoffice', seconds, fallback_reason)
+
+
+def check_workbook(filename):
+    """
+    Report the Excel errors and formula count of a recalculated file
+    
+    Returns:
+        dict with error locations and counts
+    """
+    # Check for Excel errors in the recalculated file - scan ALL cells
+    try:
+        error_details, formula_count = scan_workbook(filename)
+        total_errors = sum(len(locations) for locations in error_details.values())
         
         # Build result summary
         result = {
@@ -148,17 +527,6 @@ def recalc(filename, timeout=30):
                     'locations': locations[:20]  # Show up to 20 locations
                 }
         
-        # Add formula count for context - also check ALL cells
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                        formula_count += 1
-        wb_formulas.close()
-        
         result['total_formulas'] = formula_count
         
         return result
@@ -168,21 +536,43 @@ def recalc(filename, timeout=30):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
-        print("\nRecalculates all formulas in an Excel file using LibreOffice")
+    engine = 'auto'
+    if '--libreoffice' in sys.argv:
+        sys.argv.remove('--libreoffice')
+        engine = 'libreoffice'
+    
+    if len(sys.argv) < 2 or (sys.argv[1] == '--batch' and len(sys.argv) < 3):
+        print("Usage: python recalc.py [--libreoffice] <excel_file> [timeout_seconds]")
+        print("       python recalc.py --batch <list_file> [timeout_seconds]")
+        print("\nRecalculates all formulas in an Excel file, in Python when formulas.py")
+        print("supports every formula in it and otherwise using LibreOffice")
+        print("(--libreoffice always uses LibreOffice)")
+        print("\nWith --batch, recalculates each file listed in list_file (one path per")
+        print("line, - for stdin) in one LibreOffice session and prints one JSON line")
+        print("per file, with its path, seconds taken and the details below")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
         print("  - total_errors: Total number of Excel errors found")
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("  - engine: 'python' or 'libreoffice', and recalc_seconds it took")
+        print("  - fallback_reason: Why LibreOffice was needed, if it was")
         sys.exit(1)
     
+    if sys.argv[1] == '--batch':
+        timeout = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+        list_file = sys.stdin if sys.argv[2] == '-' else open(sys.argv[2])
+        with list_file:
+            filenames = [line.strip() for line in list_file if line.strip()]
+        for result in recalc_batch(filenames, timeout, engine):
+            print(json.dumps(result), flush=True)
+        return
+    
     filename = sys.argv[1]
     timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
     
-    result = recalc(filename, timeout)
+    result = recalc(filename, timeout, engine)
     print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,93 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = [
+#   "openpyxl>=3.1.0",
+#   "lxml>=4.9.0",
+# ]
+# ///
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import recalc
+from openpyxl import Workbook
+
+# Runs the RecalculateFiles macro's loop: a file named hang* never finishes,
+# one named crash* ends the process, and any other is recalculated
+FAKE_SOFFICE = f"""#!{sys.executable}
+import os, sys, time
+
+if "--terminate_after_init" in sys.argv:
+    sys.exit(0)
+for path in open(os.environ["RECALC_BATCH_LIST"]).read().split():
+    name = os.path.basename(path)
+    if name.startswith("hang"):
+        time.sleep(3600)
+    if name.startswith("crash"):
+        sys.exit(1)
+    with open(os.environ["RECALC_BATCH_RESULTS"], "a") as f:
+        f.write("5\\tok\\n")
+"""
+
+
+class TestRecalcBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.bin_dir = Path(self.tmpdir.name) / "bin"
+        self.bin_dir.mkdir()
+        for patcher in (
+            mock.patch.dict(os.environ, {"HOME": self.tmpdir.name}),
+            mock.patch.object(recalc, "pool_available", lambda: False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def install_soffice(self):
+        soffice = self.bin_dir / "soffice"
+        soffice.write_text(FAKE_SOFFICE)
+        soffice.chmod(0o755)
+        patcher = mock.patch.dict(
+            os.environ, {"PATH": f"{self.bin_dir}:{os.environ['PATH']}"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_crash_after_timeouts_is_not_a_configuration_error(self):
+        self.install_soffice()
+        paths = [
+            str(Path(self.tmpdir.name) / name)
+            for name in ("hang1.xlsx", "hang2.xlsx", "crash.xlsx", "ok.xlsx")
+        ]
+
+        results = recalc.recalc_batch_with_macro(paths, timeout=0.3)
+        self.assertEqual(
+            [error for _, error in results],
+            [
+                "Recalculation timed out after 0.3 seconds",
+                "Recalculation timed out after 0.3 seconds",
+                "LibreOffice exited during recalculation",
+                None,
+            ],
+        )
+
+    def test_missing_libreoffice_keeps_python_results(self):
+        filenames = []
+        for name, formula in (("native.xlsx", "=1+1"), ("offset.xlsx", "=OFFSET(A1,0,0)")):
+            wb = Workbook()
+            wb.active["A1"] = formula
+            filenames.append(str(Path(self.tmpdir.name) / name))
+            wb.save(filenames[-1])
+
+        with mock.patch.dict(os.environ, {"PATH": str(self.bin_dir)}):
+            results = list(recalc.recalc_batch(filenames, timeout=5))
+        self.assertEqual(results[0]["engine"], "python")
+        self.assertEqual(results[1]["error"], recalc.LIBREOFFICE_MISSING)
+
+
+if __name__ == "__main__":
+    unittest.main()